@@ -1,6 +1,7 @@
 from typing import List
-from taskcraft.tools.decorators import retryable_tool
+from taskcraft.tools.decorators import retryable_tool, cacheable_tool
 
+@cacheable_tool(ttl=3600)
 @retryable_tool()
 async def fetch_incidents(week: str) -> str:
     """Fetches incident logs for a specific week."""
@@ -1,9 +1,9 @@
 import yaml
 import importlib
-import inspect
 from pathlib import Path
-from typing import Dict, Any, Callable
+from typing import Dict, Any, Callable, Optional
 from taskcraft.config.schema import AgentConfig
+from taskcraft.config.registry import ToolRegistry, module_functions
 
 def load_config(path: str) -> AgentConfig:
     """Loads and validates the agent configuration from YAML."""
@@ -16,12 +16,15 @@ def load_config(path: str) -> AgentConfig:
         
     return AgentConfig(**data)
 
-def load_tools(config: AgentConfig) -> Dict[str, Callable]:
+def load_tools(config: AgentConfig, registry: Optional[ToolRegistry] = None) -> Dict[str, Callable]:
     """
     Dynamically loads tools based on the configuration.
-    Supports built-in tools (by name) and custom modules.
+    Supports built-in tools (by name) and custom modules. Module tools come
+    from the registry's manifest, so a module is only imported when one of
+    its tools is first called (or its file changed since it was last seen).
     """
     tools = {}
+    registry = registry or ToolRegistry()
     
     # 1. Load Built-ins (simple registry for now)
     from taskcraft.tools.definitions import write_file, read_file, deploy_prod
@@ -39,14 +42,13 @@ def load_tools(config: AgentConfig) -> Dict[str, Callable]:
         # B. Custom Module (Dynamic Import)
         if tool_cfg.module:
             try:
-                mod = importlib.import_module(tool_cfg.module)
-                # Find all async functions in module
-                for name, obj in inspect.getmembers(mod):
-                    if (inspect.isfunction(obj) or inspect.iscoroutinefunction(obj)):
-                         # Filter: Only load functions defined IN this module, not imports
-                         if obj.__module__ == mod.__name__:
-                             tools[name] = obj
+                tools.update(registry.module_tools(tool_cfg.module))
             except ImportError as e:
                 print(f"Warning: Could not import module {tool_cfg.module}: {e}")
 
+    registry.save()
     return tools
+
+def load_module_tools(module_name: str) -> Dict[str, Callable]:
+    """Imports a module and returns the functions defined in it, keyed by name."""
+    return module_functions(importlib.import_module(module_name))
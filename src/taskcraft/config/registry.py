@@ -0,0 +1,172 @@
+"""
+Lazy tool registry.
+
+Importing every configured tool module at startup makes CLI and worker boot
+time grow with the number of connectors. The registry instead keeps a JSON
+manifest of each module's tools (name, signature, docstring, markers), keyed
+by the module file's mtime and size, and hands out lightweight proxies built
+from it. A module is only imported when one of its tools is first called, or
+when its file changed and the manifest entry has to be rebuilt.
+"""
+import hashlib
+import importlib
+import importlib.util
+import inspect
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional
+import structlog
+from taskcraft.tools.decorators import TOOL_FLAGS_ATTR, tool_flags
+
+logger = structlog.get_logger()
+
+MANIFEST_VERSION = 1
+DEFAULT_MANIFEST_PATH = os.path.join("~", ".cache", "taskcraft", "tool_manifest.json")
+
+def module_functions(mod) -> Dict[str, Callable]:
+    """The tools a module defines: public functions defined in the module itself, not imports or helpers."""
+    return {
+        name: obj for name, obj in inspect.getmembers(mod, inspect.isfunction)
+        if obj.__module__ == mod.__name__ and not name.startswith("_")
+    }
+
+def _jsonable(value: Any) -> Any:
+    try:
+        json.dumps(value)
+        return value
+    except (TypeError, ValueError):
+        return repr(value)
+
+def _describe(func: Callable) -> Dict[str, Any]:
+    """Manifest entry for one tool."""
+    params = []
+    for p in inspect.signature(func).parameters.values():
+        param = {"name": p.name, "kind": p.kind.name}
+        if p.annotation is not inspect.Parameter.empty:
+            param["annotation"] = p.annotation if isinstance(p.annotation, str) else inspect.formatannotation(p.annotation)
+        if p.default is not inspect.Parameter.empty:
+            param["default"] = _jsonable(p.default)
+        params.append(param)
+    flags = {k: list(v) if isinstance(v, tuple) else v for k, v in tool_flags(func).items()}
+    return {"coroutine": inspect.iscoroutinefunction(func), "doc": func.__doc__, "flags": flags, "params": params}
+
+def _signature(params: List[Dict[str, Any]]) -> inspect.Signature:
+    return inspect.Signature([
+        inspect.Parameter(p["name"], getattr(inspect.Parameter, p["kind"]),
+                          default=p.get("default", inspect.Parameter.empty),
+                          annotation=p.get("annotation", inspect.Parameter.empty))
+        for p in params
+    ])
+
+def lazy_tool(module_name: str, name: str, entry: Dict[str, Any]) -> Callable:
+    """
+    A stand-in for `module_name.name` that imports the module on first call.
+    It has the real tool's signature, docstring and markers, and is a
+    coroutine function exactly when the real tool is, so executors pick the
+    same lane for it.
+    """
+    resolved: List[Callable] = []
+    lock = threading.Lock()
+
+    def resolve() -> Callable:
+        if not resolved:
+            with lock:
+                if not resolved:
+                    resolved.append(getattr(importlib.import_module(module_name), name))
+        return resolved[0]
+
+    if entry["coroutine"]:
+        async def proxy(*args, **kwargs):
+            return await resolve()(*args, **kwargs)
+    else:
+        def proxy(*args, **kwargs):
+            return resolve()(*args, **kwargs)
+
+    proxy.__name__ = proxy.__qualname__ = name
+    proxy.__module__ = module_name
+    proxy.__doc__ = entry["doc"]
+    proxy.__signature__ = _signature(entry["params"])
+    flags = dict(entry["flags"])
+    if "cache_path_params" in flags:
+        flags["cache_path_params"] = tuple(flags["cache_path_params"])
+    setattr(proxy, TOOL_FLAGS_ATTR, flags)
+    proxy.resolve = resolve
+    return proxy
+
+def _file_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+class ToolRegistry:
+    """
+    Resolves configured tool modules to tools through a cached manifest.
+    `manifest_path` defaults to $TASKCRAFT_TOOL_MANIFEST or
+    ~/.cache/taskcraft/tool_manifest.json. A module's entry is reused while
+    its file's mtime and size are unchanged (or its content hash, if only the
+    mtime moved); modules without a source file are always imported.
+    """
+    def __init__(self, manifest_path: Optional[str] = None):
+        self.manifest_path = os.path.expanduser(
+            manifest_path or os.getenv("TASKCRAFT_TOOL_MANIFEST") or DEFAULT_MANIFEST_PATH
+        )
+        self._modules: Dict[str, Dict[str, Any]] = self._read()
+        self._dirty = False
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != MANIFEST_VERSION:
+            return {}
+        return data.get("modules", {})
+
+    def save(self) -> None:
+        """Writes the manifest if it changed. Failures (e.g. read-only home) only cost the next startup."""
+        if not self._dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.manifest_path) or ".", exist_ok=True)
+            tmp = f"{self.manifest_path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"version": MANIFEST_VERSION, "modules": self._modules}, f)
+            os.replace(tmp, self.manifest_path)
+            self._dirty = False
+        except OSError as e:
+            logger.warning("Could not write tool manifest", path=self.manifest_path, error=str(e))
+
+    def _cached(self, module_name: str, origin: str) -> Optional[Dict[str, Any]]:
+        entry = self._modules.get(module_name)
+        if not entry or entry["file"] != origin:
+            return None
+        st = os.stat(origin)
+        if entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            return entry
+        # Touched but not edited (checkouts, copies): keep the entry, refresh the stamp
+        if entry["size"] == st.st_size and entry["sha256"] == _file_hash(origin):
+            entry["mtime_ns"] = st.st_mtime_ns
+            self._dirty = True
+            return entry
+        return None
+
+    def module_tools(self, module_name: str) -> Dict[str, Callable]:
+        """The tools of `module_name`: lazy proxies if the manifest is current, else the imported functions."""
+        spec = importlib.util.find_spec(module_name)
+        if spec is None:
+            raise ImportError(f"No module named '{module_name}'")
+        origin = spec.origin if spec.origin and os.path.isfile(spec.origin) else None
+        entry = self._cached(module_name, origin) if origin else None
+        if entry is not None:
+            return {name: lazy_tool(module_name, name, tool) for name, tool in entry["tools"].items()}
+
+        tools = module_functions(importlib.import_module(module_name))
+        if origin:
+            st = os.stat(origin)
+            self._modules[module_name] = {
+                "file": origin, "mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha256": _file_hash(origin),
+                "tools": {name: _describe(func) for name, func in tools.items()},
+            }
+            self._dirty = True
+        return tools
@@ -1,13 +1,58 @@
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Literal
 from pydantic import BaseModel, Field
 
+ExecutorRoute = Literal["local", "inline", "thread", "process", "sandbox", "docker"]
+
 class ToolConfig(BaseModel):
     name: Optional[str] = None # Name of built-in tool
     module: Optional[str] = None # Path to python module to import
-    
+    executor: Optional[ExecutorRoute] = None # Backend for these tools (see ExecutorConfig)
+
+class ExecutorConfig(BaseModel):
+    """
+    Per-tool executor routing.
+    local: in-process, lane picked by tool markers | inline: on the event loop
+    thread: thread pool | process: process pool | sandbox: rlimited subprocesses
+    docker: container sandbox
+    """
+    default: ExecutorRoute = "local"
+    routes: Dict[str, ExecutorRoute] = Field(default_factory=dict) # tool name -> backend, overrides ToolConfig
+    concurrency: Dict[str, int] = Field(default_factory=dict) # backend -> max in-flight calls
+
+class ParamRuleConfig(BaseModel):
+    """
+    A declarative check on a single tool parameter.
+    A call only halts (or is blocked) when the parameter value violates the rule;
+    benign values pass without human involvement.
+    """
+    tool: str
+    param: str
+    allowed_prefixes: Optional[List[str]] = None # Paths must live under one of these
+    max_size: Optional[int] = None # Max len() for str/bytes/lists, max value for numbers
+    allowed_domains: Optional[List[str]] = None # Email/URL recipients must match one of these
+    on_violation: Literal["approval", "block"] = "approval"
+
+class CacheConfig(BaseModel):
+    """Memoization of read-only tool results (see `tools.decorators.cacheable_tool`)."""
+    enabled: bool = True
+    max_entries: int = 1024 # In-memory LRU size
+    max_bytes: int = 64 * 1024 * 1024 # In-memory LRU budget, by serialized result size
+    max_entry_bytes: int = 1024 * 1024 # Larger results are not cached
+    path: Optional[str] = None # SQLite file for the persistent tier
+    tools: Dict[str, Optional[float]] = Field(default_factory=dict) # Extra cacheable tools -> TTL seconds (null: no expiry)
+
+class SchedulingConfig(BaseModel):
+    """
+    How this agent's tasks are dispatched to shared workers.
+    The agent `name` is the tenant; tenants share workers in proportion to `weight`.
+    """
+    priority: Literal["interactive", "normal", "batch"] = "normal"
+    weight: float = Field(default=1.0, gt=0)
+
 class PolicyConfig(BaseModel):
     max_actions: Optional[int] = None
     approval_required: List[str] = Field(default_factory=list)
+    param_rules: List[ParamRuleConfig] = Field(default_factory=list)
 
 class AgentConfig(BaseModel):
     name: str
@@ -15,3 +60,10 @@ class AgentConfig(BaseModel):
     objective: str
     tools: List[ToolConfig] = Field(default_factory=list)
     policies: PolicyConfig = Field(default_factory=PolicyConfig)
+    executor: ExecutorConfig = Field(default_factory=ExecutorConfig)
+    cache: CacheConfig = Field(default_factory=CacheConfig)
+    scheduling: SchedulingConfig = Field(default_factory=SchedulingConfig)
+
+    def has_routing(self) -> bool:
+        return bool(self.executor.routes or self.executor.default != "local"
+                    or any(t.executor for t in self.tools))
@@ -0,0 +1,120 @@
+import asyncio
+import csv
+import json
+import time
+import structlog
+from typing import Dict, List, Optional
+
+from taskcraft.core.lifecycle import AgentState, RUNNABLE_STATES
+from taskcraft.core.runtime import AgentRuntime
+from taskcraft.core.worker import default_owner
+from taskcraft.planner.base import Planner
+from taskcraft.state.models import Task
+
+logger = structlog.get_logger()
+
+def read_objectives(path: str) -> List[str]:
+    """
+    Reads objectives from a JSONL file (one string or {"objective": ...} per line)
+    or a CSV file with an `objective` column.
+    """
+    objectives = []
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith(".csv"):
+            reader = csv.DictReader(f)
+            if not reader.fieldnames or "objective" not in reader.fieldnames:
+                raise ValueError(f"{path}: CSV input needs an 'objective' column")
+            objectives = [row["objective"] for row in reader if row.get("objective")]
+        else:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                row = json.loads(line)
+                objective = row if isinstance(row, str) else row.get("objective")
+                if not objective:
+                    raise ValueError(f"{path}:{number}: missing 'objective'")
+                objectives.append(objective)
+    return objectives
+
+class BatchSummary:
+    """Outcome counts and throughput for one batch run."""
+    def __init__(self, total: int, elapsed: float, statuses: Dict[str, int], durations: List[float]):
+        self.total = total
+        self.elapsed = elapsed
+        self.statuses = statuses
+        self.durations = sorted(durations)
+
+    def percentile(self, p: float) -> float:
+        if not self.durations:
+            return 0.0
+        return self.durations[min(int(p * len(self.durations)), len(self.durations) - 1)]
+
+    @property
+    def throughput(self) -> float:
+        return self.total / self.elapsed if self.elapsed else 0.0
+
+    def render(self) -> str:
+        counts = ", ".join(f"{status}: {n}" for status, n in sorted(self.statuses.items()))
+        return (
+            f"{self.total} tasks in {self.elapsed:.1f}s ({self.throughput:.2f} tasks/s)\n"
+            f"Statuses: {counts}\n"
+            f"Task latency p50 {self.percentile(0.5):.2f}s | p95 {self.percentile(0.95):.2f}s | max {self.percentile(1.0):.2f}s"
+        )
+
+async def run_batch(runtime: AgentRuntime, planner: Planner, tasks: List[Task], concurrency: int = 8,
+                    owner: Optional[str] = None, lease_seconds: float = 30.0) -> BatchSummary:
+    """
+    Runs `tasks` in this process with at most `concurrency` in flight, sharing
+    one runtime (executor, policies) and planner. Each task is leased first, so
+    workers polling the same store skip tasks this batch is running. Like
+    `TaskWorker`, tasks whose run raised, was cancelled or stopped short of a
+    final state are marked FAILED rather than left for workers to pick up.
+    """
+    owner = owner or default_owner()
+    slots = asyncio.Semaphore(concurrency)
+    durations: List[float] = []
+    state_manager = runtime.state_manager
+
+    async def fail(task: Task, reason: str):
+        # run_leased released the lease on its way out; retake it so a worker that
+        # claimed the task since isn't overwritten
+        if not await state_manager.claim_task(owner, lease_seconds, task_id=task.task_id):
+            return
+        try:
+            stored = await state_manager.load_task(task.task_id) or task
+            stored.status = task.status = AgentState.FAILED
+            stored.history.append(reason)
+            await state_manager.save_task(stored)
+        finally:
+            await state_manager.release_task(task.task_id, owner)
+
+    async def run_one(task: Task):
+        async with slots:
+            if not await state_manager.claim_task(owner, lease_seconds, task_id=task.task_id):
+                logger.info("Task already claimed elsewhere, skipping", task_id=task.task_id)
+                return
+            started = time.monotonic()
+            try:
+                if not await runtime.run_leased(task, planner, owner, lease_seconds):
+                    return # Lease lost: whoever holds it now runs the task
+            except asyncio.CancelledError:
+                await fail(task, f"Batch {owner} was cancelled")
+                raise
+            except Exception as e:
+                logger.error("Batch task failed", task_id=task.task_id, error=str(e))
+                await state_manager.release_task(task.task_id, owner)
+                await fail(task, f"Batch {owner} failed: {e}")
+            else:
+                if task.status in RUNNABLE_STATES:
+                    await fail(task, "Planner stopped without completing the task")
+            finally:
+                durations.append(time.monotonic() - started)
+
+    started = time.monotonic()
+    await asyncio.gather(*[run_one(t) for t in tasks])
+    elapsed = time.monotonic() - started
+
+    statuses: Dict[str, int] = {}
+    for task in tasks:
+        statuses[task.status.name] = statuses.get(task.status.name, 0) + 1
+    return BatchSummary(len(tasks), elapsed, statuses, durations)
@@ -22,6 +22,9 @@ class AgentState(Enum):
     FAILED = auto()             # Task failed (after retries)
     TERMINATED = auto()         # Manually stopped
 
+# States in which a task still has work for a worker to pick up
+RUNNABLE_STATES = (AgentState.IDLE, AgentState.PLANNING, AgentState.EXECUTING)
+
 class StepStatus(Enum):
     PENDING = auto()
     RUNNING = auto()
@@ -1,16 +1,30 @@
+import asyncio
 import structlog
-from datetime import datetime
-from typing import Dict, Any, Callable
+from datetime import datetime, timedelta
+from typing import Dict, Any, Awaitable, Callable, Optional, List, Sequence
 
-from taskcraft.core.lifecycle import AgentState
-from taskcraft.state.models import Task, Step
+from taskcraft.core.lifecycle import AgentState, RUNNABLE_STATES
+from taskcraft.state.models import Task, Step, ApprovalGrant
 from taskcraft.state.persistence import StateManager
 from taskcraft.governance.policy import PolicyEngine
 from taskcraft.planner.base import Planner
-from taskcraft.executor.base import Executor
+from taskcraft.executor.base import Executor, current_idempotency_key, current_task_id
+from taskcraft.tools.append_writer import flush_all as flush_appends, pending as appends_pending
+from taskcraft.tools.decorators import RetryBudget, current_retry_budget
 
 logger = structlog.get_logger()
 
+# Error recorded on a step that was RUNNING when its worker died with no journaled result
+INTERRUPTED_ERROR = "Interrupted before its result was recorded; outcome unknown"
+
+# Pseudo-tool handled by the runtime: fans out child tasks and aggregates their results.
+# Params: objectives (list of str), quorum (completed children needed, default all),
+# timeout_seconds (optional).
+SPAWN_SUBTASKS = "spawn_subtasks"
+
+# Per-child cap on the result text folded into the parent's history
+SUBTASK_RESULT_CHARS = 1000
+
 class AgentRuntime:
     """
     Core Runtime Logic.
@@ -24,74 +38,198 @@ class AgentRuntime:
     def __init__(self, 
                  state_manager: StateManager,
                  policy_engine: PolicyEngine,
-                 executor: Executor):
+                 executor: Executor,
+                 subtask_concurrency: int = 8,
+                 delegate_subtasks: bool = False,
+                 subtask_poll_interval: float = 1.0,
+                 lease_seconds: float = 30.0,
+                 max_task_retries: int = 20,
+                 max_tool_retries: int = 10):
         self.state_manager = state_manager
         self.policy_engine = policy_engine
         self.executor = executor
+        # Sub-tasks run in this process (up to `subtask_concurrency` at once) unless
+        # delegated, in which case they are left to workers and the parent polls.
+        self.subtask_concurrency = subtask_concurrency
+        self.delegate_subtasks = delegate_subtasks
+        self.subtask_poll_interval = subtask_poll_interval
+        self.lease_seconds = lease_seconds
+        # Retries of transient tool errors allowed per task, in all and per tool
+        self.max_task_retries = max_task_retries
+        self.max_tool_retries = max_tool_retries
 
-    async def create_task(self, description: str) -> Task:
-        """Starts a new agent task."""
-        task = Task(description=description, status=AgentState.PLANNING)
+    async def create_task(self, description: str, metadata: Optional[Dict[str, Any]] = None,
+                          tenant: str = "default", priority: str = "normal", weight: float = 1.0) -> Task:
+        """Starts a new agent task. `tenant`, `priority` and `weight` steer dispatch to shared workers."""
+        task = Task(description=description, status=AgentState.PLANNING, metadata=metadata or {},
+                    tenant=tenant, priority=priority, weight=weight)
         await self.state_manager.save_task(task)
         logger.info("Task created", task_id=task.task_id)
         return task
 
+    async def create_tasks(self, descriptions: Sequence[str], metadata: Optional[Dict[str, Any]] = None,
+                           tenant: str = "default", priority: str = "normal", weight: float = 1.0) -> List[Task]:
+        """Starts many tasks at once, persisted in a single transaction."""
+        tasks = [
+            Task(description=d, status=AgentState.PLANNING, metadata=dict(metadata or {}),
+                 tenant=tenant, priority=priority, weight=weight)
+            for d in descriptions
+        ]
+        await self.state_manager.save_tasks(tasks)
+        logger.info("Tasks created", count=len(tasks), tenant=tenant)
+        return tasks
+
     async def resume_task(self, task_id: str) -> Task:
-        """Resumes an existing task."""
+        """Resumes an existing task, reconciling steps left RUNNING by a crash."""
         task = await self.state_manager.load_task(task_id)
         if not task:
             raise ValueError(f"Task {task_id} not found")
+        if await self._reconcile_running_steps(task):
+            await self.state_manager.save_task(task)
         logger.info("Task resumed", task_id=task.task_id, status=task.status)
         return task
 
+    async def _reconcile_running_steps(self, task: Task) -> bool:
+        """
+        Settles steps still marked RUNNING from the result journal instead of
+        re-executing them. A step with no journaled result is marked FAILED as
+        interrupted; if the planner retries the same call, it reuses the step's
+        idempotency key so tools that honor the key don't repeat the effect.
+        """
+        changed = False
+        for step in task.steps:
+            if step.status != "RUNNING":
+                continue
+            journaled = await self.state_manager.get_step_result(step.idempotency_key) if step.idempotency_key else None
+            if journaled is not None:
+                self._apply_result(step, journaled)
+                logger.info("Recovered step result from journal", task_id=task.task_id, step=step.name, status=step.status)
+            else:
+                step.status = "FAILED"
+                step.error = INTERRUPTED_ERROR
+                step.end_time = datetime.now()
+                logger.warning("Step interrupted with unknown outcome", task_id=task.task_id, step=step.name)
+            changed = True
+        return changed
+
+    async def grant_approval(self, task: Task, tool: str, match_params: Optional[Dict[str, Any]] = None,
+                             ttl_seconds: Optional[float] = None) -> ApprovalGrant:
+        """
+        Pre-approves future calls to `tool` for this task.
+        Only calls whose parameters equal `match_params` are covered; `ttl_seconds`
+        bounds the grant in time. Expired grants are pruned on each new grant.
+        """
+        now = datetime.now()
+        grant = ApprovalGrant(
+            tool=tool,
+            match_params=match_params or {},
+            expires_at=now + timedelta(seconds=ttl_seconds) if ttl_seconds else None,
+        )
+        for name in list(task.grants):
+            task.grants[name] = [g for g in task.grants[name] if not g.is_expired(now)]
+            if not task.grants[name]:
+                del task.grants[name]
+        task.grants.setdefault(tool, []).append(grant)
+        task.updated_at = now
+        await self.state_manager.save_task(task)
+        logger.info("Approval granted", task_id=task.task_id, tool=tool, expires_at=grant.expires_at)
+        return grant
+
     async def run_loop(self, task: Task, planner: Planner):
         """
         Main execution loop.
         """
         logger.info("Starting run loop", task_id=task.task_id)
-        
-        while task.status not in [AgentState.COMPLETED, AgentState.FAILED, AgentState.TERMINATED, AgentState.AWAITING_APPROVAL]:
-            # 1. Plan
-            history = self._build_history(task)
-            plan_response = await planner.plan(task, history)
+        try:
+            while task.status not in [AgentState.COMPLETED, AgentState.FAILED, AgentState.TERMINATED, AgentState.AWAITING_APPROVAL]:
+                # 1. Plan
+                history = self._build_history(task)
+                plan_response = await planner.plan(task, history)
             
-            # 2. Parse (Logic similar to before, handling text vs tool)
-            if hasattr(plan_response, 'text') and plan_response.text:
-                if "DONE" in plan_response.text:
-                    task.status = AgentState.COMPLETED
-                    await self.state_manager.save_task(task)
-                    break
+                # 2. Parse (Logic similar to before, handling text vs tool)
+                if hasattr(plan_response, 'text') and plan_response.text:
+                    if "DONE" in plan_response.text:
+                        task.status = AgentState.COMPLETED
+                        await self.state_manager.save_task(task)
+                        break
             
-            tool_executed = False
-            # Check for tool calls
-            if hasattr(plan_response, 'parts'):
-                for part in plan_response.parts:
-                    if fn := part.function_call:
-                        # 3. Govern & 4. Act
-                        result = await self._execute_governed_step(task, fn.name, dict(fn.args))
-                        tool_executed = True
-                        if result["status"] == "HALTED":
-                            return # Exit for approval
-
-            # Check for thought (Text only)
-            if not tool_executed and hasattr(plan_response, 'text') and plan_response.text:
-                await self._record_thought(task, plan_response.text)
-                continue
+                tool_executed = False
+                # Check for tool calls
+                if hasattr(plan_response, 'parts'):
+                    for part in plan_response.parts:
+                        if fn := part.function_call:
+                            # 3. Govern & 4. Act
+                            result = await self._execute_governed_step(task, fn.name, dict(fn.args), planner=planner)
+                            tool_executed = True
+                            if result["status"] == "HALTED":
+                                return # Exit for approval
+
+                # Check for thought (Text only)
+                if not tool_executed and hasattr(plan_response, 'text') and plan_response.text:
+                    await self._record_thought(task, plan_response.text)
+                    continue
 
-            if not tool_executed:
-                 logger.info("No tool call or thought. Stopping.")
-                 break
+                if not tool_executed:
+                     logger.info("No tool call or thought. Stopping.")
+                     break
             
-        await self.state_manager.save_task(task)
+            await self.state_manager.save_task(task)
+        finally:
+            # Write out entries buffered by append tools however the loop ends (done, halted, failed)
+            await asyncio.to_thread(flush_appends)
+
+    async def run_leased(self, task: Task, planner: Planner, owner: str, lease_seconds: float = 30.0,
+                         before: Optional[Callable[[], Awaitable[Any]]] = None) -> bool:
+        """
+        Runs the loop for a task claimed by `owner`, renewing the lease every
+        third of `lease_seconds`. If the lease is lost (this worker stalled past
+        expiry and another claimed the task) the loop is cancelled. The lease is
+        released when the loop ends. Returns False if the lease was lost.
+        `before` is awaited under the same lease ahead of the loop (e.g. the
+        step an approval lets through).
+        """
+        async def leased():
+            if before is not None:
+                await before()
+            await self.run_loop(task, planner)
+
+        loop_task = asyncio.create_task(leased())
+        lost = False
+
+        async def heartbeat():
+            nonlocal lost
+            while True:
+                await asyncio.sleep(lease_seconds / 3)
+                if not await self.state_manager.heartbeat(task.task_id, owner, lease_seconds):
+                    logger.warning("Task lease lost, stopping", task_id=task.task_id, owner=owner)
+                    lost = True
+                    loop_task.cancel()
+                    return
 
-    async def execute_step(self, task: Task, action: str, params: dict, bypass_policy: bool = False) -> Dict[str, Any]:
+        beat = asyncio.create_task(heartbeat())
+        try:
+            await loop_task
+        except asyncio.CancelledError:
+            if not lost:
+                raise
+        finally:
+            beat.cancel()
+            if not lost:
+                await self.state_manager.release_task(task.task_id, owner)
+        return not lost
+
+    async def execute_step(self, task: Task, action: str, params: dict, bypass_policy: bool = False,
+                           planner: Optional[Planner] = None) -> Dict[str, Any]:
         """Exposed for Manual Approval / CLI to run a specific step."""
-        return await self._execute_governed_step(task, action, params, bypass_policy=bypass_policy)
+        return await self._execute_governed_step(task, action, params, bypass_policy=bypass_policy, planner=planner)
 
-    async def _execute_governed_step(self, task: Task, action: str, params: dict, bypass_policy: bool = False) -> Dict[str, Any]:
+    async def _execute_governed_step(self, task: Task, action: str, params: dict, bypass_policy: bool = False,
+                                     planner: Optional[Planner] = None) -> Dict[str, Any]:
         """Internal method to handle policy + execution."""
         # Update State
-        step = Step(task_id=task.task_id, index=task.current_step_index, name=action, input_data=params)
+        retried_key = self._interrupted_key(task, action, params)
+        step = Step(task_id=task.task_id, index=task.current_step_index, name=action, input_data=params,
+                    idempotency_key=retried_key or f"{task.task_id}:{task.current_step_index}")
         task.steps.append(step)
         task.current_step_index += 1
         
@@ -99,7 +237,7 @@ class AgentRuntime:
         if bypass_policy:
             decision = type('Decision', (), {'allowed': True, 'requires_approval': False})() # Mock allowed decision
         else:
-            context = {'action_count': len(task.steps)}
+            context = {'action_count': len(task.steps), 'grants': task.grants}
             decision = self.policy_engine.evaluate(action, params, context)
         
         if not decision.allowed:
@@ -123,23 +261,186 @@ class AgentRuntime:
         step.start_time = datetime.now()
         await self.state_manager.save_task(task)
 
-        # Delegate to Executor
-        result = await self.executor.execute(action, params)
-        
+        # Delegate to Executor; tools that accept `idempotency_key` receive the step's key
+        result = None
+        if retried_key:
+            result = await self.state_manager.get_step_result(retried_key)
+        if result is None:
+            budget = self._retry_budget(task)
+            spent = budget.used.get(action, 0)
+            token = current_idempotency_key.set(step.idempotency_key)
+            task_token = current_task_id.set(task.task_id)
+            budget_token = current_retry_budget.set(budget)
+            try:
+                if action == SPAWN_SUBTASKS:
+                    result = await self._spawn_subtasks(task, params, planner)
+                else:
+                    result = await self.executor.execute(action, params)
+            finally:
+                current_retry_budget.reset(budget_token)
+                current_task_id.reset(task_token)
+                current_idempotency_key.reset(token)
+                step.retries = budget.used.get(action, 0) - spent
+            # Entries the step's tools buffered go to disk before the step is journaled as done
+            if appends_pending():
+                await asyncio.to_thread(flush_appends)
+            # Journal before the status flip so a crash in between can be reconciled on resume
+            await self.state_manager.record_step_result(task.task_id, step.idempotency_key, result)
+
+        self._apply_result(step, result)
+        task.updated_at = datetime.now()
+        await self.state_manager.save_task(task)
+        if step.status == "COMPLETED":
+            return {"status": "SUCCESS", "output": result["output"]}
+        return {"status": "FAILED", "error": result["error"]}
+
+    def _retry_budget(self, task: Task) -> RetryBudget:
+        """The task's remaining retry budget, rebuilt from the retries recorded on its steps."""
+        used: Dict[str, int] = {}
+        for s in task.steps:
+            if s.retries:
+                used[s.name] = used.get(s.name, 0) + s.retries
+        return RetryBudget(self.max_task_retries, self.max_tool_retries, used)
+
+    async def _spawn_subtasks(self, task: Task, params: dict, planner: Optional[Planner]) -> Dict[str, Any]:
+        """
+        Creates one child task per objective and waits until `quorum` of them
+        completed, the quorum became unreachable, or `timeout_seconds` passed.
+        Children inherit the parent's metadata and scheduling. A retried spawn
+        (same idempotency key) re-attaches to the children it already created.
+        """
+        objectives = params.get("objectives")
+        if not objectives or not isinstance(objectives, list) or not all(isinstance(o, str) for o in objectives):
+            return {"status": "ERROR", "error": f"{SPAWN_SUBTASKS} needs a non-empty 'objectives' list of strings"}
+        try:
+            quorum = min(max(int(params.get("quorum") or len(objectives)), 1), len(objectives))
+        except (TypeError, ValueError):
+            return {"status": "ERROR", "error": f"{SPAWN_SUBTASKS} 'quorum' must be a number, got {params['quorum']!r}"}
+        timeout = params.get("timeout_seconds")
+        if timeout is not None:
+            try:
+                timeout = float(timeout)
+            except (TypeError, ValueError):
+                timeout = None
+            if timeout is None or not timeout > 0:
+                return {"status": "ERROR",
+                        "error": f"{SPAWN_SUBTASKS} 'timeout_seconds' must be a positive number, got {params['timeout_seconds']!r}"}
+
+        spawn_key = current_idempotency_key.get()
+        children = [c for c in await self.state_manager.list_children(task.task_id)
+                    if c.metadata.get("spawn_key") == spawn_key]
+        if not children:
+            children = [
+                Task(description=objective, status=AgentState.PLANNING, parent_id=task.task_id,
+                     metadata={**task.metadata, "spawn_key": spawn_key},
+                     tenant=task.tenant, priority=task.priority, weight=task.weight)
+                for objective in objectives
+            ]
+            await self.state_manager.save_tasks(children)
+        logger.info("Sub-tasks spawned", task_id=task.task_id, count=len(children), quorum=quorum)
+
+        await self._wait_for_children(children, planner, quorum, timeout)
+        return self._aggregate_children(children, quorum)
+
+    async def _wait_for_children(self, children: List[Task], planner: Optional[Planner], quorum: int,
+                                 timeout: Optional[float]):
+        from taskcraft.core.worker import default_owner
+
+        owner = default_owner()
+        slots = asyncio.Semaphore(self.subtask_concurrency)
+        inline = set()
+
+        async def follow(child: Task):
+            # Run the child here if we can lease it, otherwise track whoever runs it
+            if planner is not None and not self.delegate_subtasks:
+                async with slots:
+                    if child.status in RUNNABLE_STATES and await self.state_manager.claim_task(
+                            owner, self.lease_seconds, task_id=child.task_id):
+                        inline.add(child.task_id)
+                        try:
+                            await self.run_leased(child, planner, owner, self.lease_seconds)
+                        except Exception as e:
+                            logger.error("Sub-task failed", task_id=child.task_id, error=str(e))
+                            child.status = AgentState.FAILED
+                            child.history.append(f"Sub-task failed: {e}")
+                            await self.state_manager.save_task(child)
+                        return
+            while child.status in RUNNABLE_STATES:
+                await asyncio.sleep(self.subtask_poll_interval)
+                fresh = await self.state_manager.load_task(child.task_id)
+                if fresh:
+                    child.status, child.steps = fresh.status, fresh.steps
+
+        def settled() -> bool:
+            completed = sum(c.status == AgentState.COMPLETED for c in children)
+            running = sum(c.status in RUNNABLE_STATES for c in children)
+            return completed >= quorum or completed + running < quorum
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout if timeout else None
+        followers = {asyncio.create_task(follow(c)): c for c in children}
+        pending = set(followers)
+        while pending and not settled():
+            remaining = deadline - loop.time() if deadline else None
+            if remaining is not None and remaining <= 0:
+                break
+            _, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+        for waiter in pending:
+            # A child that already settled in memory may still be saving that outcome: let it finish
+            if followers[waiter].status in RUNNABLE_STATES:
+                waiter.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        # Children we ran and cut short are abandoned; delegated ones keep running elsewhere
+        for child in children:
+            if child.task_id in inline and child.status in RUNNABLE_STATES:
+                child.status = AgentState.TERMINATED
+                child.history.append("Terminated: parent stopped waiting (quorum or timeout)")
+                await self.state_manager.save_task(child)
+
+    @staticmethod
+    def _aggregate_children(children: List[Task], quorum: int) -> Dict[str, Any]:
+        results = []
+        for child in children:
+            output = None
+            for step in reversed(child.steps):
+                if step.status == "COMPLETED":
+                    value = step.input_data.get("thought") if step.name == "think" else (step.output_data or {}).get("result")
+                    output = str(value)[:SUBTASK_RESULT_CHARS]
+                    break
+            results.append({"task_id": child.task_id, "objective": child.description,
+                            "status": child.status.name, "result": output})
+        completed = sum(r["status"] == "COMPLETED" for r in results)
+        summary = {
+            "completed": completed,
+            "failed": sum(r["status"] in ("FAILED", "TERMINATED") for r in results),
+            "pending": sum(c.status in RUNNABLE_STATES for c in children),
+            "quorum": quorum,
+            "results": results,
+        }
+        if completed >= quorum:
+            return {"status": "SUCCESS", "output": summary}
+        return {"status": "ERROR", "error": f"Sub-task quorum not reached ({completed}/{quorum} completed): {summary}"}
+
+    @staticmethod
+    def _apply_result(step: Step, result: Dict[str, Any]):
         if result["status"] == "SUCCESS":
             step.output_data = {"result": result["output"]}
             step.status = "COMPLETED"
-            step.end_time = datetime.now()
-            task.updated_at = datetime.now()
-            await self.state_manager.save_task(task)
-            return {"status": "SUCCESS", "output": result["output"]}
         else:
             step.status = "FAILED"
             step.error = result["error"]
-            step.end_time = datetime.now()
-            task.updated_at = datetime.now()
-            await self.state_manager.save_task(task)
-            return {"status": "FAILED", "error": result["error"]}
+        step.end_time = datetime.now()
+
+    @staticmethod
+    def _interrupted_key(task: Task, action: str, params: dict) -> Optional[str]:
+        """The key of the latest identical call, if that call was interrupted."""
+        for step in reversed(task.steps):
+            if step.name == action and step.input_data == params:
+                if step.status == "FAILED" and step.error == INTERRUPTED_ERROR:
+                    return step.idempotency_key
+                return None
+        return None
 
     async def _record_thought(self, task: Task, thought: str):
         logger.info("Agent thought", content=thought[:100])
@@ -0,0 +1,42 @@
+import math
+from typing import Dict, List, Optional, get_args
+
+from taskcraft.state.models import PriorityClass
+
+# Highest priority first
+PRIORITY_CLASSES = get_args(PriorityClass)
+PRIORITY_RANK = {name: rank for rank, name in enumerate(PRIORITY_CLASSES)}
+
+class QueueHead:
+    """Summary of the waiting tasks of one tenant in one priority class."""
+    def __init__(self, tenant: str, priority: str, weight: float, oldest: float, depth: int):
+        self.tenant = tenant
+        self.priority = priority
+        self.weight = weight
+        self.oldest = oldest  # Epoch seconds the oldest task was queued
+        self.depth = depth
+
+class FairShareScheduler:
+    """
+    Chooses which queue (tenant, priority class) the next claim is served from.
+    Classes are strictly ordered, but a queue moves up one class for every
+    `aging_seconds` its oldest task has waited, so low-priority work can't
+    starve. Among queues in the same effective class, the tenant with the least
+    in-flight work per unit of weight goes first (weighted fair share), then
+    the longest-waiting queue.
+    """
+    def __init__(self, aging_seconds: float = 300.0):
+        self.aging_seconds = aging_seconds
+
+    def effective_rank(self, head: QueueHead, now: float) -> int:
+        aged = (now - head.oldest) / self.aging_seconds if self.aging_seconds else 0
+        return max(PRIORITY_RANK.get(head.priority, len(PRIORITY_CLASSES)) - math.floor(aged), 0)
+
+    def select(self, heads: List[QueueHead], in_flight: Dict[str, int], now: float) -> Optional[QueueHead]:
+        if not heads:
+            return None
+        return min(heads, key=lambda h: (
+            self.effective_rank(h, now),
+            in_flight.get(h.tenant, 0) / max(h.weight, 1e-9),
+            h.oldest,
+        ))
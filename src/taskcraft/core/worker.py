@@ -0,0 +1,81 @@
+import asyncio
+import os
+import socket
+import time
+import uuid
+import structlog
+from typing import Awaitable, Callable, Optional, Tuple
+
+from taskcraft.core.lifecycle import AgentState, RUNNABLE_STATES
+from taskcraft.core.runtime import AgentRuntime
+from taskcraft.planner.base import Planner
+from taskcraft.state.models import Task
+from taskcraft.state.persistence import StateManager
+
+logger = structlog.get_logger()
+
+# Builds the runtime and planner for a claimed task (e.g. from the config recorded in its metadata)
+Resolver = Callable[[Task], Awaitable[Tuple[AgentRuntime, Planner]]]
+
+def default_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+class TaskWorker:
+    """
+    Pulls runnable tasks from a shared state store and runs them under a lease.
+    Any number of workers (processes or hosts) can share one SQLite file or
+    Postgres database: claims are atomic, a running task's lease is renewed by
+    heartbeats, and a task whose worker died is reclaimed once its lease expires.
+    """
+    def __init__(self, state_manager: StateManager, resolve: Resolver, owner: Optional[str] = None,
+                 lease_seconds: float = 30.0, poll_interval: float = 1.0):
+        self.state_manager = state_manager
+        self.resolve = resolve
+        self.owner = owner or default_owner()
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+
+    async def run_once(self) -> Optional[Task]:
+        """Claims and runs one task. Returns it, or None if the queue was empty."""
+        claimed = await self.state_manager.claim_task(self.owner, self.lease_seconds)
+        if not claimed:
+            return None
+        logger.info("Task claimed", task_id=claimed.task_id, owner=self.owner, tenant=claimed.tenant,
+                    priority=claimed.priority, wait_s=round(time.time() - claimed.created_at.timestamp(), 1))
+        try:
+            runtime, planner = await self.resolve(claimed)
+            # Reload through the runtime so steps left RUNNING by a dead worker are reconciled
+            task = await runtime.resume_task(claimed.task_id)
+            if not await runtime.run_leased(task, planner, self.owner, self.lease_seconds):
+                return task
+        except Exception as e:
+            logger.error("Task run failed", task_id=claimed.task_id, error=str(e))
+            task = await self.state_manager.load_task(claimed.task_id) or claimed
+            task.status = AgentState.FAILED
+            task.history.append(f"Worker {self.owner} failed: {e}")
+            await self.state_manager.save_task(task)
+            await self.state_manager.release_task(task.task_id, self.owner)
+            return task
+
+        if task.status in RUNNABLE_STATES:
+            # The loop stopped without finishing; don't let workers spin on it
+            task.status = AgentState.FAILED
+            task.history.append("Planner stopped without completing the task")
+            await self.state_manager.save_task(task)
+        return task
+
+    async def run(self, max_tasks: Optional[int] = None, stop: Optional[asyncio.Event] = None) -> int:
+        """Processes tasks until `stop` is set or `max_tasks` ran. Returns the number run."""
+        done = 0
+        while (max_tasks is None or done < max_tasks) and not (stop and stop.is_set()):
+            if await self.run_once():
+                done += 1
+                continue
+            if stop:
+                try:
+                    await asyncio.wait_for(stop.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(self.poll_interval)
+        return done
@@ -0,0 +1,317 @@
+"""
+Long-running TaskCraft daemon (`taskcraft serve`) and its thin client.
+
+The daemon keeps one warm runtime per agent config: the config is parsed,
+tools resolved, executor pools started and the planner client created once,
+then reused by every command. Runtimes are rebuilt when their YAML file
+changes. The CLI talks to it over a Unix socket with one JSON object per line:
+
+    request:  {"command": "run", "objective": "...", "config_path": "/abs/agent.yaml",
+               "settings": {"backend": "sqlite", "state": "/abs/taskcraft_state.db"}}
+    response: {"ok": true, "lines": ["..."], "task_id": "...", "status": "COMPLETED"}
+
+`settings` names the client's state store and any execution flags it set;
+the daemon refuses a command whose settings differ from its own (the
+response carries `mismatch`), and the CLI then runs it in-process.
+
+Commands: run, resume, approve, status, ping. Only this module's top-level
+imports are paid by the client; the daemon side imports the runtime lazily.
+"""
+import asyncio
+import json
+import os
+import socket
+from typing import Any, Dict, List, Optional, Tuple
+
+# Large enough for a status response with many lines
+STREAM_LIMIT = 16 * 1024 * 1024
+
+def default_socket_path() -> str:
+    """$TASKCRAFT_SOCKET, else ~/.taskcraft/daemon.sock."""
+    return os.getenv("TASKCRAFT_SOCKET") or os.path.join(os.path.expanduser("~"), ".taskcraft", "daemon.sock")
+
+async def request(socket_path: str, message: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Sends one command to the daemon and waits for its response.
+    Raises OSError (e.g. ConnectionRefusedError) if no daemon is listening.
+    """
+    reader, writer = await asyncio.open_unix_connection(socket_path, limit=STREAM_LIMIT)
+    try:
+        writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+        line = await reader.readline()
+    finally:
+        writer.close()
+    if not line:
+        raise ConnectionResetError("Daemon closed the connection without answering")
+    return json.loads(line)
+
+class AgentHost:
+    """A warm runtime for one agent config, plus what's needed to retire it after a reload."""
+    def __init__(self, path: Optional[str], mtime_ns: Optional[int], config, runtime, planner, executor):
+        self.path = path
+        self.mtime_ns = mtime_ns
+        self.config = config # None for the built-in defaults
+        self.runtime = runtime
+        self.planner = planner
+        self.executor = executor
+        self.active = 0 # Tasks currently running on this host
+        self.retired = False
+
+    async def close(self) -> None:
+        if hasattr(self.executor, "close"):
+            await self.executor.close()
+
+class TaskcraftDaemon:
+    """
+    Serves CLI commands against warm runtimes.
+    `args` carries the execution flags (executor, planner, pools, lease) used
+    to build every runtime. Tasks started by `run`/`resume`/`approve` run in
+    the daemon under a lease; with `wait` (the default) the response is sent
+    when the task stops, otherwise right after it starts.
+    """
+    def __init__(self, state_manager, args, socket_path: str, config_paths: Optional[List[str]] = None,
+                 reload_interval: float = 2.0):
+        self.state_manager = state_manager
+        self.args = args
+        self.socket_path = socket_path
+        self.config_paths = [os.path.abspath(p) for p in config_paths or []]
+        self.reload_interval = reload_interval
+        self.hosts: Dict[Optional[str], AgentHost] = {}
+        self._host_lock = asyncio.Lock()
+        self._builds: Dict[Tuple[Optional[str], Optional[int]], asyncio.Task] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._watcher: Optional[asyncio.Task] = None
+        from taskcraft.main_cli import daemon_settings
+        from taskcraft.observability.logger import get_logger
+        self.settings = daemon_settings(args)
+        self.logger = get_logger()
+
+    # --- Warm runtimes -------------------------------------------------
+
+    @staticmethod
+    def _mtime(path: Optional[str]) -> Optional[int]:
+        return os.stat(path).st_mtime_ns if path else None
+
+    async def host(self, path: Optional[str]) -> AgentHost:
+        """
+        The warm host for a config path (None: built-in defaults), rebuilt if the file changed.
+        Concurrent callers share one build; commands for other agents keep being served meanwhile.
+        """
+        async with self._host_lock:
+            current = self.hosts.get(path)
+            mtime = self._mtime(path)
+            if current and current.mtime_ns == mtime:
+                return current
+            key = (path, mtime)
+            build = self._builds.get(key)
+            if build is None:
+                build = self._builds[key] = asyncio.create_task(self._build(path, mtime))
+                build.add_done_callback(lambda _: self._builds.pop(key, None))
+        return await asyncio.shield(build)
+
+    async def _build(self, path: Optional[str], mtime: Optional[int]) -> AgentHost:
+        from taskcraft.main_cli import build_runtime
+        # Off the loop and outside the lock: loading tools and starting executor pools can take seconds
+        host = AgentHost(path, mtime, *await asyncio.to_thread(build_runtime, self.args, self.state_manager, path))
+        async with self._host_lock:
+            current = self.hosts.get(path)
+            self.hosts[path] = host
+        if current:
+            self.logger.info("Agent config reloaded", path=path)
+            await self._retire(current)
+        else:
+            self.logger.info("Agent config loaded", path=path or "(defaults)")
+        return host
+
+    async def _retire(self, host: AgentHost) -> None:
+        host.retired = True
+        if host.active == 0:
+            await host.close()
+
+    async def _watch(self) -> None:
+        """Rebuilds hosts whose YAML changed, so the next command finds them warm."""
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            for path in [p for p in self.hosts if p]:
+                try:
+                    if self._mtime(path) != self.hosts[path].mtime_ns:
+                        await self.host(path)
+                except Exception as e:
+                    # Keep serving the last good config until the file is fixed
+                    self.logger.error("Agent config reload failed", path=path, error=str(e))
+
+    # --- Commands ------------------------------------------------------
+
+    async def _run_on(self, host: AgentHost, task, owner: Optional[str] = None, before=None) -> str:
+        from taskcraft.main_cli import continue_task
+        host.active += 1
+        try:
+            ran = await continue_task(host.runtime, task, host.planner, owner=owner, before=before)
+        finally:
+            host.active -= 1
+            if host.retired and host.active == 0:
+                await host.close()
+        return task.status.name if ran else "CLAIMED_ELSEWHERE"
+
+    async def _start(self, host: AgentHost, task, wait: bool, owner: Optional[str] = None,
+                     before=None) -> Dict[str, Any]:
+        job = asyncio.create_task(self._run_on(host, task, owner, before))
+        self._running[task.task_id] = job
+        job.add_done_callback(lambda _: self._running.pop(task.task_id, None))
+        if not wait:
+            return {"ok": True, "task_id": task.task_id, "status": task.status.name,
+                    "lines": [f"🚀 Task {task.task_id} started in the daemon"]}
+        status = await asyncio.shield(job)
+        lines = [f"🏁 Task finished with status: {status}"]
+        if status == "CLAIMED_ELSEWHERE":
+            lines = ["⚠️ Task was claimed by a worker before the daemon could start it."]
+        elif status == "AWAITING_APPROVAL":
+            lines.append(f"✋ Task halted. Use 'taskcraft approve {task.task_id}' to continue.")
+        return {"ok": True, "task_id": task.task_id, "status": status, "lines": lines}
+
+    async def cmd_run(self, objective: Optional[str] = None, config_path: Optional[str] = None,
+                      priority: Optional[str] = None, wait: bool = True) -> Dict[str, Any]:
+        host = await self.host(config_path)
+        config = host.config
+        objective = objective or (config.objective if config else None)
+        if not objective:
+            return {"ok": False, "error": "--objective is required."}
+        name = config.name if config else "Agent"
+        metadata = {"agent": name}
+        if config_path:
+            metadata["config_path"] = config_path
+        task = await host.runtime.create_task(
+            objective, metadata, tenant=name,
+            priority=priority or (config.scheduling.priority if config else "normal"),
+            weight=config.scheduling.weight if config else 1.0,
+        )
+        return await self._start(host, task, wait)
+
+    async def cmd_resume(self, task_id: str, wait: bool = True) -> Dict[str, Any]:
+        from taskcraft.main_cli import command_states, lease_refusal, lease_task
+        task = await self.state_manager.load_task(task_id)
+        if not task:
+            return {"ok": False, "error": f"Task {task_id} not found"}
+        host = await self.host(task.metadata.get("config_path"))
+        # Lease before reconciling, so a concurrent resume or approve can't run the task too
+        owner, task = await lease_task(host.runtime, task_id, command_states("resume"))
+        if owner is None:
+            return {"ok": True, "task_id": task_id, "status": task.status.name if task else None,
+                    "lines": [lease_refusal(task, "resume")]}
+        return await self._start(host, task, wait, owner)
+
+    async def cmd_approve(self, task_id: str, grant_ttl: Optional[float] = None,
+                          grant_match: Optional[List[str]] = None, wait: bool = True) -> Dict[str, Any]:
+        from taskcraft.main_cli import approve_pending_step, command_states, lease_refusal, lease_task, pending_approval
+        task = await self.state_manager.load_task(task_id)
+        if not task:
+            return {"ok": False, "error": f"Task {task_id} not found"}
+        host = await self.host(task.metadata.get("config_path"))
+        # Lease before approving: of two overlapping approvals, only one runs the step
+        owner, task = await lease_task(host.runtime, task_id, command_states("approve"))
+        if owner is None:
+            return {"ok": False, "error": lease_refusal(task, "approve")}
+        step = pending_approval(task)
+        if step is None:
+            await self.state_manager.release_task(task_id, owner)
+            return {"ok": False, "error": "No pending steps."}
+        approve = lambda: approve_pending_step(host.runtime, task, grant_ttl, grant_match or [])
+        response = await self._start(host, task, wait, owner, before=approve)
+        response["lines"][:0] = [f"Approved step: {step.name}"] + (
+            [f"🔑 Pre-approved further '{step.name}' calls"] if grant_ttl or grant_match else [])
+        return response
+
+    async def cmd_status(self, task_id: str) -> Dict[str, Any]:
+        from taskcraft.main_cli import status_lines
+        return {"ok": True, "task_id": task_id, "lines": await status_lines(self.state_manager, task_id)}
+
+    async def cmd_ping(self) -> Dict[str, Any]:
+        agents = [h.path or "(defaults)" for h in self.hosts.values()]
+        return {"ok": True, "lines": [f"Daemon up: {len(agents)} warm agent(s), {len(self._running)} running task(s)"]
+                + [f"  {a}" for a in agents]}
+
+    async def dispatch(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        message = dict(message)
+        command = message.pop("command", None)
+        handler = getattr(self, f"cmd_{command}", None) if isinstance(command, str) else None
+        if handler is None:
+            return {"ok": False, "error": f"Unknown command: {command!r}"}
+        # The client's state store and explicit execution flags must be the ones served here
+        settings = message.pop("settings", None) or {}
+        mismatch = sorted(k for k, v in settings.items() if self.settings.get(k) != v)
+        if mismatch:
+            return {"ok": False, "mismatch": mismatch,
+                    "error": f"Daemon runs with different settings: {', '.join(mismatch)}"}
+        try:
+            return await handler(**message)
+        except TypeError as e:
+            return {"ok": False, "error": f"Bad request: {e}"}
+        except Exception as e:
+            self.logger.error("Daemon command failed", error=str(e))
+            return {"ok": False, "error": str(e)}
+
+    # --- Server --------------------------------------------------------
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            line = await reader.readline()
+            if line:
+                try:
+                    response = await self.dispatch(json.loads(line))
+                except ValueError:
+                    response = {"ok": False, "error": "Malformed request"}
+                writer.write(json.dumps(response, default=str).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass # Client went away; a task it started keeps running
+        finally:
+            writer.close()
+
+    async def start(self) -> None:
+        """Preloads configured agents and starts listening. Raises RuntimeError if a daemon already serves the socket."""
+        # A directory we create is private; an existing one (e.g. $TASKCRAFT_SOCKET in /tmp) is left alone
+        os.makedirs(os.path.dirname(self.socket_path) or ".", mode=0o700, exist_ok=True)
+        if os.path.exists(self.socket_path):
+            try:
+                _, writer = await asyncio.open_unix_connection(self.socket_path)
+            except ConnectionRefusedError:
+                os.unlink(self.socket_path) # Stale socket from a daemon that didn't shut down cleanly
+            else:
+                writer.close()
+                raise RuntimeError(f"Another daemon is serving on {self.socket_path}")
+        for path in self.config_paths:
+            await self.host(path)
+        # Commands run tools: only this user may connect. The umask makes the socket
+        # private from the moment it is bound, not only after the chmod
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        umask = os.umask(0o077)
+        try:
+            sock.bind(self.socket_path)
+        except BaseException:
+            sock.close()
+            raise
+        finally:
+            os.umask(umask)
+        os.chmod(self.socket_path, 0o600)
+        self._server = await asyncio.start_unix_server(self._handle, sock=sock, limit=STREAM_LIMIT)
+        self._watcher = asyncio.create_task(self._watch())
+
+    async def close(self) -> None:
+        """Stops accepting commands, cancels running tasks (their leases are released) and closes executors."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._watcher:
+            self._watcher.cancel()
+        for job in list(self._running.values()):
+            job.cancel()
+        await asyncio.gather(*self._running.values(), return_exceptions=True)
+        # Let in-flight builds land in `hosts` so their executors are closed too
+        await asyncio.gather(*self._builds.values(), return_exceptions=True)
+        for host in self.hosts.values():
+            await host.close()
+        # Only remove a socket this daemon bound; a failed start must not unlink another daemon's
+        if self._server and os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
@@ -1,4 +1,31 @@
-from typing import Dict, Any, Protocol
+import inspect
+from contextvars import ContextVar
+from typing import Dict, Any, Callable, Optional, Protocol
+
+# Name of the keyword argument through which tools receive their step's idempotency key
+IDEMPOTENCY_PARAM = "idempotency_key"
+
+# Set by the runtime around each tool call; executors forward it to tools that accept it
+current_idempotency_key: ContextVar[Optional[str]] = ContextVar("taskcraft_idempotency_key", default=None)
+
+# Set by the runtime around each tool call: the task the call belongs to (sandboxes aren't shared across tasks)
+current_task_id: ContextVar[Optional[str]] = ContextVar("taskcraft_task_id", default=None)
+
+def bind_idempotency_key(func: Callable, params: Dict[str, Any], key: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Returns `params` plus the current idempotency key, if `func` declares an
+    `idempotency_key` parameter and the caller didn't pass one explicitly.
+    """
+    key = key or current_idempotency_key.get()
+    if not key or IDEMPOTENCY_PARAM in params:
+        return params
+    try:
+        accepted = inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return params
+    if IDEMPOTENCY_PARAM not in accepted:
+        return params
+    return {**params, IDEMPOTENCY_PARAM: key}
 
 class Executor(Protocol):
     """
@@ -0,0 +1,199 @@
+import hashlib
+import json
+import os
+import time
+import aiosqlite
+import structlog
+from collections import OrderedDict
+from typing import Dict, Callable, Any, Optional, Tuple, Sequence
+from taskcraft.executor.base import Executor
+from taskcraft.tools.decorators import tool_flags
+
+logger = structlog.get_logger()
+
+class CachePolicy:
+    """How one tool's results are cached."""
+    def __init__(self, ttl: Optional[float] = None, path_params: Sequence[str] = ("path",)):
+        self.ttl = ttl
+        self.path_params = tuple(path_params)
+
+class CacheEntry:
+    def __init__(self, output: Any, expires_at: Optional[float], fingerprints: Dict[str, Any], size: int = 0):
+        self.output = output
+        self.expires_at = expires_at
+        self.fingerprints = fingerprints
+        self.size = size # Serialized size of `output`, counted against the LRU's byte budget
+
+class ToolCacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / total, 3) if total else 0.0,
+        }
+
+def cache_key(tool_name: str, params: Dict[str, Any]) -> str:
+    """Tool name plus a canonical hash of the parameters."""
+    canonical = json.dumps(params, sort_keys=True, separators=(",", ":"), default=repr)
+    return f"{tool_name}:{hashlib.sha256(canonical.encode('utf-8')).hexdigest()}"
+
+def _serialize(output: Any) -> Tuple[Optional[str], int]:
+    """`output` as JSON for the SQLite tier (None if it isn't JSON-serializable) and its size in bytes."""
+    try:
+        data = json.dumps(output)
+    except (TypeError, ValueError):
+        return None, len(repr(output).encode("utf-8"))
+    return data, len(data.encode("utf-8"))
+
+def _fingerprint(path: Any) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(str(path))
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+class CachingExecutor(Executor):
+    """
+    Memoizes results of cacheable tools in front of another executor.
+    Tools opt in with `@cacheable_tool` (or `policies`). Entries live in an
+    in-memory LRU bounded by `max_entries` and by `max_bytes` of serialized
+    output, optionally backed by a persistent SQLite tier shared across runs.
+    Results over `max_entry_bytes` are not cached. File-reading tools are invalidated when the file's mtime or size changes.
+    Only successful results are cached; hit rates are tracked per tool.
+    """
+    def __init__(self, inner: Executor, tools: Dict[str, Callable], max_entries: int = 1024,
+                 path: Optional[str] = None, policies: Optional[Dict[str, CachePolicy]] = None,
+                 max_bytes: int = 64 * 1024 * 1024, max_entry_bytes: int = 1024 * 1024):
+        self.inner = inner
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.path = path
+        self.policies: Dict[str, CachePolicy] = {}
+        for name, func in tools.items():
+            flags = tool_flags(func)
+            if flags.get("cacheable"):
+                self.policies[name] = CachePolicy(flags.get("cache_ttl"), flags.get("cache_path_params", ("path",)))
+        self.policies.update(policies or {})
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._stats: Dict[str, ToolCacheStats] = {}
+        self._db: Optional[aiosqlite.Connection] = None
+
+    async def _store(self) -> Optional[aiosqlite.Connection]:
+        if self.path and self._db is None:
+            self._db = await aiosqlite.connect(self.path)
+            await self._db.execute("""
+                CREATE TABLE IF NOT EXISTS tool_cache (
+                    key TEXT PRIMARY KEY,
+                    tool TEXT,
+                    output JSON,
+                    expires_at REAL,
+                    fingerprints JSON
+                )
+            """)
+            await self._db.commit()
+        return self._db
+
+    def _fingerprints(self, policy: CachePolicy, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {p: _fingerprint(params[p]) for p in policy.path_params if p in params}
+
+    def _is_fresh(self, entry: CacheEntry, policy: CachePolicy, params: Dict[str, Any]) -> bool:
+        if entry.expires_at is not None and time.time() >= entry.expires_at:
+            return False
+        current = self._fingerprints(policy, params)
+        return all(tuple(entry.fingerprints.get(p) or ()) == tuple(fp or ()) for p, fp in current.items())
+
+    def _remember(self, key: str, entry: CacheEntry):
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= previous.size
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+
+    async def _lookup(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        db = await self._store()
+        if db is None:
+            return None
+        cursor = await db.execute("SELECT output, expires_at, fingerprints FROM tool_cache WHERE key = ?", (key,))
+        row = await cursor.fetchone()
+        if not row:
+            return None
+        entry = CacheEntry(json.loads(row[0]), row[1], json.loads(row[2]), len(row[0].encode("utf-8")))
+        self._remember(key, entry)
+        return entry
+
+    async def _save(self, key: str, tool_name: str, entry: CacheEntry, output: Optional[str]):
+        self._remember(key, entry)
+        db = await self._store()
+        if db is None or output is None:
+            return  # No persistent tier, or not JSON-serializable: memory tier only
+        await db.execute(
+            "INSERT OR REPLACE INTO tool_cache (key, tool, output, expires_at, fingerprints) VALUES (?, ?, ?, ?, ?)",
+            (key, tool_name, output, entry.expires_at, json.dumps(entry.fingerprints))
+        )
+        await db.commit()
+
+    async def _forget(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+        db = await self._store()
+        if db is not None:
+            await db.execute("DELETE FROM tool_cache WHERE key = ?", (key,))
+            await db.commit()
+
+    async def execute(self, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        policy = self.policies.get(tool_name)
+        if policy is None:
+            return await self.inner.execute(tool_name, params)
+
+        stats = self._stats.setdefault(tool_name, ToolCacheStats())
+        key = cache_key(tool_name, params)
+        entry = await self._lookup(key)
+        if entry is not None:
+            if self._is_fresh(entry, policy, params):
+                stats.hits += 1
+                logger.info("Tool cache hit", tool=tool_name)
+                return {"status": "SUCCESS", "output": entry.output}
+            stats.invalidations += 1
+            await self._forget(key)
+
+        stats.misses += 1
+        # Fingerprint before running so a concurrent modification invalidates the entry
+        fingerprints = self._fingerprints(policy, params)
+        result = await self.inner.execute(tool_name, params)
+        if result.get("status") == "SUCCESS":
+            output, size = _serialize(result["output"])
+            if size > self.max_entry_bytes:
+                logger.info("Tool result too large to cache", tool=tool_name, bytes=size)
+                return result
+            expires_at = time.time() + policy.ttl if policy.ttl is not None else None
+            await self._save(key, tool_name, CacheEntry(result["output"], expires_at, fingerprints, size), output)
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {tool: s.snapshot() for tool, s in self._stats.items()}
+
+    async def close(self):
+        if self._stats:
+            logger.info("Tool cache stats", tools=self.stats())
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+        if hasattr(self.inner, "close"):
+            await self.inner.close()
@@ -1,101 +1,366 @@
+import asyncio
+import functools
+import struct
+import threading
+import time
+from collections import OrderedDict
 import structlog
 import docker
-from typing import Dict, Any
-from taskcraft.executor.base import Executor
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from taskcraft.executor.base import Executor, current_idempotency_key, current_task_id
+from taskcraft.executor.rpc import FrameDecoder, ProtocolError, encode_frame, format_error
 
 logger = structlog.get_logger()
 
+# Exit codes produced by `timeout -s KILL` (124: timed out, 137: killed)
+TIMEOUT_EXIT_CODES = (124, 137)
+
+# Docker multiplexes exec stdout/stderr: 1-byte stream id, 3 pad bytes, 4-byte size
+STREAM_HEADER = struct.Struct(">BxxxL")
+STDERR = 2
+
+class DockerRpcChannel:
+    """
+    Framed RPC session with a `taskcraft.executor.rpc` worker running inside a
+    container. The worker imports the tool modules once; each call is a single
+    request/response round trip over the exec socket.
+    """
+    def __init__(self, client, container, modules: List[str], timeout: float):
+        exec_id = client.api.exec_create(
+            container.id,
+            ["python3", "-m", "taskcraft.executor.rpc", *modules],
+            stdin=True, stdout=True, stderr=True,
+        )["Id"]
+        sock = client.api.exec_start(exec_id, socket=True)
+        self._sock = getattr(sock, "_sock", sock)
+        self._decoder = FrameDecoder()
+        self._inbox: List[Dict[str, Any]] = []
+        self._next_id = 1
+
+        handshake = self._receive(0, timeout)
+        if not handshake.get("ok"):
+            raise ProtocolError(f"Sandbox worker failed to start: {format_error(handshake['error'])}")
+        self.tools = handshake["result"]["tools"]
+
+    def _recv_exactly(self, size: int, deadline: float) -> bytes:
+        data = b""
+        while len(data) < size:
+            self._sock.settimeout(max(deadline - time.monotonic(), 0.001))
+            chunk = self._sock.recv(size - len(data))
+            if not chunk:
+                raise ProtocolError("Sandbox worker closed the channel")
+            data += chunk
+        return data
+
+    def _receive(self, call_id: int, timeout: float) -> Dict[str, Any]:
+        deadline = time.monotonic() + timeout
+        while True:
+            for i, message in enumerate(self._inbox):
+                if message.get("id") == call_id:
+                    return self._inbox.pop(i)
+            stream, size = STREAM_HEADER.unpack(self._recv_exactly(STREAM_HEADER.size, deadline))
+            data = self._recv_exactly(size, deadline)
+            if stream == STDERR:
+                logger.debug("Sandbox worker stderr", output=data.decode("utf-8", errors="replace"))
+                continue
+            self._inbox.extend(self._decoder.feed(data))
+
+    def call(self, tool_name: str, params: Dict[str, Any], timeout: float,
+             idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+        call_id = self._next_id
+        self._next_id += 1
+        request = {"id": call_id, "tool": tool_name, "params": params}
+        if idempotency_key:
+            request["idempotency_key"] = idempotency_key
+        self._sock.sendall(encode_frame(request))
+        return self._receive(call_id, timeout)
+
+    def close(self):
+        try:
+            self._sock.close()
+        except OSError:
+            pass
+
+class PooledContainer:
+    """A long-lived sandbox container that runs commands via `exec_run`."""
+    def __init__(self, container):
+        self.container = container
+        self.uses = 0
+        self.channel: Optional[DockerRpcChannel] = None
+        self.owner: Optional[str] = None # The task it has served; it never serves another
+
+class ContainerPool:
+    """
+    Keeps pre-started, network-disabled containers for one image so tool calls
+    pay exec latency instead of container startup.
+    Containers are never shared between tasks: once a container has served a
+    call for a task (its `owner`) it only goes back to that task, so files,
+    environment changes and background processes a tool leaves behind are
+    never visible to another task or tenant. `warm` keeps `size` fresh
+    containers for new tasks; at most `size` used containers are kept idle,
+    and the least recently active task's are evicted first.
+    Containers are recycled after `max_uses` calls or as soon as a call leaves
+    them dirty (timeout, non-zero exit, exec failure).
+    """
+    def __init__(self, client, image: str, size: int = 2, max_uses: int = 50,
+                 mem_limit: str = "128m", health_check: bool = True,
+                 on_start: Optional[Callable[[PooledContainer], None]] = None):
+        self.client = client
+        self.on_start = on_start
+        self.image = image
+        self.size = size
+        self.max_uses = max_uses
+        self.mem_limit = mem_limit
+        self.health_check = health_check
+        self._idle: List[PooledContainer] = [] # Fresh, never used
+        self._owned: "OrderedDict[Optional[str], List[PooledContainer]]" = OrderedDict() # Owner -> idle, LRU first
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _start(self) -> PooledContainer:
+        container = self.client.containers.run(
+            self.image,
+            entrypoint=["sleep", "infinity"],
+            detach=True,
+            init=True,
+            mem_limit=self.mem_limit,
+            network_disabled=True,
+            labels={"taskcraft.pool": self.image},
+        )
+        logger.info("Started pooled container", image=self.image, container=container.short_id)
+        pooled = PooledContainer(container)
+        if self.on_start:
+            try:
+                self.on_start(pooled)
+            except Exception:
+                self._discard(pooled)
+                raise
+        return pooled
+
+    def _is_healthy(self, pooled: PooledContainer) -> bool:
+        try:
+            pooled.container.reload()
+            return pooled.container.status == "running"
+        except docker.errors.APIError:
+            return False
+
+    def _discard(self, pooled: PooledContainer):
+        if pooled.channel:
+            pooled.channel.close()
+        try:
+            pooled.container.remove(force=True)
+        except docker.errors.APIError as e:
+            logger.warning("Failed to remove pooled container", error=str(e))
+
+    def warm(self):
+        """Starts containers until the pool holds `size` fresh ones."""
+        while True:
+            with self._lock:
+                if self._closed or len(self._idle) >= self.size:
+                    return
+            pooled = self._start()
+            with self._lock:
+                if not self._closed and len(self._idle) < self.size:
+                    self._idle.append(pooled)
+                    continue
+            self._discard(pooled)
+            return
+
+    def needs_warm(self) -> bool:
+        with self._lock:
+            return not self._closed and len(self._idle) < self.size
+
+    def acquire(self, owner: Optional[str] = None) -> PooledContainer:
+        """An idle container that already served `owner`, else a fresh one."""
+        while True:
+            with self._lock:
+                reserved = self._owned.get(owner)
+                if reserved:
+                    pooled = reserved.pop()
+                    if not reserved:
+                        del self._owned[owner]
+                else:
+                    pooled = self._idle.pop() if self._idle else None
+            if pooled is None:
+                pooled = self._start()
+            elif self.health_check and not self._is_healthy(pooled):
+                logger.warning("Dropping unhealthy pooled container", container=pooled.container.short_id)
+                self._discard(pooled)
+                continue
+            pooled.owner = owner
+            return pooled
+
+    def release(self, pooled: PooledContainer, dirty: bool = False):
+        pooled.uses += 1
+        evicted = []
+        with self._lock:
+            keep = not (self._closed or dirty or pooled.uses >= self.max_uses)
+            if keep:
+                self._owned.setdefault(pooled.owner, []).append(pooled)
+                self._owned.move_to_end(pooled.owner)
+                while sum(len(c) for c in self._owned.values()) > self.size:
+                    owner, containers = next(iter(self._owned.items()))
+                    evicted.append(containers.pop(0))
+                    if not containers:
+                        del self._owned[owner]
+        if not keep:
+            evicted.append(pooled)
+        for container in evicted:
+            self._discard(container)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            owned, self._owned = self._owned, OrderedDict()
+        for pooled in idle + [p for containers in owned.values() for p in containers]:
+            self._discard(pooled)
+
 class DockerExecutor(Executor):
     """
     Executes tools inside an isolated Docker container.
     Safe for untrusted tools or code execution.
+    Commands run via `exec_run` in a warm pool of pre-started containers.
+
+    `run_shell` and `run_python` are built in. When `tool_modules` is given, every
+    pooled container also hosts a long-lived RPC worker (see `executor/rpc.py`)
+    that imports those modules once and serves any of their tools; the image
+    must have taskcraft and the modules importable (e.g. the repo's Dockerfile).
+
+    The docker SDK is blocking, so every call to it runs on a bounded thread pool
+    (`max_concurrency` workers); the event loop is never blocked, and at most
+    `max_concurrency` sandboxed calls are in flight. Image pull and pool warm-up
+    start in the background at construction and are awaited by the first call.
     """
-    def __init__(self, image: str = "python:3.12-slim", timeout: int = 30):
-        self.client = docker.from_env()
+    def __init__(self, image: str = "python:3.12-slim", timeout: float = 30,
+                 pool_size: int = 2, max_uses: int = 50, mem_limit: str = "128m",
+                 max_concurrency: int = 4, kill_grace: float = 5.0,
+                 tool_modules: Optional[List[str]] = None, client=None):
+        self.client = client or docker.from_env()
         self.image = image
         self.timeout = timeout
-        
-        # Ensure image exists
+        self.kill_grace = kill_grace
+        self.tool_modules = list(tool_modules or [])
+        self.pool = ContainerPool(
+            self.client, image, size=pool_size, max_uses=max_uses, mem_limit=mem_limit,
+            on_start=self._start_worker if self.tool_modules else None,
+        )
+
+        # +1 worker so the background warm-up never starves tool calls
+        self._threads = ThreadPoolExecutor(max_workers=max_concurrency + 1, thread_name_prefix="taskcraft-docker")
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._ready = self._threads.submit(self._prepare)
+        self._refill = self._ready # Background top-up of fresh containers for new tasks
+
+    def _prepare(self):
+        """Ensures the image exists (pulling if needed) and warms the pool."""
         try:
-            self.client.images.get(image)
+            self.client.images.get(self.image)
         except docker.errors.ImageNotFound:
-            logger.info("Pulling docker image", image=image)
-            self.client.images.pull(image)
+            logger.info("Pulling docker image", image=self.image)
+            self.client.images.pull(self.image)
+        self.pool.warm()
 
-    async def execute(self, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    def _warm(self):
+        try:
+            self.pool.warm()
+        except Exception as e:
+            logger.warning("Sandbox pool refill failed", image=self.image, error=str(e))
+
+    def _start_worker(self, pooled: PooledContainer):
+        pooled.channel = DockerRpcChannel(self.client, pooled.container, self.tool_modules, self.timeout)
+        logger.info("Sandbox RPC worker ready", container=pooled.container.short_id, tools=len(pooled.channel.tools))
+
+    def _kill(self, pooled: PooledContainer):
+        try:
+            pooled.container.kill()
+        except docker.errors.APIError as e:
+            logger.warning("Failed to kill timed out container", error=str(e))
+
+    async def _run_pooled(self, work: Callable[[PooledContainer], Tuple[Dict[str, Any], bool]]) -> Dict[str, Any]:
         """
-        Runs the tool logic inside a container.
-        Note: This is a simplified implementation. Real-world sandboxing requires
-        serializing the tool function and arguments, injecting them into the container,
-        running them, and capturing the output.
+        Runs `work` against a pooled container on the thread pool.
+        `work` returns (result, dirty). If it hasn't returned `kill_grace` seconds
+        after `timeout`, the container is killed and discarded.
         """
+        loop = asyncio.get_running_loop()
+        await asyncio.wrap_future(self._ready)
+        owner = current_task_id.get()
+
+        async with self._slots:
+            pooled = await loop.run_in_executor(self._threads, self.pool.acquire, owner)
+            dirty = True
+            try:
+                try:
+                    result, dirty = await asyncio.wait_for(
+                        loop.run_in_executor(self._threads, work, pooled), self.timeout + self.kill_grace
+                    )
+                except asyncio.TimeoutError:
+                    logger.warning("Sandbox call overran its timeout, killing container",
+                                   container=pooled.container.short_id)
+                    await loop.run_in_executor(None, self._kill, pooled)
+                    return {"status": "ERROR", "error": f"Timed out after {self.timeout}s"}
+                return result
+            finally:
+                await loop.run_in_executor(None, functools.partial(self.pool.release, pooled, dirty=dirty))
+                if self._refill.done() and self.pool.needs_warm():
+                    self._refill = self._threads.submit(self._warm)
+
+    def _command(self, argv: List[str]) -> Callable[[PooledContainer], Tuple[Dict[str, Any], bool]]:
+        """Builds work that runs a command, bounded by `timeout` inside the sandbox."""
+        def work(pooled: PooledContainer):
+            exit_code, output = pooled.container.exec_run(
+                ["timeout", "-s", "KILL", str(self.timeout), *argv]
+            )
+            logs = output.decode("utf-8", errors="replace") if output else ""
+            if exit_code in TIMEOUT_EXIT_CODES:
+                return {"status": "ERROR", "error": f"Timed out after {self.timeout}s\n{logs}"}, True
+            if exit_code == 0:
+                return {"status": "SUCCESS", "output": logs}, False
+            return {"status": "ERROR", "error": logs}, True
+        return work
+
+    def _rpc(self, tool_name: str, params: Dict[str, Any]) -> Callable[[PooledContainer], Tuple[Dict[str, Any], bool]]:
+        """Builds work that calls a Python tool through the container's RPC worker."""
+        # Read on the loop: the thread pool doesn't inherit context variables
+        idempotency_key = current_idempotency_key.get()
+        def work(pooled: PooledContainer):
+            try:
+                if pooled.channel is None:
+                    self._start_worker(pooled)
+                response = pooled.channel.call(tool_name, params, self.timeout, idempotency_key)
+            except (OSError, ProtocolError, docker.errors.APIError) as e:
+                # Channel state is unknown after a transport failure; recycle the container
+                return {"status": "ERROR", "error": f"Sandbox RPC failed: {e}"}, True
+            if response.get("ok"):
+                return {"status": "SUCCESS", "output": response.get("result")}, False
+            return {"status": "ERROR", "error": format_error(response["error"])}, False
+        return work
+
+    async def execute(self, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Runs the tool logic inside a container."""
         logger.info("Executing tool in Docker", tool=tool_name, image=self.image)
-        
+
         try:
-            # For demonstration, we assume 'params' contains a 'command' or 'script' 
-            # if the tool is generic like "run_shell". 
-            # Mapping Python functions to Docker calls requires a specific protocol.
-            # Here we just execute a simple command if possible, or fail for complex Python objects.
-            
-            # Simplified: IF the tool is a shell command wrapper
             if tool_name == "run_shell" and "command" in params:
-                command = params["command"]
-                container = self.client.containers.run(
-                    self.image,
-                    command=["/bin/sh", "-c", command],
-                    detach=True,
-                    mem_limit="128m",
-                    network_disabled=True 
-                )
-                
-                exit_code = container.wait(timeout=self.timeout)
-                logs = container.logs().decode("utf-8")
-                container.remove()
-                
-                if exit_code['StatusCode'] == 0:
-                    return {"status": "SUCCESS", "output": logs}
-                else:
-                    return {"status": "ERROR", "error": logs}
-            
-            # Improved Python Execution Sandbox
+                return await self._run_pooled(self._command(["/bin/sh", "-c", params["command"]]))
+
             if tool_name == "run_python" and "code" in params:
-                code = params["code"]
-                # Wrap code to print output to stdout so we can capture it
-                # We use a simple wrapper that execs the code
-                wrapped_code = f"""
-import sys
-try:
-{code}
-except Exception as e:
-    print(f"ERROR: {{e}}")
-"""
-                # Run python -c "..."
-                # Note: Escaping quotes is tricky. Better to write to a temp file in the container.
-                # For MVP, we pass it as a single string if simple, or assume 'script' file.
-                
-                # Better approach: Write code to file inside container then run
-                cmd = f"python3 -c '{code}'" 
-                
-                container = self.client.containers.run(
-                    self.image,
-                    command=["python3", "-c", code],
-                    detach=True,
-                    mem_limit="128m",
-                    network_disabled=True 
-                )
-                
-                exit_code = container.wait(timeout=self.timeout)
-                logs = container.logs().decode("utf-8")
-                container.remove()
-
-                if exit_code['StatusCode'] == 0:
-                    return {"status": "SUCCESS", "output": logs}
-                else:
-                    return {"status": "ERROR", "error": logs}
+                return await self._run_pooled(self._command(["python3", "-c", params["code"]]))
+
+            if self.tool_modules:
+                return await self._run_pooled(self._rpc(tool_name, params))
 
             # Fallback for complex tools
             return {"status": "ERROR", "error": f"DockerExecutor: Tool '{tool_name}' not supported or protocol mismatch."}
-            
+
         except Exception as e:
             logger.error("Docker execution failed", error=str(e))
             return {"status": "ERROR", "error": str(e)}
+
+    async def close(self):
+        """Removes all pooled containers and stops the worker threads."""
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self.pool.close)
+        self._threads.shutdown(wait=False)
@@ -1,33 +1,113 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import os
 import structlog
-from typing import Dict, Callable, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Callable, Any, Optional
 from datetime import datetime
-from taskcraft.executor.base import Executor
+from taskcraft.executor.base import Executor, bind_idempotency_key
+from taskcraft.executor.process import ProcessExecutor
+from taskcraft.tools.decorators import tool_flags
 
 logger = structlog.get_logger()
 
+def _call_blocking(func: Callable, params: Dict[str, Any]) -> Any:
+    """Runs a tool to completion on a worker thread (coroutines get their own loop)."""
+    result = func(**params)
+    if inspect.isawaitable(result):
+        return asyncio.run(result)
+    return result
+
 class LocalExecutor(Executor):
     """
-    Executes tools in the current process. 
+    Executes tools in the current process.
     Best for local tasks (file organizing) or simple agents.
+
+    Coroutine tools are awaited on the event loop. Plain sync functions, and async
+    tools marked `@blocking_tool`, run on a bounded thread pool (`max_workers`)
+    so slow I/O in one task doesn't stall every other task on the loop.
+    Tools marked `@cpu_bound_tool` go to a process pool (`process_workers`),
+    started on first use. Passing `lane` ("inline", "thread" or "process")
+    overrides the markers for every tool.
     """
-    def __init__(self, tools: Dict[str, Callable]):
+    LANES = ("inline", "thread", "process")
+
+    def __init__(self, tools: Dict[str, Callable], max_workers: Optional[int] = None,
+                 process_workers: Optional[int] = None, process_timeout: float = 300,
+                 process_max_tasks: Optional[int] = 50, lane: Optional[str] = None):
+        if lane is not None and lane not in self.LANES:
+            raise ValueError(f"Unknown lane '{lane}', expected one of {self.LANES}")
         self.tools = tools
+        self.lane = lane
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.process_workers = process_workers
+        self.process_timeout = process_timeout
+        self.process_max_tasks = process_max_tasks
+        self._threads: Optional[ThreadPoolExecutor] = None
+        self._processes: Optional[ProcessExecutor] = None
+
+    @staticmethod
+    def is_blocking(func: Callable) -> bool:
+        return not inspect.iscoroutinefunction(func) or tool_flags(func).get("blocking", False)
+
+    @staticmethod
+    def is_cpu_bound(func: Callable) -> bool:
+        return tool_flags(func).get("cpu_bound", False)
+
+    def lane_for(self, func: Callable) -> str:
+        if self.lane:
+            return self.lane
+        if self.is_cpu_bound(func):
+            return "process"
+        if self.is_blocking(func):
+            return "thread"
+        return "inline"
+
+    def _process_lane(self) -> ProcessExecutor:
+        if self._processes is None:
+            self._processes = ProcessExecutor(
+                self.tools,
+                workers=self.process_workers,
+                timeout=self.process_timeout,
+                max_tasks_per_worker=self.process_max_tasks,
+            )
+        return self._processes
+
+    async def _run_in_thread(self, func: Callable, params: Dict[str, Any]) -> Any:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="taskcraft-tool")
+        # Carry context variables (e.g. task-scoped state) into the worker thread
+        ctx = contextvars.copy_context()
+        call = functools.partial(ctx.run, _call_blocking, func, params)
+        return await asyncio.get_running_loop().run_in_executor(self._threads, call)
 
     async def execute(self, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """
         Executes a tool by name with the given parameters.
         """
         logger.info("Executing tool locally", tool=tool_name)
-        
+
         if tool_name not in self.tools:
             logger.error("Tool not found", tool=tool_name)
             raise ValueError(f"Tool {tool_name} not found")
-            
+
+        func = self.tools[tool_name]
+        lane = self.lane_for(func)
+        if lane == "process":
+            return await self._process_lane().execute(tool_name, params)
+        params = bind_idempotency_key(func, params)
+
         try:
             # Execute
-            func = self.tools[tool_name]
-            result = await func(**params)
-            
+            if lane == "thread":
+                result = await self._run_in_thread(func, params)
+            else:
+                result = func(**params)
+                if inspect.isawaitable(result):
+                    result = await result
+
             return {
                 "status": "SUCCESS",
                 "output": result
@@ -38,3 +118,12 @@ class LocalExecutor(Executor):
                 "status": "ERROR",
                 "error": str(e)
             }
+
+    async def close(self):
+        """Stops the tool thread and process pools."""
+        if self._threads is not None:
+            self._threads.shutdown(wait=False)
+            self._threads = None
+        if self._processes is not None:
+            await self._processes.close()
+            self._processes = None
@@ -0,0 +1,46 @@
+import os
+import structlog
+from typing import Dict, Callable, Any, Optional
+from taskcraft.executor.base import Executor, bind_idempotency_key
+from taskcraft.executor.rpc import format_error
+from taskcraft.executor.workers import WorkerPool
+
+logger = structlog.get_logger()
+
+class ProcessExecutor(Executor):
+    """
+    Executes tools in a pool of forked worker processes.
+    The execution lane for CPU-bound tools: work spreads across cores while the
+    runtime's event loop stays responsive. Arguments and results are pickled;
+    each call has a `timeout`, and workers are recycled after
+    `max_tasks_per_worker` calls to bound leaks in long-running tools.
+    """
+    def __init__(self, tools: Dict[str, Callable], workers: Optional[int] = None, timeout: float = 300,
+                 max_tasks_per_worker: Optional[int] = 50):
+        self.tools = tools
+        self.pool = self._build_pool(tools, workers or os.cpu_count() or 1, timeout, max_tasks_per_worker)
+        self.pool.start()
+
+    def _build_pool(self, tools: Dict[str, Callable], workers: int, timeout: float,
+                    max_tasks_per_worker: Optional[int]) -> WorkerPool:
+        return WorkerPool(tools, workers=workers, timeout=timeout, max_tasks_per_worker=max_tasks_per_worker)
+
+    async def execute(self, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        logger.info("Executing tool in worker process", tool=tool_name)
+
+        if tool_name not in self.tools:
+            logger.error("Tool not found", tool=tool_name)
+            return {"status": "ERROR", "error": f"Tool {tool_name} not found"}
+
+        params = bind_idempotency_key(self.tools[tool_name], params)
+        response = await self.pool.call(tool_name, params)
+        if response.get("ok"):
+            return {"status": "SUCCESS", "output": response.get("result")}
+
+        error = format_error(response["error"])
+        logger.error("Tool execution failed", tool=tool_name, error=error)
+        return {"status": "ERROR", "error": error}
+
+    async def close(self):
+        """Stops all worker processes."""
+        await self.pool.close()
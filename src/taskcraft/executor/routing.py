@@ -0,0 +1,137 @@
+import asyncio
+import time
+import structlog
+from typing import Dict, Callable, Any, Optional
+from taskcraft.config.schema import AgentConfig
+from taskcraft.executor.base import Executor
+
+logger = structlog.get_logger()
+
+class RouteStats:
+    """Call counters and latency for one route."""
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float, ok: bool):
+        self.calls += 1
+        self.errors += 0 if ok else 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "in_flight": self.in_flight,
+            "avg_ms": round(1000 * self.total_seconds / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(1000 * self.max_seconds, 3),
+        }
+
+class RoutingExecutor(Executor):
+    """
+    Dispatches each tool to a configured backend executor.
+    Cheap trusted tools stay in-process while risky ones pay for isolation.
+    Each route can cap its in-flight calls, and per-route call counts and
+    latencies are available from `metrics()`.
+    """
+    def __init__(self, backends: Dict[str, Executor], routes: Dict[str, str], default: str,
+                 concurrency: Optional[Dict[str, int]] = None):
+        missing = {r for r in [default, *routes.values()] if r not in backends}
+        if missing:
+            raise ValueError(f"No backend configured for routes: {sorted(missing)}")
+        self.backends = backends
+        self.routes = routes
+        self.default = default
+        self._limits = {route: asyncio.Semaphore(n) for route, n in (concurrency or {}).items() if n > 0}
+        self._stats = {route: RouteStats() for route in backends}
+
+    def route_for(self, tool_name: str) -> str:
+        return self.routes.get(tool_name, self.default)
+
+    async def execute(self, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        route = self.route_for(tool_name)
+        backend = self.backends[route]
+        stats = self._stats[route]
+        limit = self._limits.get(route)
+
+        if limit:
+            await limit.acquire()
+        stats.in_flight += 1
+        started = time.perf_counter()
+        ok = False
+        try:
+            result = await backend.execute(tool_name, params)
+            ok = result.get("status") == "SUCCESS"
+            return result
+        finally:
+            stats.in_flight -= 1
+            stats.record(time.perf_counter() - started, ok)
+            if limit:
+                limit.release()
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        return {route: stats.snapshot() for route, stats in self._stats.items()}
+
+    async def close(self):
+        logger.info("Executor route metrics", routes=self.metrics())
+        for backend in self.backends.values():
+            if hasattr(backend, "close"):
+                await backend.close()
+
+    @classmethod
+    def from_config(cls, config: AgentConfig, tools: Dict[str, Callable], **options: Any) -> "RoutingExecutor":
+        """
+        Builds the routing table from `ToolConfig.executor` and `ExecutorConfig.routes`,
+        instantiating only the backends that are actually routed to.
+        `options` are passed to backends: tool_threads, process_workers, pool_size, sandbox_image.
+        """
+        routes: Dict[str, str] = {}
+        for tool_cfg in config.tools:
+            if not tool_cfg.executor:
+                continue
+            if tool_cfg.name:
+                routes[tool_cfg.name] = tool_cfg.executor
+            if tool_cfg.module:
+                # Match on the tools' module rather than importing it (tools may be lazy proxies)
+                for name, func in tools.items():
+                    if getattr(func, "__module__", None) == tool_cfg.module:
+                        routes[name] = tool_cfg.executor
+        routes.update(config.executor.routes)
+        routes = {name: route for name, route in routes.items() if name in tools}
+        # Containers import the module of every tool that ends up on docker, however it got there
+        docker_modules = sorted({
+            func.__module__ for name, func in tools.items()
+            if routes.get(name, config.executor.default) == "docker" and getattr(func, "__module__", None)
+        })
+
+        backends: Dict[str, Executor] = {}
+        for route in {config.executor.default, *routes.values()}:
+            backends[route] = cls._build_backend(route, tools, docker_modules, options)
+        return cls(backends, routes, config.executor.default, config.executor.concurrency)
+
+    @staticmethod
+    def _build_backend(route: str, tools: Dict[str, Callable], docker_modules, options: Dict[str, Any]) -> Executor:
+        from taskcraft.executor.local import LocalExecutor
+
+        if route in ("local", *LocalExecutor.LANES):
+            return LocalExecutor(
+                tools,
+                max_workers=options.get("tool_threads"),
+                process_workers=options.get("process_workers"),
+                lane=None if route == "local" else route,
+            )
+        if route == "sandbox":
+            from taskcraft.executor.sandbox import SubprocessExecutor
+            return SubprocessExecutor(tools, workers=options.get("pool_size") or 4)
+        if route == "docker":
+            from taskcraft.executor.docker import DockerExecutor
+            return DockerExecutor(
+                image=options.get("sandbox_image") or "python:3.12-slim",
+                pool_size=options.get("pool_size") or 2,
+                tool_modules=docker_modules,
+            )
+        raise ValueError(f"Unknown executor route '{route}'")
@@ -0,0 +1,128 @@
+"""
+Tool RPC protocol for sandboxed execution.
+
+A long-lived worker (`python -m taskcraft.executor.rpc <module> ...`) imports the
+tool modules once, then serves calls over its stdin/stdout.
+
+Framing: a 4-byte big-endian length followed by a UTF-8 JSON payload.
+    Request:  {"id": 1, "tool": "fetch_incidents", "params": {"week": "2026-W03"}, "idempotency_key": "..."}
+    Response: {"id": 1, "ok": true, "result": "..."}
+              {"id": 1, "ok": false, "error": {"type": "ValueError", "message": "..."}}
+Once its modules are imported the worker sends a handshake with id 0 whose
+result is {"tools": [...]} (or an error if an import failed).
+"""
+import asyncio
+import json
+import os
+import struct
+import sys
+from typing import Any, BinaryIO, Callable, Dict, List, Optional
+
+from taskcraft.executor.base import bind_idempotency_key
+from taskcraft.tools.append_writer import flush_all as flush_appends, pending as appends_pending
+
+HEADER = struct.Struct(">I")
+MAX_FRAME = 64 * 1024 * 1024
+
+class ProtocolError(Exception):
+    """Raised when the peer sends malformed or oversized frames."""
+
+def encode_frame(message: Dict[str, Any]) -> bytes:
+    payload = json.dumps(message, default=str).encode("utf-8")
+    return HEADER.pack(len(payload)) + payload
+
+class FrameDecoder:
+    """Incrementally splits a byte stream into decoded messages."""
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def feed(self, data: bytes) -> List[Dict[str, Any]]:
+        self._buffer.extend(data)
+        messages = []
+        while len(self._buffer) >= HEADER.size:
+            (size,) = HEADER.unpack_from(self._buffer)
+            if size > MAX_FRAME:
+                raise ProtocolError(f"Frame of {size} bytes exceeds limit")
+            end = HEADER.size + size
+            if len(self._buffer) < end:
+                break
+            messages.append(json.loads(bytes(self._buffer[HEADER.size:end])))
+            del self._buffer[:end]
+        return messages
+
+def read_frame(stream: BinaryIO) -> Optional[Dict[str, Any]]:
+    """Reads one message from a blocking binary stream. Returns None on EOF."""
+    header = stream.read(HEADER.size)
+    if not header:
+        return None
+    if len(header) < HEADER.size:
+        raise ProtocolError("Truncated frame header")
+    (size,) = HEADER.unpack(header)
+    if size > MAX_FRAME:
+        raise ProtocolError(f"Frame of {size} bytes exceeds limit")
+    payload = stream.read(size)
+    if len(payload) < size:
+        raise ProtocolError("Truncated frame payload")
+    return json.loads(payload)
+
+def error_response(call_id: int, exc: BaseException) -> Dict[str, Any]:
+    return {"id": call_id, "ok": False, "error": {"type": type(exc).__name__, "message": str(exc)}}
+
+def invoke_tool(tools: Dict[str, Callable], call_id: int, name: str, params: Dict[str, Any],
+                loop: Optional[asyncio.AbstractEventLoop] = None,
+                idempotency_key: Optional[str] = None) -> Dict[str, Any]:
+    """Runs a sync or async tool and wraps the outcome as a response message."""
+    func = tools.get(name)
+    if func is None:
+        return error_response(call_id, LookupError(f"Tool {name} not found"))
+    try:
+        params = bind_idempotency_key(func, params, idempotency_key)
+        result = func(**params)
+        if asyncio.iscoroutine(result):
+            result = (loop or asyncio.new_event_loop()).run_until_complete(result)
+        # Workers answer for a single call: what its tools buffered must be on disk before the reply
+        if appends_pending():
+            flush_appends()
+        return {"id": call_id, "ok": True, "result": result}
+    except Exception as e:
+        return error_response(call_id, e)
+
+def format_error(error: Dict[str, Any]) -> str:
+    return f"{error.get('type', 'Error')}: {error.get('message', '')}"
+
+def serve(modules: List[str], stdin: BinaryIO, stdout: BinaryIO):
+    """Worker main loop: import once, then answer requests until stdin closes."""
+    from taskcraft.config.loader import load_module_tools
+
+    tools: Dict[str, Callable] = {}
+    try:
+        for module in modules:
+            tools.update(load_module_tools(module))
+    except Exception as e:
+        stdout.write(encode_frame(error_response(0, e)))
+        stdout.flush()
+        return
+
+    stdout.write(encode_frame({"id": 0, "ok": True, "result": {"tools": sorted(tools)}}))
+    stdout.flush()
+
+    loop = asyncio.new_event_loop()
+    while True:
+        request = read_frame(stdin)
+        if request is None:
+            break
+        response = invoke_tool(tools, request.get("id", 0), request.get("tool"), request.get("params") or {}, loop,
+                               idempotency_key=request.get("idempotency_key"))
+        stdout.write(encode_frame(response))
+        stdout.flush()
+    loop.close()
+
+def main(argv: List[str]):
+    # Keep the protocol channel private: anything tools print goes to stderr
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    sys.stdout = sys.stderr
+    serve(argv, sys.stdin.buffer, channel)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,55 @@
+import structlog
+from typing import Dict, Callable, Optional
+from taskcraft.executor.process import ProcessExecutor
+from taskcraft.executor.workers import WorkerPool
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+logger = structlog.get_logger()
+
+class SubprocessExecutor(ProcessExecutor):
+    """
+    Executes tools in prewarmed, forked Python worker processes.
+    Docker-free isolation for hosts without a daemon: each worker runs with
+    rlimits on CPU time, address space and open files, inside its own scratch
+    working directory (emptied after every call), and is killed if a call exceeds
+    the wall-clock `timeout`.
+    Tool modules are imported in the parent before forking, so calls skip
+    interpreter startup and imports.
+    """
+    def __init__(self, tools: Dict[str, Callable], workers: int = 4, timeout: float = 30,
+                 cpu_seconds: Optional[int] = 60, memory_mb: Optional[int] = 512,
+                 max_open_files: Optional[int] = 256, max_tasks_per_worker: Optional[int] = 100,
+                 scratch_root: Optional[str] = None):
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.max_open_files = max_open_files
+        self.scratch_root = scratch_root
+        super().__init__(tools, workers=workers, timeout=timeout, max_tasks_per_worker=max_tasks_per_worker)
+
+    def _build_pool(self, tools: Dict[str, Callable], workers: int, timeout: float,
+                    max_tasks_per_worker: Optional[int]) -> WorkerPool:
+        return WorkerPool(
+            tools,
+            workers=workers,
+            timeout=timeout,
+            max_tasks_per_worker=max_tasks_per_worker,
+            setup=self._apply_limits,
+            scratch_root=self.scratch_root,
+            use_scratch=True,
+        )
+
+    def _apply_limits(self):
+        """Runs in each worker right after fork."""
+        if resource is None:
+            return
+        if self.cpu_seconds:
+            resource.setrlimit(resource.RLIMIT_CPU, (self.cpu_seconds, self.cpu_seconds))
+        if self.memory_mb:
+            limit = self.memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        if self.max_open_files:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (self.max_open_files, self.max_open_files))
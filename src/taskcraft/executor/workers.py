@@ -0,0 +1,214 @@
+import asyncio
+import itertools
+import multiprocessing
+import os
+import pickle
+import shutil
+import tempfile
+import structlog
+from typing import Any, Callable, Dict, List, Optional
+
+from taskcraft.executor.rpc import error_response, invoke_tool
+
+logger = structlog.get_logger()
+
+def _clear_dir(path: str):
+    """Removes everything inside `path`, keeping the directory itself (it is the worker's cwd)."""
+    for entry in os.scandir(path):
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path, ignore_errors=True)
+        else:
+            try:
+                os.unlink(entry.path)
+            except OSError:
+                pass
+
+def _worker_main(conn, parent_end, tools: Dict[str, Callable], setup: Optional[Callable[[], None]],
+                 workdir: Optional[str]):
+    """Child loop: answer (call_id, tool, params) requests until told to stop."""
+    parent_end.close()
+    if workdir:
+        os.chdir(workdir)
+    if setup:
+        setup()
+
+    # Workers are forked off the parent's event loop thread, so none is running here
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            break
+        if request is None:
+            break
+        call_id, tool_name, params = request
+        response = invoke_tool(tools, call_id, tool_name, params, loop)
+        try:
+            conn.send(response)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            conn.send(error_response(call_id, TypeError(f"Result is not picklable: {e}")))
+        if workdir:
+            # Each call starts from an empty scratch dir: nothing leaks from one task's call into the next
+            os.chdir(workdir)
+            _clear_dir(workdir)
+    asyncio.set_event_loop(None)
+    loop.close()
+
+class ForkWorker:
+    """A prewarmed child process forked from the parent, with tools already imported."""
+    def __init__(self, ctx, tools: Dict[str, Callable], setup: Optional[Callable[[], None]],
+                 scratch_root: Optional[str], use_scratch: bool):
+        self.workdir = tempfile.mkdtemp(prefix="taskcraft-worker-", dir=scratch_root) if use_scratch else None
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, self.conn, tools, setup, self.workdir), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+
+    def stop(self, kill: bool = False):
+        # Siblings forked later hold copies of our pipe, so EOF alone won't reach
+        # the child; ask it to exit explicitly.
+        if not kill:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        self.conn.close()
+        if kill:
+            self.process.kill()
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        if self.workdir:
+            shutil.rmtree(self.workdir, ignore_errors=True)
+
+class WorkerPool:
+    """
+    A pool of forked worker processes serving tool calls over pipes.
+    Arguments and results are pickled. Each call has a wall-clock `timeout`
+    after which its worker is killed and replaced; workers are also recycled
+    after `max_tasks_per_worker` calls. Tools are inherited through fork, so a
+    call pays neither interpreter startup nor module import. Forking, joining
+    and scratch cleanup run off the event loop.
+    """
+    def __init__(self, tools: Dict[str, Callable], workers: int = 2, timeout: float = 30,
+                 max_tasks_per_worker: Optional[int] = None,
+                 setup: Optional[Callable[[], None]] = None,
+                 scratch_root: Optional[str] = None, use_scratch: bool = False):
+        if "fork" not in multiprocessing.get_all_start_methods():
+            raise RuntimeError("WorkerPool requires the 'fork' start method (Linux/macOS)")
+        self.tools = tools
+        self.workers = workers
+        self.timeout = timeout
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self._setup = setup
+        self._scratch_root = scratch_root
+        self._use_scratch = use_scratch
+        self._ctx = multiprocessing.get_context("fork")
+        self._idle: List[ForkWorker] = []
+        self._slots = asyncio.Semaphore(workers)
+        self._ids = itertools.count(1)
+        self._closed = False
+        self._resolved = False
+        self._warming: Optional[asyncio.Future] = None
+
+    def _resolve_tools(self):
+        """Imports lazily registered tools once, here, so workers inherit them instead of importing after every fork."""
+        if self._resolved:
+            return
+        for name, tool in self.tools.items():
+            resolve = getattr(tool, "resolve", None)
+            if resolve is None:
+                continue
+            try:
+                resolve()
+            except Exception as e:
+                # Left to fail inside the worker, where the call gets an error response
+                logger.warning("Could not import tool before forking", tool=name, error=str(e))
+        self._resolved = True
+
+    def _spawn(self) -> ForkWorker:
+        self._resolve_tools()
+        return ForkWorker(self._ctx, self.tools, self._setup, self._scratch_root, self._use_scratch)
+
+    def _prewarm(self):
+        while len(self._idle) < self.workers:
+            self._idle.append(self._spawn())
+
+    def start(self):
+        """Prewarms the pool up to `workers` processes, on a thread if called from the event loop."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._prewarm()
+            return
+        self._warming = loop.run_in_executor(None, self._prewarm)
+
+    async def _await_prewarm(self):
+        if self._warming is None:
+            return
+        try:
+            # Shielded: a cancelled call must not cancel the prewarm other calls wait on
+            await asyncio.shield(self._warming)
+        except Exception as e:
+            logger.warning("Worker prewarm failed, spawning on demand", error=str(e))
+        self._warming = None
+
+    async def _acquire(self) -> ForkWorker:
+        await self._await_prewarm()
+        while self._idle:
+            worker = self._idle.pop()
+            if worker.process.is_alive():
+                return worker
+            await asyncio.to_thread(worker.stop)
+        return await asyncio.to_thread(self._spawn)
+
+    async def _receive(self, worker: ForkWorker) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        readable = loop.create_future()
+        fd = worker.conn.fileno()
+        loop.add_reader(fd, lambda: readable.done() or readable.set_result(None))
+        try:
+            await asyncio.wait_for(readable, self.timeout)
+        finally:
+            loop.remove_reader(fd)
+        return worker.conn.recv()
+
+    async def call(self, tool_name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        """Runs one tool call in a worker and returns an rpc-style response message."""
+        call_id = next(self._ids)
+        async with self._slots:
+            worker = await self._acquire()
+            healthy = False
+            try:
+                try:
+                    worker.conn.send((call_id, tool_name, params))
+                except (pickle.PicklingError, TypeError, AttributeError) as e:
+                    healthy = True
+                    return error_response(call_id, TypeError(f"Arguments are not picklable: {e}"))
+                response = await self._receive(worker)
+                healthy = True
+                return response
+            except asyncio.TimeoutError:
+                logger.warning("Worker call timed out, killing worker", tool=tool_name, pid=worker.process.pid)
+                return error_response(call_id, TimeoutError(f"Timed out after {self.timeout}s"))
+            except (EOFError, OSError):
+                # Typically a resource limit (CPU/memory) killed the worker
+                await asyncio.to_thread(worker.process.join, 1)
+                code = worker.process.exitcode
+                return error_response(call_id, RuntimeError(f"Worker died (exit code {code})"))
+            finally:
+                worker.tasks += 1
+                recycle = self.max_tasks_per_worker and worker.tasks >= self.max_tasks_per_worker
+                if healthy and not recycle and not self._closed:
+                    self._idle.append(worker)
+                else:
+                    await asyncio.to_thread(worker.stop, not healthy)
+
+    async def close(self):
+        self._closed = True
+        await self._await_prewarm()
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(asyncio.to_thread(worker.stop) for worker in idle))
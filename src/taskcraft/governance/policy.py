@@ -1,6 +1,12 @@
+import os
+import re
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from datetime import datetime
+from urllib.parse import urlparse
 from pydantic import BaseModel
+from taskcraft.config.schema import ParamRuleConfig
+from taskcraft.state.models import ApprovalGrant
 
 class PolicyDecision(BaseModel):
     allowed: bool
@@ -36,14 +42,181 @@ class ApprovalRequiredPolicy(Policy):
             return PolicyDecision(allowed=False, requires_approval=True, reason=f"Tool '{action}' requires human approval.")
         return PolicyDecision(allowed=True)
 
+# A compiled rule check: returns a violation reason, or None if the value is fine.
+ParamPredicate = Callable[[Any], Optional[str]]
+
+def _compile_prefix_check(prefixes: List[str]) -> ParamPredicate:
+    roots = tuple(os.path.realpath(os.path.expanduser(p)) for p in prefixes)
+    # Match whole path components so '/data' does not admit '/database'
+    dirs = tuple(r.rstrip(os.sep) + os.sep for r in roots)
+
+    def check(value: Any) -> Optional[str]:
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        if not values:
+            return f"'{value}' names no path"
+        # Every path must match: one allowed path can't carry others along
+        for item in values:
+            if not isinstance(item, (str, os.PathLike)):
+                return f"'{item}' is not a path"
+            # Resolve symlinks so a link inside an allowed root can't point outside it
+            path = os.path.realpath(os.path.expanduser(os.fspath(item)))
+            if not (path in roots or path.startswith(dirs)):
+                return f"path '{item}' is outside allowed prefixes {list(prefixes)}"
+        return None
+    return check
+
+def _compile_size_check(max_size: int) -> ParamPredicate:
+    def check(value: Any) -> Optional[str]:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            size = value
+        elif hasattr(value, "__len__"):
+            size = len(value)
+        else:
+            return None
+        if size > max_size:
+            return f"size {size} exceeds limit {max_size}"
+        return None
+    return check
+
+# Separators between recipients in a single parameter value
+_RECIPIENT_SEPARATORS = re.compile(r"[,;\s]+")
+
+def _compile_domain_check(domains: List[str]) -> ParamPredicate:
+    allowed = frozenset(d.lower().lstrip("@.") for d in domains)
+    suffixes = tuple("." + d for d in allowed)
+
+    def host_of(item: str) -> Optional[str]:
+        if "://" in item:
+            return urlparse(item).hostname
+        if "@" in item:
+            return item.rsplit("@", 1)[-1]
+        return None # Neither an address nor a URL: can't tell where it goes
+
+    def check(value: Any) -> Optional[str]:
+        values = value if isinstance(value, (list, tuple, set)) else [value]
+        items = [i.strip("<>") for v in values for i in _RECIPIENT_SEPARATORS.split(str(v)) if i.strip("<>")]
+        if not items:
+            return f"'{value}' names no recipient"
+        # Every recipient must match: one allowed address can't carry others along
+        for item in items:
+            host = (host_of(item) or "").lower()
+            if not host or not (host in allowed or host.endswith(suffixes)):
+                return f"'{item}' is outside allowed domains {sorted(allowed)}"
+        return None
+    return check
+
+def compile_param_rule(rule: ParamRuleConfig) -> ParamPredicate:
+    """Compiles a declarative rule into a single predicate over the parameter value."""
+    checks: List[ParamPredicate] = []
+    if rule.allowed_prefixes is not None:
+        checks.append(_compile_prefix_check(rule.allowed_prefixes))
+    if rule.max_size is not None:
+        checks.append(_compile_size_check(rule.max_size))
+    if rule.allowed_domains is not None:
+        checks.append(_compile_domain_check(rule.allowed_domains))
+
+    def predicate(value: Any) -> Optional[str]:
+        for check in checks:
+            reason = check(value)
+            if reason:
+                return reason
+        return None
+    return predicate
+
+def _folder_of(path: str) -> str:
+    return os.path.dirname(path) or "."
+
+def _batch_as_moves(params: dict) -> Iterator[dict]:
+    for op in params.get("operations") or ():
+        if not isinstance(op, dict):
+            continue
+        src = str(op.get("src", ""))
+        if op.get("op") == "rename":
+            folder = _folder_of(src)
+        else:
+            folder = op.get("dest_folder") or _folder_of(str(op.get("dest", "")))
+        yield {"src": src, "dest_folder": folder}
+
+def _organize_as_moves(params: dict) -> Iterator[dict]:
+    path = params.get("path", "")
+    yield {"src": path, "dest_folder": params.get("dest_root") or path}
+
+# Bulk tools and the single-file tool each of their operations stands in for.
+# The rules of that tool are applied to every operation, so a batch can't
+# carry a file somewhere a single call would have been stopped from.
+BULK_TOOLS: Dict[str, Tuple[str, Callable[[dict], Iterator[dict]]]] = {
+    "batch_file_operations": ("move_file", _batch_as_moves),
+    "organize_by_rule": ("move_file", _organize_as_moves),
+}
+
+class ParameterRulePolicy(Policy):
+    """
+    Inspects tool parameters against declarative rules (path prefixes, size limits,
+    recipient domains). Rules are compiled once, so calls to tools without rules,
+    or with benign values, pass with a dict lookup. Operations of the bulk file
+    tools are checked against the rules of `move_file`.
+    """
+    def __init__(self, rules: List[ParamRuleConfig]):
+        self._rules: Dict[str, List[Tuple[str, ParamPredicate, bool]]] = {}
+        for rule in rules:
+            self._rules.setdefault(rule.tool, []).append(
+                (rule.param, compile_param_rule(rule), rule.on_violation == "block")
+            )
+
+    def _calls(self, action: str, params: dict) -> Iterator[Tuple[str, str, dict]]:
+        """(tool whose rules apply, label for reasons, params) for the call and any operations it bundles."""
+        if action in self._rules:
+            yield action, f"Tool '{action}'", params
+        if action in BULK_TOOLS:
+            tool, expand = BULK_TOOLS[action]
+            if tool in self._rules:
+                for op in expand(params):
+                    yield tool, f"Tool '{action}' (as {tool})", op
+
+    def check(self, action: str, params: dict, context: dict) -> PolicyDecision:
+        if action not in self._rules and action not in BULK_TOOLS:
+            return PolicyDecision(allowed=True)
+
+        approval_reason = None
+        for tool, label, values in self._calls(action, params):
+            for param, predicate, block in self._rules[tool]:
+                if param not in values:
+                    continue
+                reason = predicate(values[param])
+                if not reason:
+                    continue
+                reason = f"{label} parameter '{param}': {reason}."
+                if block:
+                    return PolicyDecision(allowed=False, reason=reason)
+                approval_reason = approval_reason or reason
+
+        if approval_reason:
+            return PolicyDecision(allowed=False, requires_approval=True, reason=approval_reason)
+        return PolicyDecision(allowed=True)
+
+def find_grant(grants: Dict[str, List[ApprovalGrant]], action: str, params: dict,
+               now: Optional[datetime] = None) -> Optional[ApprovalGrant]:
+    """Returns an active grant covering this call, if any."""
+    for grant in grants.get(action, ()):
+        if grant.covers(params, now):
+            return grant
+    return None
+
 class PolicyEngine:
-    """Evaluates a list of policies."""
+    """
+    Evaluates a list of policies.
+    Approval-type denials are waived when `context['grants']` holds a matching
+    pre-approval; hard blocks are never waived.
+    """
     def __init__(self, policies: List[Policy]):
         self.policies = policies
 
     def evaluate(self, action: str, params: dict, context: dict) -> PolicyDecision:
+        grants = context.get('grants')
         for policy in self.policies:
             decision = policy.check(action, params, context)
             if not decision.allowed:
+                if decision.requires_approval and grants and find_grant(grants, action, params):
+                    continue
                 return decision
         return PolicyDecision(allowed=True)
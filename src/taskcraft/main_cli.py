@@ -1,45 +1,383 @@
 import argparse
 import asyncio
 import os
-import structlog
+import sys
 import json
-from taskcraft.core.runtime import AgentRuntime
-from taskcraft.state.persistence import SQLiteStateManager
-from taskcraft.governance.policy import PolicyEngine, ApprovalRequiredPolicy, MaxActionsPolicy
-from taskcraft.planner.gemini import GeminiPlanner
-from taskcraft.tools.definitions import write_file, read_file, deploy_prod
-from taskcraft.config.loader import load_config, load_tools
-from taskcraft.observability.logger import configure_logger, get_logger
+from typing import List, Optional, Sequence
+from taskcraft import plugins
 
-# Executor Impls
-from taskcraft.executor.local import LocalExecutor
+# Planners, executors, state backends and the runtime are imported by the commands
+# that use them, so quick commands (status, logs, queue) don't pay for the Gemini SDK.
 
-# Setup logging
-configure_logger()
-logger = get_logger()
+def load_agent(path: str):
+    """Loads an agent config file into (config, tools, policies, tool_modules)."""
+    from taskcraft.config.loader import load_config, load_tools
+    from taskcraft.governance.policy import ApprovalRequiredPolicy, MaxActionsPolicy, ParameterRulePolicy
+    config = load_config(path)
+    tools = load_tools(config)
+    tool_modules = [t.module for t in config.tools if t.module]
+    if any(t.name for t in config.tools):
+        tool_modules.append("taskcraft.tools.definitions")
+    policies = []
+    if config.policies.max_actions:
+        policies.append(MaxActionsPolicy(max_actions=config.policies.max_actions))
+    if config.policies.approval_required:
+        policies.append(ApprovalRequiredPolicy(sensitive_tools=config.policies.approval_required))
+    if config.policies.param_rules:
+        policies.append(ParameterRulePolicy(config.policies.param_rules))
+    return config, tools, policies, tool_modules
+
+def default_agent():
+    """The built-in demo agent used when no config file is given: (config, tools, policies, tool_modules)."""
+    from taskcraft.tools.definitions import write_file, read_file, deploy_prod
+    from taskcraft.governance.policy import ApprovalRequiredPolicy, MaxActionsPolicy
+    tools = {"write_file": write_file, "read_file": read_file, "deploy_prod": deploy_prod}
+    policies = [ApprovalRequiredPolicy(["deploy_prod"]), MaxActionsPolicy(10)]
+    return None, tools, policies, []
+
+def build_executor(args, config, tools, tool_modules):
+    """
+    Executor factory for the run/worker execution flags. Returns (executor, kind).
+    Raises LookupError for an unknown executor name.
+    """
+    from taskcraft.config.schema import CacheConfig
+    executor = None
+    kind = args.executor
+    if kind is None:
+        kind = "routed" if config and config.has_routing() else "local"
+    if kind == "routed":
+         RoutingExecutor = plugins.load(plugins.EXECUTORS, "routed")
+         if not config:
+             raise ValueError("--executor routed requires a config file (-f).")
+         executor = RoutingExecutor.from_config(
+             config, tools,
+             tool_threads=args.tool_threads, process_workers=args.process_workers,
+             pool_size=args.pool_size, sandbox_image=args.sandbox_image,
+         )
+         print(f"🔀 Routing tools: {executor.routes or 'all'} (default: {executor.default})")
+    elif kind == "local":
+         LocalExecutor = plugins.load(plugins.EXECUTORS, "local")
+         executor = LocalExecutor(tools, max_workers=args.tool_threads, process_workers=args.process_workers)
+    elif kind == "docker":
+         DockerExecutor = plugins.load(plugins.EXECUTORS, "docker")
+         # In v1, DockerExecutor behaves differently (serialization gap).
+         # implementing basic fallback or direct usage for now.
+         print("🐳 Using Docker Executor (Sandbox Mode)")
+         executor = DockerExecutor(image=args.sandbox_image, pool_size=args.pool_size, tool_modules=tool_modules)
+    elif kind == "subprocess":
+         SubprocessExecutor = plugins.load(plugins.EXECUTORS, "subprocess")
+         print("🧱 Using Subprocess Executor (Sandbox Mode, no Docker)")
+         executor = SubprocessExecutor(tools, workers=args.pool_size)
+    else:
+         executor = plugins.load(plugins.EXECUTORS, kind)(tools=tools, tool_modules=tool_modules, config=config)
+
+    # Memoize read-only tools in front of whichever executor was chosen
+    cache_config = config.cache if config else CacheConfig()
+    if cache_config.enabled and not args.no_cache:
+         from taskcraft.executor.cache import CachingExecutor, CachePolicy
+         executor = CachingExecutor(
+             executor, tools,
+             max_entries=cache_config.max_entries,
+             max_bytes=cache_config.max_bytes,
+             max_entry_bytes=cache_config.max_entry_bytes,
+             path=cache_config.path,
+             policies={name: CachePolicy(ttl) for name, ttl in cache_config.tools.items()},
+         )
+    return executor, kind
+
+def build_planner(kind: str):
+    """Instantiates a planner by name (built-in or plugin). Raises LookupError if unknown."""
+    return plugins.load(plugins.PLANNERS, kind)()
+
+def parse_grant_match(items: Sequence[str]) -> dict:
+    """
+    Parses `--match PARAM=VALUE` options. Values are read as JSON where they
+    parse (`count=3`, `force=true`), so they compare equal to the typed
+    parameters tools receive; anything else is kept as a string.
+    """
+    match = {}
+    for item in items:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"--match expects PARAM=VALUE, got '{item}'")
+        try:
+            match[key] = json.loads(value)
+        except ValueError:
+            match[key] = value
+    return match
+
+def build_runtime(args, state_manager, config_path: Optional[str]):
+    """
+    Assembles the runtime for the agent config at `config_path` (the built-in
+    defaults if None) from the execution flags.
+    Returns (config, runtime, planner, executor); config is None for the defaults.
+    """
+    from taskcraft.core.runtime import AgentRuntime
+    from taskcraft.governance.policy import PolicyEngine
+    config, tools, policies, tool_modules = load_agent(config_path) if config_path else default_agent()
+    planner = build_planner(args.planner)
+    executor, _ = build_executor(args, config, tools, tool_modules)
+    runtime = AgentRuntime(state_manager, PolicyEngine(policies=policies), executor,
+                           delegate_subtasks=args.delegate_subtasks, lease_seconds=args.lease_seconds)
+    return config, runtime, planner, executor
+
+def command_states(command: str):
+    """The states `resume`, `approve` or `grant` needs a task in before leasing it."""
+    from taskcraft.core.lifecycle import AgentState, RUNNABLE_STATES
+    if command == "approve":
+        return (AgentState.AWAITING_APPROVAL,)
+    if command == "grant":
+        return (AgentState.AWAITING_APPROVAL, *RUNNABLE_STATES)
+    return RUNNABLE_STATES
+
+def lease_refusal(task, command: str) -> str:
+    """Why `lease_task` returned no lease for `command` (resume, approve or grant)."""
+    if task is None:
+        return "Task not found."
+    if task.status in command_states(command):
+        return "⚠️ Task is held by another worker; try again once it stops."
+    if command == "approve":
+        return f"Task is {task.status.name}, not AWAITING_APPROVAL"
+    if command == "grant":
+        return f"Task is {task.status.name}; it will not run again."
+    return f"Task is {task.status.name}; nothing to resume."
+
+async def lease_task(runtime, task_id: str, states):
+    """
+    Leases `task_id` before anything touches it, then reloads it and settles
+    steps an earlier run left RUNNING. Returns (owner, task); owner is None if
+    the task is not in one of `states` or another process holds it, and the
+    task (None if missing) is then returned as stored, unchanged.
+    """
+    from taskcraft.core.worker import default_owner
+    owner = default_owner()
+    state_manager = runtime.state_manager
+    if not await state_manager.claim_task(owner, runtime.lease_seconds, task_id=task_id, states=states):
+        return None, await state_manager.load_task(task_id)
+    try:
+        task = await runtime.resume_task(task_id)
+    except BaseException:
+        await state_manager.release_task(task_id, owner)
+        raise
+    if task.status not in states:
+        await state_manager.release_task(task_id, owner)
+        return None, task
+    return owner, task
+
+async def continue_task(runtime, task, planner, owner: Optional[str] = None, before=None) -> bool:
+    """
+    Runs `task` under a lease held by this process: `owner`'s if the caller
+    already leased it (see `lease_task`), else a fresh claim. `before` is run
+    under the lease ahead of the loop. False if the task isn't runnable or
+    another worker holds it.
+    """
+    if owner is None:
+        from taskcraft.core.worker import default_owner
+        owner = default_owner()
+        if not await runtime.state_manager.claim_task(owner, runtime.lease_seconds, task_id=task.task_id):
+            return False
+    await runtime.run_leased(task, planner, owner, runtime.lease_seconds, before=before)
+    return True
+
+def pending_approval(task):
+    """The step `task` halted on for approval, or None."""
+    return next((s for s in task.steps if s.status == "PENDING_APPROVAL"), None)
+
+async def approve_pending_step(runtime, task, grant_ttl: Optional[float] = None, grant_match: Sequence[str] = ()):
+    """
+    Runs the step a task halted on, bypassing the policy that halted it, and
+    optionally pre-approves further calls. Returns the approved step, or None.
+    Call it under the task's lease (`continue_task(..., before=...)`), so two
+    approvals can't both run the step.
+    """
+    pending_step = pending_approval(task)
+    if pending_step is None:
+        return None
+    if grant_ttl or grant_match:
+        match = {p: pending_step.input_data[p] for p in grant_match if p in pending_step.input_data}
+        await runtime.grant_approval(task, pending_step.name, match, grant_ttl)
+    # Settle the halted step so a later approval doesn't pick it up again
+    pending_step.status = "APPROVED"
+    await runtime.execute_step(task, pending_step.name, pending_step.input_data, bypass_policy=True)
+    return pending_step
+
+async def status_lines(state_manager, task_id: str) -> List[str]:
+    task = await state_manager.load_task(task_id)
+    if not task:
+        return ["Task not found."]
+    lines = [f"Task: {task.task_id}", f"Status: {task.status.name}", f"Steps: {len(task.steps)}"]
+    if task.parent_id:
+        lines.append(f"Parent: {task.parent_id}")
+    children = await state_manager.list_children(task.task_id)
+    if children:
+        done = sum(c.status.name == "COMPLETED" for c in children)
+        lines.append(f"Sub-tasks: {done}/{len(children)} completed")
+    lines.append(f"Created: {task.created_at}")
+    return lines
+
+# Commands that only read the state store: no logging setup, no runtime imports
+READ_ONLY_COMMANDS = ("status", "logs", "queue")
+
+def exec_flags_parser() -> argparse.ArgumentParser:
+    """The execution flags shared by commands that run tasks (a parent parser)."""
+    exec_flags = argparse.ArgumentParser(add_help=False)
+    exec_flags.add_argument("--executor", default=None,
+                            help="Execution environment: local, docker, subprocess, routed, or an installed plugin "
+                                 "(default: routed if the config declares executor routes, else local)")
+    exec_flags.add_argument("--planner", default="gemini", help="Reasoning engine: gemini, tot, or an installed plugin")
+    exec_flags.add_argument("--tool-threads", type=int, default=None, help="Thread pool size for blocking tools (local executor)")
+    exec_flags.add_argument("--process-workers", type=int, default=None, help="Process pool size for CPU-bound tools (local executor)")
+    exec_flags.add_argument("--pool-size", type=int, default=2, help="Warm sandbox containers kept per image (docker executor)")
+    exec_flags.add_argument("--sandbox-image", type=str, default="python:3.12-slim",
+                            help="Sandbox image; must have taskcraft installed to serve Python tools")
+    exec_flags.add_argument("--no-cache", action="store_true", help="Disable memoization of cacheable tool results")
+    exec_flags.add_argument("--lease-seconds", type=float, default=30.0,
+                            help="Task lease length; a task whose worker stops heartbeating is reclaimed after this")
+    exec_flags.add_argument("--delegate-subtasks", action="store_true",
+                            help="Leave spawned sub-tasks to 'taskcraft worker' processes instead of running them here")
+    return exec_flags
+
+# Execution flags a daemon must share with a client that sets them (see client_settings)
+EXEC_SETTINGS = ("executor", "planner", "tool_threads", "process_workers", "pool_size", "sandbox_image",
+                 "no_cache", "lease_seconds", "delegate_subtasks")
+
+def state_location(backend: str) -> str:
+    """Where `backend` keeps its state, from the same environment the backends are built from."""
+    if backend == "sqlite":
+        return os.path.abspath(os.getenv("SQLITE_DB_PATH", "taskcraft_state.db"))
+    if backend == "postgres":
+        return os.getenv("DATABASE_URL", "")
+    return ""
+
+def daemon_settings(args) -> dict:
+    """Everything a daemon started with `args` serves with: state store and execution flags."""
+    defaults = exec_flags_parser()
+    settings = {"backend": args.backend, "state": state_location(args.backend)}
+    settings.update({name: getattr(args, name, defaults.get_default(name)) for name in EXEC_SETTINGS})
+    return settings
+
+def client_settings(args) -> dict:
+    """
+    What a daemon must match to run this command: the state store, and every
+    execution flag given a non-default value (flags left at their defaults
+    take the daemon's).
+    """
+    defaults = exec_flags_parser()
+    settings = {"backend": args.backend, "state": state_location(args.backend)}
+    for name in EXEC_SETTINGS:
+        if hasattr(args, name) and getattr(args, name) != defaults.get_default(name):
+            settings[name] = getattr(args, name)
+    return settings
+
+# Commands a running `taskcraft serve` daemon handles for the CLI
+DAEMON_COMMANDS = ("run", "resume", "approve", "status")
+
+def daemon_request(args) -> dict:
+    """The daemon command for parsed CLI args (one of DAEMON_COMMANDS)."""
+    if args.command == "run":
+        request = {"command": "run", "objective": args.objective, "priority": args.priority, "wait": not args.detach,
+                   "config_path": os.path.abspath(args.file) if args.file else None}
+    elif args.command == "approve":
+        request = {"command": "approve", "task_id": args.task_id, "grant_ttl": args.grant_ttl,
+                   "grant_match": args.grant_match}
+    else:
+        request = {"command": args.command, "task_id": args.task_id}
+    request["settings"] = client_settings(args)
+    return request
+
+async def forward_to_daemon(args) -> bool:
+    """
+    Sends the command to a running daemon and prints its answer.
+    False if no daemon is listening on the socket, or it serves with other
+    settings than this command asks for, so the caller runs it locally.
+    """
+    from taskcraft import daemon
+    socket_path = args.socket or daemon.default_socket_path()
+    if not os.path.exists(socket_path):
+        return False
+    try:
+        response = await daemon.request(socket_path, daemon_request(args))
+    except (ConnectionRefusedError, FileNotFoundError):
+        return False # Stale socket: the daemon is gone
+    if response.get("mismatch"):
+        names = [{"state": "state store"}.get(k, "--" + k.replace("_", "-")) for k in response["mismatch"]]
+        print(f"ℹ️ The daemon serves with a different {', '.join(names)}; running here instead.", file=sys.stderr)
+        return False
+    if not response.get("ok"):
+        print(f"❌ Error: {response.get('error')}")
+    for line in response.get("lines", []):
+        print(line)
+    return True
 
 async def run_cli():
     parser = argparse.ArgumentParser(description="TaskCraft: Gemini Agent Runtime")
     
     # Global Flags
-    parser.add_argument("--backend", choices=["sqlite", "postgres"], default="sqlite", help="State backend")
+    parser.add_argument("--backend", default="sqlite", help="State backend: sqlite, postgres, or an installed plugin")
+    parser.add_argument("--socket", default=None,
+                        help="Daemon control socket (default: $TASKCRAFT_SOCKET or ~/.taskcraft/daemon.sock)")
+    parser.add_argument("--no-daemon", action="store_true",
+                        help="Run run/resume/approve/status in this process even if a daemon is serving")
     
     subparsers = parser.add_subparsers(dest="command")
 
+    # Execution flags shared by commands that run tasks
+    exec_flags = exec_flags_parser()
+
     # Command: Run
-    run_parser = subparsers.add_parser("run", help="Start a new task")
+    run_parser = subparsers.add_parser("run", help="Start a new task", parents=[exec_flags])
     run_parser.add_argument("--objective", "-o", type=str, help="The goal for the agent")
     run_parser.add_argument("--file", "-f", type=str, help="Path to agent configuration file (YAML)")
-    run_parser.add_argument("--executor", choices=["local", "docker"], default="local", help="Execution environment")
-    run_parser.add_argument("--planner", choices=["gemini", "tot"], default="gemini", help="Reasoning engine")
+    run_parser.add_argument("--enqueue", action="store_true", help="Only create the task; a 'taskcraft worker' will run it")
+    run_parser.add_argument("--priority", choices=["interactive", "normal", "batch"], default=None,
+                            help="Dispatch priority class (default: the config's scheduling.priority)")
+    run_parser.add_argument("--detach", action="store_true",
+                            help="With a daemon: return once the task starts instead of when it stops")
+
+    # Command: Run Batch
+    batch_parser = subparsers.add_parser("run-batch", help="Create and run many tasks in one process",
+                                         parents=[exec_flags])
+    batch_parser.add_argument("input", type=str, help="Objectives: JSONL (one per line) or CSV with an 'objective' column")
+    batch_parser.add_argument("--file", "-f", type=str, help="Path to agent configuration file (YAML)")
+    batch_parser.add_argument("--concurrency", "-c", type=int, default=8, help="Max tasks running at once")
+    batch_parser.add_argument("--enqueue", action="store_true", help="Only create the tasks; workers will run them")
+    batch_parser.add_argument("--priority", choices=["interactive", "normal", "batch"], default=None,
+                              help="Dispatch priority class (default: the config's scheduling.priority)")
+
+    # Command: Worker
+    worker_parser = subparsers.add_parser("worker", help="Claim and run queued tasks from the shared state store",
+                                          parents=[exec_flags])
+    worker_parser.add_argument("--max-tasks", type=int, default=None, help="Exit after running N tasks")
+    worker_parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to wait when the queue is empty")
+
+    # Command: Serve
+    serve_parser = subparsers.add_parser("serve", help="Keep agent runtimes warm and serve CLI commands over a socket",
+                                         parents=[exec_flags])
+    serve_parser.add_argument("configs", nargs="*", help="Agent configuration files (YAML) to load at startup")
+    serve_parser.add_argument("--reload-interval", type=float, default=2.0,
+                              help="Seconds between checks for changed config files")
+
+    # Command: Queue
+    subparsers.add_parser("queue", help="Show queue depth and wait times per priority class")
 
     # Command: Resume
-    resume_parser = subparsers.add_parser("resume", help="Resume a task")
+    resume_parser = subparsers.add_parser("resume", help="Resume a task", parents=[exec_flags])
     resume_parser.add_argument("task_id", type=str, help="The ID of the task to resume")
 
     # Command: Approve
-    approve_parser = subparsers.add_parser("approve", help="Approve a blocked task")
+    approve_parser = subparsers.add_parser("approve", help="Approve a blocked task", parents=[exec_flags])
     approve_parser.add_argument("task_id", type=str, help="The ID of the task to approve")
+    approve_parser.add_argument("--grant-ttl", type=float, help="Also pre-approve further calls to this tool for N seconds")
+    approve_parser.add_argument("--grant-match", action="append", default=[], metavar="PARAM",
+                                help="Limit the grant to calls with the same value for PARAM (repeatable)")
+
+    # Command: Grant
+    grant_parser = subparsers.add_parser("grant", help="Pre-approve a tool for a task")
+    grant_parser.add_argument("task_id", type=str, help="The ID of the task")
+    grant_parser.add_argument("tool", type=str, help="The tool to pre-approve")
+    grant_parser.add_argument("--match", action="append", default=[], metavar="PARAM=VALUE",
+                              help="Only cover calls where PARAM equals VALUE (repeatable)")
+    grant_parser.add_argument("--ttl", type=float, help="Grant lifetime in seconds (default: task lifetime)")
 
     # Command: Status
     status_parser = subparsers.add_parser("status", help="Get status of a task")
@@ -54,38 +392,51 @@ async def run_cli():
     if not args.command:
         parser.print_help()
         return
+    if (args.command in DAEMON_COMMANDS and not args.no_daemon and not getattr(args, "enqueue", False)
+            and await forward_to_daemon(args)):
+        return
+    if args.command not in READ_ONLY_COMMANDS:
+        from taskcraft.observability.logger import configure_logger
+        configure_logger()
 
     # 1. Init Infrastructure (Factory)
     state_manager = None
+    try:
+        backend = plugins.load(plugins.STATE_BACKENDS, args.backend)
+    except LookupError as e:
+        print(f"❌ Error: {e}")
+        return
     if args.backend == "sqlite":
         db_path = os.getenv("SQLITE_DB_PATH", "taskcraft_state.db")
-        state_manager = SQLiteStateManager(db_path)
+        state_manager = backend(db_path)
     elif args.backend == "postgres":
-        from taskcraft.state.postgres import PostgresStateManager
         db_url = os.getenv("DATABASE_URL")
         if not db_url:
             print("❌ Error: DATABASE_URL must be set for postgres backend.")
             return
-        state_manager = PostgresStateManager(db_url)
-    
+        state_manager = backend(db_url)
+    else:
+        state_manager = backend()
+
     await state_manager.initialize()
 
     # 2. Command Handling
     if args.command == "run":
+        from taskcraft.core.runtime import AgentRuntime
+        from taskcraft.core.worker import default_owner
+        from taskcraft.governance.policy import PolicyEngine
+        from taskcraft.executor.local import LocalExecutor
         # Load Config & Tools
         tools = {}
+        tool_modules = []
         policies = []
+        config = None
         config_name = "Agent"
         
         if args.file:
             print(f"📂 Loading configuration from {args.file}...")
             try:
-                config = load_config(args.file)
-                tools = load_tools(config)
-                if config.policies.max_actions:
-                    policies.append(MaxActionsPolicy(max_actions=config.policies.max_actions))
-                if config.policies.approval_required:
-                    policies.append(ApprovalRequiredPolicy(sensitive_tools=config.policies.approval_required))
+                config, tools, policies, tool_modules = load_agent(args.file)
                 task_objective = args.objective if args.objective else config.objective
                 config_name = config.name
             except Exception as e:
@@ -95,94 +446,231 @@ async def run_cli():
             if not args.objective:
                 print("❌ Error: --objective is required.")
                 return
-            tools = {"write_file": write_file, "read_file": read_file, "deploy_prod": deploy_prod}
-            policies = [ApprovalRequiredPolicy(["deploy_prod"]), MaxActionsPolicy(10)]
+            _, tools, policies, tool_modules = default_agent()
             task_objective = args.objective
 
+        metadata = {"agent": config_name}
+        if args.file:
+            metadata["config_path"] = os.path.abspath(args.file)
+        scheduling = {
+            "tenant": config_name,
+            "priority": args.priority or (config.scheduling.priority if config else "normal"),
+            "weight": config.scheduling.weight if config else 1.0,
+        }
+
+        if args.enqueue:
+            runtime = AgentRuntime(state_manager, PolicyEngine(policies=policies), LocalExecutor({}))
+            task = await runtime.create_task(task_objective, metadata, **scheduling)
+            print(f"📥 Queued task {task.task_id}; start workers with 'taskcraft worker'.")
+            return
+
         policy_engine = PolicyEngine(policies=policies)
 
-        # Factory: Executor
-        executor = None
-        if args.executor == "local":
-             executor = LocalExecutor(tools)
-        elif args.executor == "docker":
-             from taskcraft.executor.docker import DockerExecutor
-             # In v1, DockerExecutor behaves differently (serialization gap).
-             # implementing basic fallback or direct usage for now.
-             print("🐳 Using Docker Executor (Sandbox Mode)")
-             executor = DockerExecutor() 
-             # Warning: We are passing tools to DockerExecutor but v1 implementation 
-             # needs better protocol. For now, it runs 'run_shell'.
-
-        # Factory: Planner
-        planner = None
-        if args.planner == "gemini":
-            planner = GeminiPlanner()
-        elif args.planner == "tot":
-            from taskcraft.planner.tot import TreeOfThoughtsPlanner
-            planner = TreeOfThoughtsPlanner()
+        # Factory: Planner, then Executor (which may start worker pools)
+        try:
+            planner = build_planner(args.planner)
+            executor, args.executor = build_executor(args, config, tools, tool_modules)
+        except (ValueError, LookupError) as e:
+            print(f"❌ Error: {e}")
+            return
 
         # Runtime
         print(f"🤖 Agent: {config_name} | Backend: {args.backend} | Executor: {args.executor}")
-        runtime = AgentRuntime(state_manager, policy_engine, executor)
+        runtime = AgentRuntime(state_manager, policy_engine, executor,
+                               delegate_subtasks=args.delegate_subtasks, lease_seconds=args.lease_seconds)
 
         print(f"🚀 Starting task: {task_objective}")
-        task = await runtime.create_task(task_objective)
-        
-        await runtime.run_loop(task, planner)
+        task = await runtime.create_task(task_objective, metadata, **scheduling)
+
+        # Hold a lease while running so workers sharing the DB leave this task alone
+        owner = default_owner()
+        try:
+            if await state_manager.claim_task(owner, args.lease_seconds, task_id=task.task_id):
+                await runtime.run_leased(task, planner, owner, args.lease_seconds)
+            else:
+                print("⚠️ Task was claimed by a worker before this process could start it.")
+        finally:
+            if hasattr(executor, "close"):
+                await executor.close()
         print(f"🏁 Task finished with status: {task.status.name}")
         if task.status.name == "AWAITING_APPROVAL":
             print(f"✋ Task halted. Use 'taskcraft approve {task.task_id}' to continue.")
 
-    elif args.command == "resume" or args.command == "approve":
-        # Simplified Resume Logic (Recreating runtime components)
-        # Note: In a real distributed system, the worker process would self-assemble based on config.
-        # Here we default to LocalExecutor + GeminiPlanner for simple resumption.
-        
-        print(f"Runnning command: {args.command} on {args.task_id}")
-        
-        # Tools Hack for Demo (Incident Reporter)
-        from examples.incident_tools import send_report, fetch_incidents
-        tools = {"send_report": send_report, "fetch_incidents": fetch_incidents}
-        
-        executor = LocalExecutor(tools)
-        planner = GeminiPlanner()
-        policy_engine = PolicyEngine([]) # Relaxed policy or reloaded
+    elif args.command == "run-batch":
+        from taskcraft.core.batch import read_objectives, run_batch
+        from taskcraft.core.runtime import AgentRuntime
+        from taskcraft.governance.policy import PolicyEngine
+        from taskcraft.executor.local import LocalExecutor
+        try:
+            objectives = read_objectives(args.input)
+            if args.file:
+                config, tools, policies, tool_modules = load_agent(args.file)
+            else:
+                config, tools, policies, tool_modules = default_agent()
+        except Exception as e:
+            print(f"❌ Error loading batch: {e}")
+            return
 
-        runtime = AgentRuntime(state_manager, policy_engine, executor)
-        
-        if args.command == "resume":
-             task = await runtime.resume_task(args.task_id)
-             if task.status.name == "COMPLETED":
-                 print("Task already completed")
-             else:
-                 await runtime.run_loop(task, planner)
-                 
-        elif args.command == "approve":
-             task = await runtime.resume_task(args.task_id)
-             if task.status.name != "AWAITING_APPROVAL":
-                  print(f"Task is {task.status.name}, not AWAITING_APPROVAL")
-                  return
-                  
-             pending_step = next((s for s in task.steps if s.status == "PENDING_APPROVAL"), None)
-             if pending_step:
-                 print(f"Approving step: {pending_step.name}")
-                 await runtime.execute_step(task, pending_step.name, pending_step.input_data)
-                 # Reload & Continue
-                 task.status = "EXECUTING"
-                 await runtime.run_loop(task, planner)
-             else:
-                 print("No pending steps.")
+        config_name = config.name if config else "Agent"
+        metadata = {"agent": config_name}
+        if args.file:
+            metadata["config_path"] = os.path.abspath(args.file)
+        scheduling = {
+            "tenant": config_name,
+            "priority": args.priority or (config.scheduling.priority if config else "batch"),
+            "weight": config.scheduling.weight if config else 1.0,
+        }
 
-    elif args.command == "status":
+        if args.enqueue:
+            runtime = AgentRuntime(state_manager, PolicyEngine(policies=policies), LocalExecutor({}))
+            tasks = await runtime.create_tasks(objectives, metadata, **scheduling)
+            print(f"📥 Queued {len(tasks)} tasks; start workers with 'taskcraft worker'.")
+            return
+
+        try:
+            planner = build_planner(args.planner)
+            executor, args.executor = build_executor(args, config, tools, tool_modules)
+        except (ValueError, LookupError) as e:
+            print(f"❌ Error: {e}")
+            return
+        runtime = AgentRuntime(state_manager, PolicyEngine(policies=policies), executor,
+                               delegate_subtasks=args.delegate_subtasks, lease_seconds=args.lease_seconds)
+
+        print(f"🤖 Agent: {config_name} | Backend: {args.backend} | Executor: {args.executor}")
+        tasks = await runtime.create_tasks(objectives, metadata, **scheduling)
+        print(f"🚀 Running {len(tasks)} tasks (concurrency {args.concurrency})")
+        try:
+            summary = await run_batch(runtime, planner, tasks, concurrency=args.concurrency,
+                                      lease_seconds=args.lease_seconds)
+        finally:
+            if hasattr(executor, "close"):
+                await executor.close()
+        print(f"🏁 {summary.render()}")
+
+    elif args.command == "worker":
+        from taskcraft.core.worker import TaskWorker
+        try:
+            plugins.load(plugins.PLANNERS, args.planner)
+        except LookupError as e:
+            print(f"❌ Error: {e}")
+            return
+        # One runtime per agent config, built on first use; tasks without a config get the defaults
+        runtimes = {}
+        executors = []
+
+        async def resolve(task):
+            path = task.metadata.get("config_path")
+            if path not in runtimes:
+                _, runtime, _, executor = build_runtime(args, state_manager, path)
+                executors.append(executor)
+                runtimes[path] = runtime
+            return runtimes[path], build_planner(args.planner)
+
+        worker = TaskWorker(state_manager, resolve, lease_seconds=args.lease_seconds, poll_interval=args.poll_interval)
+        print(f"👷 Worker {worker.owner} polling for tasks (backend: {args.backend})")
+        try:
+            done = await worker.run(max_tasks=args.max_tasks)
+        finally:
+            for executor in executors:
+                if hasattr(executor, "close"):
+                    await executor.close()
+        print(f"🏁 Worker ran {done} task(s)")
+
+    elif args.command == "resume" or args.command == "approve":
         task = await state_manager.load_task(args.task_id)
         if not task:
             print("Task not found.")
             return
-        print(f"Task: {task.task_id}")
-        print(f"Status: {task.status.name}")
-        print(f"Steps: {len(task.steps)}")
-        print(f"Created: {task.created_at}")
+        # Reassemble the agent the task was started with (its config file, or the defaults)
+        try:
+            _, runtime, planner, executor = build_runtime(args, state_manager, task.metadata.get("config_path"))
+        except Exception as e:
+            print(f"❌ Error loading agent: {e}")
+            return
+        try:
+            # Lease before reconciling or approving, so a concurrent resume/approve can't run it too
+            owner, task = await lease_task(runtime, args.task_id, command_states(args.command))
+            if owner is None:
+                print(lease_refusal(task, args.command))
+                return
+            approve = None
+            if args.command == "approve":
+                pending_step = pending_approval(task)
+                if pending_step is None:
+                    await state_manager.release_task(task.task_id, owner)
+                    print("No pending steps.")
+                    return
+                print(f"Approved step: {pending_step.name}")
+                if args.grant_ttl or args.grant_match:
+                    print(f"🔑 Pre-approved further '{pending_step.name}' calls")
+                approve = lambda: approve_pending_step(runtime, task, args.grant_ttl, args.grant_match)
+            await continue_task(runtime, task, planner, owner=owner, before=approve)
+        finally:
+            if hasattr(executor, "close"):
+                await executor.close()
+        print(f"🏁 Task finished with status: {task.status.name}")
+        if task.status.name == "AWAITING_APPROVAL":
+            print(f"✋ Task halted. Use 'taskcraft approve {task.task_id}' to continue.")
+
+    elif args.command == "grant":
+        try:
+            match = parse_grant_match(args.match)
+        except ValueError as e:
+            print(f"❌ Error: {e}")
+            return
+        from taskcraft.core.runtime import AgentRuntime
+        from taskcraft.governance.policy import PolicyEngine
+        from taskcraft.executor.local import LocalExecutor
+        runtime = AgentRuntime(state_manager, PolicyEngine([]), LocalExecutor({}))
+        # Saving the task rewrites its steps too; lease it so a running worker's progress isn't overwritten
+        owner, task = await lease_task(runtime, args.task_id, command_states(args.command))
+        if owner is None:
+            print(lease_refusal(task, args.command))
+            return
+        try:
+            grant = await runtime.grant_approval(task, args.tool, match, args.ttl)
+        finally:
+            await state_manager.release_task(task.task_id, owner)
+        print(f"🔑 Granted '{args.tool}' for task {task.task_id} (grant {grant.grant_id}, expires: {grant.expires_at or 'never'})")
+
+    elif args.command == "serve":
+        import signal
+        from taskcraft.daemon import TaskcraftDaemon, default_socket_path
+        try:
+            plugins.load(plugins.PLANNERS, args.planner)
+        except LookupError as e:
+            print(f"❌ Error: {e}")
+            return
+        server = TaskcraftDaemon(state_manager, args, args.socket or default_socket_path(),
+                                 config_paths=args.configs, reload_interval=args.reload_interval)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        try:
+            await server.start()
+        except Exception as e:
+            print(f"❌ Error starting daemon: {e}")
+            await server.close()
+            return
+        print(f"🛰️ Serving {len(server.hosts)} agent(s) on {server.socket_path} (backend: {args.backend})")
+        try:
+            await stop.wait()
+        finally:
+            await server.close()
+        print("👋 Daemon stopped")
+
+    elif args.command == "queue":
+        from taskcraft.core.scheduler import PRIORITY_CLASSES
+        stats = await state_manager.queue_stats()
+        print(f"{'CLASS':<12} {'DEPTH':>6} {'RUNNING':>8} {'OLDEST WAIT':>12} {'AVG WAIT':>10}")
+        for priority in PRIORITY_CLASSES:
+            s = stats.get(priority, {"depth": 0, "in_flight": 0, "oldest_wait_s": 0.0, "avg_wait_s": 0.0})
+            print(f"{priority:<12} {s['depth']:>6} {s['in_flight']:>8} {s['oldest_wait_s']:>11.1f}s {s['avg_wait_s']:>9.1f}s")
+
+    elif args.command == "status":
+        for line in await status_lines(state_manager, args.task_id):
+            print(line)
 
     elif args.command == "logs":
         task = await state_manager.load_task(args.task_id)
@@ -0,0 +1,70 @@
+"""
+Plugin registry for planners, executors and state backends.
+
+Components are named by "module:attribute" strings and only imported when
+selected, so a CLI command pays for the backends it uses and nothing else
+(e.g. `status` never imports the Gemini SDK). Third-party packages add
+components through entry points:
+
+    [project.entry-points."taskcraft.planners"]
+    my_llm = "my_pkg.planner:MyPlanner"
+
+Planner plugins are called with no arguments. Executor plugins are called as
+`factory(tools=..., tool_modules=..., config=...)`. State backend plugins are
+called with no arguments and configure themselves from the environment.
+Built-in names win over entry points with the same name.
+"""
+import importlib
+from typing import Any, Dict, List
+
+PLANNERS = "taskcraft.planners"
+EXECUTORS = "taskcraft.executors"
+STATE_BACKENDS = "taskcraft.state_backends"
+
+BUILTINS: Dict[str, Dict[str, str]] = {
+    PLANNERS: {
+        "gemini": "taskcraft.planner.gemini:GeminiPlanner",
+        "tot": "taskcraft.planner.tot:TreeOfThoughtsPlanner",
+    },
+    EXECUTORS: {
+        "local": "taskcraft.executor.local:LocalExecutor",
+        "routed": "taskcraft.executor.routing:RoutingExecutor",
+        "docker": "taskcraft.executor.docker:DockerExecutor",
+        "subprocess": "taskcraft.executor.sandbox:SubprocessExecutor",
+    },
+    STATE_BACKENDS: {
+        "sqlite": "taskcraft.state.persistence:SQLiteStateManager",
+        "postgres": "taskcraft.state.postgres:PostgresStateManager",
+    },
+}
+
+def _entry_points(group: str) -> Dict[str, Any]:
+    # importlib.metadata scans every installed distribution: only pay for it on a miss
+    from importlib.metadata import entry_points
+    return {ep.name: ep for ep in entry_points(group=group)}
+
+def available(group: str) -> List[str]:
+    """Names that can be passed to `load` for `group`: built-ins first, then installed plugins."""
+    builtins = list(BUILTINS.get(group, {}))
+    return builtins + sorted(n for n in _entry_points(group) if n not in builtins)
+
+def _import(target: str) -> Any:
+    module, _, attr = target.partition(":")
+    obj = importlib.import_module(module)
+    for part in attr.split(".") if attr else ():
+        obj = getattr(obj, part)
+    return obj
+
+def load(group: str, name: str) -> Any:
+    """
+    Imports and returns the component registered as `name` in `group`.
+    Raises LookupError (listing the available names) if there is none.
+    """
+    target = BUILTINS.get(group, {}).get(name)
+    if target:
+        return _import(target)
+    entry_point = _entry_points(group).get(name)
+    if entry_point is None:
+        raise LookupError(f"Unknown {group.rsplit('.', 1)[-1][:-1].replace('_', ' ')} '{name}' "
+                          f"(available: {', '.join(available(group))})")
+    return entry_point.load()
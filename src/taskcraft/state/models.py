@@ -1,10 +1,13 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Literal
 from datetime import datetime
 from pydantic import BaseModel, Field
 import uuid
 
 from taskcraft.core.lifecycle import AgentState
 
+# Dispatch priority classes, highest first (see core/scheduler.py)
+PriorityClass = Literal["interactive", "normal", "batch"]
+
 def generate_id():
     return str(uuid.uuid4())
 
@@ -20,6 +23,28 @@ class Step(BaseModel):
     error: Optional[str] = None
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
+    idempotency_key: Optional[str] = None  # Passed to tools that accept it; keys the result journal
+    retries: int = 0  # Tool retries spent on this step (counted against the task's retry budget)
+
+class ApprovalGrant(BaseModel):
+    """
+    A scoped, time-bounded pre-approval for a tool.
+    Calls to `tool` whose parameters equal every value in `match_params`
+    skip the approval halt until `expires_at`.
+    """
+    grant_id: str = Field(default_factory=generate_id)
+    tool: str
+    match_params: Dict[str, Any] = Field(default_factory=dict)
+    expires_at: Optional[datetime] = None  # None = valid for the task's lifetime
+    created_at: datetime = Field(default_factory=datetime.now)
+
+    def is_expired(self, now: Optional[datetime] = None) -> bool:
+        return self.expires_at is not None and (now or datetime.now()) >= self.expires_at
+
+    def covers(self, params: Dict[str, Any], now: Optional[datetime] = None) -> bool:
+        if self.is_expired(now):
+            return False
+        return all(k in params and params[k] == v for k, v in self.match_params.items())
 
 class Task(BaseModel):
     """Represents a high-level user request or task."""
@@ -29,8 +54,18 @@ class Task(BaseModel):
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
     metadata: Dict[str, Any] = Field(default_factory=dict)
+
+    parent_id: Optional[str] = None  # Set on sub-tasks spawned by another task
+
+    # Scheduling: tenants share workers in proportion to `weight`
+    tenant: str = "default"
+    priority: PriorityClass = "normal"
+    weight: float = 1.0
     
     # Checkpoint data
     steps: List[Step] = Field(default_factory=list)
     current_step_index: int = 0
     history: List[str] = Field(default_factory=list) # Simple log of events
+
+    # Pre-approvals, keyed by tool name for constant-time lookup by the policy engine
+    grants: Dict[str, List[ApprovalGrant]] = Field(default_factory=dict)
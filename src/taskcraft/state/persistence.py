@@ -1,10 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Sequence
 import json
+import time
 import aiosqlite
 from pathlib import Path
 from taskcraft.state.models import Task
-from taskcraft.core.lifecycle import AgentState
+from taskcraft.core.lifecycle import AgentState, RUNNABLE_STATES
+from taskcraft.core.scheduler import FairShareScheduler, QueueHead
 
 class StateManager(ABC):
     """Abstract base class for state persistence."""
@@ -14,6 +16,11 @@ class StateManager(ABC):
         """Saves or updates a task."""
         pass
 
+    @abstractmethod
+    async def save_tasks(self, tasks: List[Task]) -> None:
+        """Saves or updates many tasks in a single transaction."""
+        pass
+
     @abstractmethod
     async def load_task(self, task_id: str) -> Optional[Task]:
         """Loads a task by ID."""
@@ -24,11 +31,73 @@ class StateManager(ABC):
         """Lists tasks, optionally filtering by status."""
         pass
 
+    @abstractmethod
+    async def list_children(self, parent_id: str) -> List[Task]:
+        """Lists the sub-tasks spawned by a task, oldest first."""
+        pass
+
+    @abstractmethod
+    async def record_step_result(self, task_id: str, idempotency_key: str, result: Dict[str, Any]) -> None:
+        """Durably journals a tool result before the step is marked done. First write wins."""
+        pass
+
+    @abstractmethod
+    async def get_step_result(self, idempotency_key: str) -> Optional[Dict[str, Any]]:
+        """Returns the journaled result for an idempotency key, if any."""
+        pass
+
+    @abstractmethod
+    async def claim_task(self, owner: str, lease_seconds: float, task_id: Optional[str] = None,
+                         states: Sequence[AgentState] = RUNNABLE_STATES) -> Optional[Task]:
+        """
+        Atomically leases one runnable task to `owner` for `lease_seconds`.
+        Unleased tasks and tasks whose lease has expired are eligible; the
+        manager's scheduler picks the (tenant, priority) queue and its oldest
+        task is claimed. Pass `task_id` to claim a specific task, and `states`
+        to claim one in other states (e.g. AWAITING_APPROVAL, to approve it).
+        Returns None if nothing could be claimed.
+        """
+        pass
+
+    @abstractmethod
+    async def heartbeat(self, task_id: str, owner: str, lease_seconds: float) -> bool:
+        """Extends `owner`'s lease. Returns False if the lease was lost (e.g. stolen after expiry)."""
+        pass
+
+    @abstractmethod
+    async def release_task(self, task_id: str, owner: str) -> None:
+        """Drops `owner`'s lease so other workers may claim the task."""
+        pass
+
+    @abstractmethod
+    async def queue_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Per priority class: `depth` (waiting tasks), `in_flight` (leased),
+        and `oldest_wait_s` / `avg_wait_s` of the waiting tasks.
+        """
+        pass
+
 class SQLiteStateManager(StateManager):
     """SQLite implementation of StateManager."""
     
-    def __init__(self, db_path: str = "taskcraft_state.db"):
+    # Columns added after the first release, migrated on initialize
+    COLUMNS = (
+        ("lease_owner", "TEXT"),
+        ("lease_expires_at", "REAL"),
+        ("tenant", "TEXT DEFAULT 'default'"),
+        ("priority", "TEXT DEFAULT 'normal'"),
+        ("weight", "REAL DEFAULT 1.0"),
+        ("queued_at", "REAL DEFAULT 0"),
+        ("parent_id", "TEXT"),
+    )
+
+    def __init__(self, db_path: str = "taskcraft_state.db", scheduler: Optional[FairShareScheduler] = None):
         self.db_path = db_path
+        self.scheduler = scheduler or FairShareScheduler()
+
+    @staticmethod
+    def _status(status) -> int:
+        return status.value if hasattr(status, 'value') else status
 
     async def initialize(self):
         """Creates the necessary tables."""
@@ -41,14 +110,44 @@ class SQLiteStateManager(StateManager):
                     updated_at TIMESTAMP
                 )
             """)
+            cursor = await db.execute("PRAGMA table_info(tasks)")
+            columns = {row[1] for row in await cursor.fetchall()}
+            for column, kind in self.COLUMNS:
+                if column not in columns:
+                    await db.execute(f"ALTER TABLE tasks ADD COLUMN {column} {kind}")
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_tasks_queue ON tasks (status, tenant, priority, queued_at)")
+            await db.execute("CREATE INDEX IF NOT EXISTS idx_tasks_parent ON tasks (parent_id)")
+            await db.execute("""
+                CREATE TABLE IF NOT EXISTS step_results (
+                    idempotency_key TEXT PRIMARY KEY,
+                    task_id TEXT,
+                    result JSON,
+                    recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
             await db.commit()
 
+    # Upsert rather than replace so the lease and queue position survive saves
+    UPSERT = """
+        INSERT INTO tasks (task_id, status, data, updated_at, tenant, priority, weight, queued_at, parent_id)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(task_id) DO UPDATE SET status = excluded.status, data = excluded.data,
+            updated_at = excluded.updated_at, tenant = excluded.tenant,
+            priority = excluded.priority, weight = excluded.weight
+    """
+
+    def _row(self, task: Task) -> tuple:
+        return (task.task_id, self._status(task.status), task.model_dump_json(), task.updated_at,
+                task.tenant, task.priority, task.weight, task.created_at.timestamp(), task.parent_id)
+
     async def save_task(self, task: Task) -> None:
         async with aiosqlite.connect(self.db_path) as db:
-            await db.execute(
-                "INSERT OR REPLACE INTO tasks (task_id, status, data, updated_at) VALUES (?, ?, ?, ?)",
-                (task.task_id, task.status.value if hasattr(task.status, 'value') else task.status, task.model_dump_json(), task.updated_at)
-            )
+            await db.execute(self.UPSERT, self._row(task))
+            await db.commit()
+
+    async def save_tasks(self, tasks: List[Task]) -> None:
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.executemany(self.UPSERT, [self._row(t) for t in tasks])
             await db.commit()
 
     async def load_task(self, task_id: str) -> Optional[Task]:
@@ -70,3 +169,112 @@ class SQLiteStateManager(StateManager):
             cursor = await db.execute(query, tuple(params))
             rows = await cursor.fetchall()
             return [Task.model_validate_json(row[0]) for row in rows]
+
+    async def list_children(self, parent_id: str) -> List[Task]:
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute("SELECT data FROM tasks WHERE parent_id = ? ORDER BY queued_at", (parent_id,))
+            rows = await cursor.fetchall()
+            return [Task.model_validate_json(row[0]) for row in rows]
+
+    async def record_step_result(self, task_id: str, idempotency_key: str, result: Dict[str, Any]) -> None:
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute(
+                "INSERT OR IGNORE INTO step_results (idempotency_key, task_id, result) VALUES (?, ?, ?)",
+                (idempotency_key, task_id, json.dumps(result, default=str))
+            )
+            await db.commit()
+
+    async def get_step_result(self, idempotency_key: str) -> Optional[Dict[str, Any]]:
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute("SELECT result FROM step_results WHERE idempotency_key = ?", (idempotency_key,))
+            row = await cursor.fetchone()
+            return json.loads(row[0]) if row else None
+
+    def _eligible(self, now: float, states: Sequence[AgentState] = RUNNABLE_STATES):
+        statuses = [self._status(s) for s in states]
+        clause = (
+            f"status IN ({', '.join('?' * len(statuses))}) "
+            "AND (lease_owner IS NULL OR lease_expires_at < ?)"
+        )
+        return clause, [*statuses, now]
+
+    async def claim_task(self, owner: str, lease_seconds: float, task_id: Optional[str] = None,
+                         states: Sequence[AgentState] = RUNNABLE_STATES) -> Optional[Task]:
+        now = time.time()
+        eligible, params = self._eligible(now, states)
+
+        # BEGIN IMMEDIATE takes the write lock up front, so the selects and the
+        # update below can't interleave with another worker's claim.
+        async with aiosqlite.connect(self.db_path, isolation_level=None) as db:
+            await db.execute("BEGIN IMMEDIATE")
+            try:
+                row = None
+                if task_id:
+                    cursor = await db.execute(f"SELECT task_id, data FROM tasks WHERE {eligible} AND task_id = ?",
+                                              (*params, task_id))
+                    row = await cursor.fetchone()
+                else:
+                    cursor = await db.execute(
+                        f"SELECT tenant, priority, MAX(weight), MIN(queued_at), COUNT(*) FROM tasks "
+                        f"WHERE {eligible} GROUP BY tenant, priority", tuple(params)
+                    )
+                    heads = [QueueHead(*r) for r in await cursor.fetchall()]
+                    cursor = await db.execute(
+                        "SELECT tenant, COUNT(*) FROM tasks WHERE lease_owner IS NOT NULL AND lease_expires_at >= ? "
+                        "GROUP BY tenant", (now,)
+                    )
+                    in_flight = dict(await cursor.fetchall())
+                    head = self.scheduler.select(heads, in_flight, now)
+                    if head:
+                        cursor = await db.execute(
+                            f"SELECT task_id, data FROM tasks WHERE {eligible} AND tenant = ? AND priority = ? "
+                            "ORDER BY queued_at LIMIT 1", (*params, head.tenant, head.priority)
+                        )
+                        row = await cursor.fetchone()
+                if row:
+                    await db.execute(
+                        "UPDATE tasks SET lease_owner = ?, lease_expires_at = ? WHERE task_id = ?",
+                        (owner, now + lease_seconds, row[0])
+                    )
+                await db.execute("COMMIT")
+            except BaseException:
+                await db.execute("ROLLBACK")
+                raise
+        return Task.model_validate_json(row[1]) if row else None
+
+    async def heartbeat(self, task_id: str, owner: str, lease_seconds: float) -> bool:
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                "UPDATE tasks SET lease_expires_at = ? WHERE task_id = ? AND lease_owner = ?",
+                (time.time() + lease_seconds, task_id, owner)
+            )
+            await db.commit()
+            return cursor.rowcount == 1
+
+    async def release_task(self, task_id: str, owner: str) -> None:
+        async with aiosqlite.connect(self.db_path) as db:
+            await db.execute(
+                "UPDATE tasks SET lease_owner = NULL, lease_expires_at = NULL WHERE task_id = ? AND lease_owner = ?",
+                (task_id, owner)
+            )
+            await db.commit()
+
+    async def queue_stats(self) -> Dict[str, Dict[str, Any]]:
+        now = time.time()
+        eligible, params = self._eligible(now)
+        stats: Dict[str, Dict[str, Any]] = {}
+        async with aiosqlite.connect(self.db_path) as db:
+            cursor = await db.execute(
+                f"SELECT priority, COUNT(*), MIN(queued_at), AVG(queued_at) FROM tasks WHERE {eligible} GROUP BY priority",
+                tuple(params)
+            )
+            for priority, depth, oldest, avg in await cursor.fetchall():
+                stats[priority] = {"depth": depth, "in_flight": 0,
+                                   "oldest_wait_s": round(now - oldest, 1), "avg_wait_s": round(now - avg, 1)}
+            cursor = await db.execute(
+                "SELECT priority, COUNT(*) FROM tasks WHERE lease_owner IS NOT NULL AND lease_expires_at >= ? GROUP BY priority",
+                (now,)
+            )
+            for priority, count in await cursor.fetchall():
+                stats.setdefault(priority, {"depth": 0, "oldest_wait_s": 0.0, "avg_wait_s": 0.0})["in_flight"] = count
+        return stats
@@ -0,0 +1,178 @@
+"""
+Shared, buffered append-only writers for summary/index files.
+
+Every tool call that appends to the same file goes through one `AppendWriter`,
+which keeps a single open handle, buffers entries in memory and writes them
+in one go once `max_buffer_bytes` are pending, `flush_interval` seconds have
+passed, or the step that wrote them ends (the runtime calls `flush_all`
+before journaling a step while `pending()`). Callers that must not return
+before the data is on disk pass `wait=True`; concurrent waiters share one
+write. Writes take an exclusive `flock` so several worker processes
+appending to one file never interleave lines.
+"""
+import asyncio
+import atexit
+import os
+import threading
+from typing import Dict, List, Optional, TextIO
+import structlog
+
+try:
+    import fcntl
+except ImportError: # Windows: no advisory locks, single-process ordering only
+    fcntl = None
+
+logger = structlog.get_logger()
+
+class AppendWriter:
+    """
+    Buffered appender for one file.
+    `write` only touches memory; `flush` does the I/O and may block, so async
+    callers should go through `append` which offloads it to a thread.
+    Threading locks (not asyncio ones) serialize writers because tools may run
+    on the event loop or on executor threads with their own loops. `_lock` only
+    guards the buffer and timer, so `write` never waits on disk I/O; `_io_lock`
+    serializes the writes themselves.
+    """
+    def __init__(self, path: str, max_buffer_bytes: int = 64 * 1024, flush_interval: float = 1.0):
+        self.path = path
+        self.max_buffer_bytes = max_buffer_bytes
+        self.flush_interval = flush_interval
+        self._buffer: List[str] = []
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._handle: Optional[TextIO] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def write(self, text: str) -> bool:
+        """Buffers `text`. Returns True if the size threshold was reached."""
+        with self._lock:
+            self._buffer.append(text)
+            self._pending += len(text)
+            return self._pending >= self.max_buffer_bytes
+
+    def _open(self) -> TextIO:
+        # Reopen if the file was rotated or deleted behind our back
+        if self._handle is not None:
+            try:
+                if os.stat(self.path).st_ino == os.fstat(self._handle.fileno()).st_ino:
+                    return self._handle
+            except OSError:
+                pass
+            self._handle.close()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._handle = open(self.path, "a", encoding="utf-8")
+        return self._handle
+
+    def flush(self) -> int:
+        """
+        Writes out everything buffered. Returns the number of characters written.
+        When it returns, everything buffered before the call is on disk: the buffer
+        is taken under `_io_lock`, so a flush that finds it empty has waited for
+        the one that took it.
+        """
+        with self._io_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._buffer:
+                    return 0
+                data = "".join(self._buffer)
+                self._buffer, self._pending = [], 0
+            try:
+                handle = self._open()
+                if fcntl:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+                try:
+                    handle.write(data)
+                    handle.flush()
+                finally:
+                    if fcntl:
+                        fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            except BaseException:
+                # Put the data back ahead of newer entries so a failed flush can be retried
+                with self._lock:
+                    self._buffer.insert(0, data)
+                    self._pending += len(data)
+                raise
+            return len(data)
+
+    async def append(self, text: str, wait: bool = False) -> None:
+        """
+        Buffers `text`, flushing now if the buffer is full or later on a timer.
+        With `wait`, returns only once `text` is on disk.
+        """
+        if self.write(text) or wait:
+            await asyncio.to_thread(self.flush)
+            return
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            # A timer armed on another (possibly finished) loop would never fire
+            if self._timer is None or self._timer_loop is not loop:
+                if self._timer is not None:
+                    self._timer.cancel()
+                self._timer = loop.call_later(self.flush_interval, self._flush_soon, loop)
+                self._timer_loop = loop
+
+    def _flush_soon(self, loop: asyncio.AbstractEventLoop) -> None:
+        with self._lock:
+            self._timer = None
+        future = loop.run_in_executor(None, self.flush)
+        future.add_done_callback(self._report)
+
+    def _report(self, future: asyncio.Future) -> None:
+        if not future.cancelled() and future.exception():
+            logger.error("Timed append flush failed", path=self.path, error=str(future.exception()))
+
+    def close(self) -> None:
+        self.flush()
+        with self._io_lock:
+            if self._handle is not None:
+                self._handle.close()
+                self._handle = None
+
+_writers: Dict[str, AppendWriter] = {}
+_writers_lock = threading.Lock()
+
+def get_writer(path: str) -> AppendWriter:
+    """The process-wide writer for `path` (created on first use)."""
+    key = os.path.abspath(path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = AppendWriter(key)
+        return writer
+
+def pending() -> bool:
+    """Whether any writer holds entries that are not on disk yet."""
+    with _writers_lock:
+        writers = list(_writers.values())
+    return any(writer._pending for writer in writers)
+
+def flush_all() -> None:
+    """Flushes every writer; failures are logged so one bad file doesn't block the rest."""
+    with _writers_lock:
+        writers = list(_writers.values())
+    for writer in writers:
+        try:
+            writer.flush()
+        except OSError as e:
+            logger.error("Append flush failed", path=writer.path, error=str(e))
+
+def close_all() -> None:
+    flush_all()
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        try:
+            writer.close()
+        except OSError:
+            pass
+
+atexit.register(close_all)
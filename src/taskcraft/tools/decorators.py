@@ -1,13 +1,130 @@
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+import errno
+import threading
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from tenacity import retry, stop_after_attempt, wait_random_exponential, retry_if_exception
 
-def retryable_tool(max_attempts: int = 3):
+TOOL_FLAGS_ATTR = "__taskcraft_flags__"
+
+# Errors a retry can't fix: the tool fails on the first attempt
+PERMANENT_ERRORS = (FileNotFoundError, FileExistsError, PermissionError, IsADirectoryError, NotADirectoryError,
+                    ValueError, TypeError, KeyError, AttributeError, NotImplementedError)
+# OS errors worth retrying (other OSErrors are treated as permanent)
+TRANSIENT_ERRNOS = {errno.EAGAIN, errno.EBUSY, errno.EINTR, errno.ETIMEDOUT, errno.ECONNRESET,
+                    errno.ECONNREFUSED, errno.ECONNABORTED, errno.ENETUNREACH, errno.EHOSTUNREACH}
+
+# Returns True (transient), False (permanent) or None (no opinion: ask the next one)
+ErrorClassifier = Callable[[BaseException], Optional[bool]]
+_classifiers: List[ErrorClassifier] = []
+
+def register_error_classifier(classifier: ErrorClassifier) -> ErrorClassifier:
+    """
+    Adds a classifier consulted before the built-in rules (latest first),
+    e.g. to mark an SDK's rate-limit error transient and its auth error permanent.
+    Usable as a decorator.
+    """
+    _classifiers.insert(0, classifier)
+    return classifier
+
+def is_transient(exc: BaseException) -> bool:
+    """Whether retrying the call that raised `exc` might succeed."""
+    for classifier in _classifiers:
+        verdict = classifier(exc)
+        if verdict is not None:
+            return verdict
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    if isinstance(exc, PERMANENT_ERRORS):
+        return False
+    if isinstance(exc, OSError):
+        return exc.errno in TRANSIENT_ERRNOS
+    # Unknown errors (HTTP clients, SDKs) keep being retried
+    return True
+
+class RetryBudget:
+    """
+    Caps retries across all tool calls of one task: `total` in all, and
+    `per_tool` for any single tool. `used` maps tool name -> retries spent.
+    Shared by every thread a task's tools run on.
+    """
+    def __init__(self, total: int, per_tool: int, used: Optional[Dict[str, int]] = None):
+        self.total = total
+        self.per_tool = per_tool
+        self.used: Dict[str, int] = dict(used or {})
+        self._lock = threading.Lock()
+
+    def take(self, tool: str) -> bool:
+        """Spends one retry of `tool`; False once either limit is reached."""
+        with self._lock:
+            if sum(self.used.values()) >= self.total or self.used.get(tool, 0) >= self.per_tool:
+                return False
+            self.used[tool] = self.used.get(tool, 0) + 1
+            return True
+
+# Set by the runtime around each tool call; None means no budget (only max_attempts applies)
+current_retry_budget: ContextVar[Optional[RetryBudget]] = ContextVar("taskcraft_retry_budget", default=None)
+
+def retryable_tool(max_attempts: int = 3, classify: Optional[Callable[[BaseException], bool]] = None):
     """
     Decorator to make a tool function retryable on failure.
-    Uses exponential backoff.
-    """
-    return retry(
-        stop=stop_after_attempt(max_attempts),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        retry=retry_if_exception_type(Exception), # Retry on any generic exception for now
-        reraise=True
-    )
+    Only transient errors are retried (see `is_transient`, or pass `classify`),
+    with jittered exponential backoff, while the task's retry budget lasts.
+    """
+    classify = classify or is_transient
+
+    def decorator(func: Callable) -> Callable:
+        attempts = stop_after_attempt(max_attempts)
+
+        def stop(retry_state) -> bool:
+            # Only consulted once a retry is wanted, so the budget is spent on real retries
+            if attempts(retry_state):
+                return True
+            budget = current_retry_budget.get()
+            return budget is not None and not budget.take(func.__name__)
+
+        return retry(
+            stop=stop,
+            wait=wait_random_exponential(multiplier=0.5, max=10),
+            retry=retry_if_exception(classify),
+            reraise=True
+        )(func)
+    return decorator
+
+def _mark(func: Callable, **flags: Any) -> Callable:
+    merged = dict(getattr(func, TOOL_FLAGS_ATTR, {}))
+    merged.update(flags)
+    setattr(func, TOOL_FLAGS_ATTR, merged)
+    return func
+
+def tool_flags(func: Callable) -> Dict[str, Any]:
+    """Returns the execution markers set on a tool (empty if none)."""
+    return getattr(func, TOOL_FLAGS_ATTR, {})
+
+def blocking_tool(func: Callable) -> Callable:
+    """
+    Marks a tool as doing blocking I/O, even if it is `async def`.
+    Executors run blocking tools on a thread pool instead of the event loop.
+    Plain sync functions are treated as blocking without the marker.
+    """
+    return _mark(func, blocking=True)
+
+def cpu_bound_tool(func: Callable) -> Callable:
+    """
+    Marks a tool as CPU-bound (parsing, number crunching).
+    Executors run it in a separate worker process so it doesn't hold the GIL
+    of the runtime; arguments and results must be picklable.
+    """
+    return _mark(func, cpu_bound=True)
+
+def cacheable_tool(func: Optional[Callable] = None, *, ttl: Optional[float] = None,
+                   path_params: Sequence[str] = ("path",)):
+    """
+    Marks a read-only tool whose results may be memoized.
+    Results are keyed on the tool name and its parameters; they expire after
+    `ttl` seconds (never, if None) and are invalidated when the mtime or size
+    of any file named by `path_params` changes.
+    Usable bare (`@cacheable_tool`) or with options (`@cacheable_tool(ttl=60)`).
+    """
+    def mark(f: Callable) -> Callable:
+        return _mark(f, cacheable=True, cache_ttl=ttl, cache_path_params=tuple(path_params))
+    return mark(func) if func is not None else mark
@@ -1,6 +1,12 @@
 from pathlib import Path
-from taskcraft.tools.decorators import retryable_tool
+from typing import Optional
+from taskcraft.tools.decorators import retryable_tool, blocking_tool, cacheable_tool
+from taskcraft.tools.fs_utils import read_range
 
+# Bytes returned by a partial read_file that names no length
+READ_FILE_CHUNK = 65536
+
+@blocking_tool
 @retryable_tool()
 async def write_file(path: str, content: str) -> str:
     """Safe tool: Writes content to a file."""
@@ -9,12 +15,26 @@ async def write_file(path: str, content: str) -> str:
     p.write_text(content)
     return f"Successfully wrote {len(content)} bytes to {path}"
 
+@cacheable_tool
+@blocking_tool
 @retryable_tool()
-async def read_file(path: str) -> str:
-    """Safe tool: Reads content from a file."""
+async def read_file(path: str, offset: int = 0, length: Optional[int] = None) -> str:
+    """
+    Safe tool: Reads content from a file.
+    Pass `offset` (negative: from the end) and/or `length` in bytes to read
+    only part of a large file; the rest is never loaded. With an offset but no
+    length, at most READ_FILE_CHUNK bytes are returned, followed by a hint with
+    the offset to continue from.
+    """
     p = Path(path)
     if not p.exists():
         return f"Error: File {path} does not exist."
+    if offset or length is not None:
+        data, start, size = read_range(path, offset, READ_FILE_CHUNK if length is None else length)
+        text = data.decode("utf-8", errors="replace")
+        if length is None and start + len(data) < size:
+            text += f"\n[... more available at offset={start + len(data)}]"
+        return text
     return p.read_text()
 
 @retryable_tool()
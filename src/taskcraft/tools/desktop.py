@@ -3,10 +3,11 @@ import subprocess
 import os
 import platform
 from datetime import datetime
-from taskcraft.tools.decorators import retryable_tool
+from taskcraft.tools.decorators import retryable_tool, blocking_tool
 
 logger = structlog.get_logger()
 
+@blocking_tool
 @retryable_tool()
 async def capture_screen(output_path: str = None) -> str:
     """
@@ -0,0 +1,169 @@
+"""
+Persistent filesystem metadata index.
+
+`refresh_index` walks a tree once and records path, size, mtime, a text snippet
+and (optionally) a content hash in SQLite; later refreshes only re-read files
+whose size or mtime changed. `find_files` then answers extension/size/age/name
+queries from the index instead of walking the disk again.
+"""
+import os
+import sqlite3
+import time
+from typing import Optional
+from taskcraft.tools.decorators import retryable_tool, blocking_tool
+from taskcraft.tools.fs_utils import scan_directory, content_hash, read_snippet
+
+DEFAULT_INDEX_PATH = "taskcraft_fs_index.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    root TEXT NOT NULL,
+    name TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    hash TEXT,
+    snippet TEXT,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_files_root ON files (root);
+CREATE INDEX IF NOT EXISTS idx_files_ext ON files (root, ext);
+CREATE INDEX IF NOT EXISTS idx_files_size ON files (size);
+CREATE INDEX IF NOT EXISTS idx_files_mtime ON files (mtime);
+CREATE INDEX IF NOT EXISTS idx_files_hash ON files (hash);
+CREATE TABLE IF NOT EXISTS roots (
+    root TEXT PRIMARY KEY,
+    refreshed_at REAL NOT NULL
+);
+"""
+
+def _connect(index_path: Optional[str]) -> sqlite3.Connection:
+    db = sqlite3.connect(index_path or os.getenv("TASKCRAFT_FS_INDEX", DEFAULT_INDEX_PATH))
+    db.executescript(SCHEMA)
+    return db
+
+def _ext(name: str) -> str:
+    return os.path.splitext(name)[1].lower()
+
+def _under(root: str):
+    """
+    A clause matching every indexed file below `root`, by path rather than by
+    the `root` column: refreshing a nested directory re-tags its files.
+    The range keeps the match case-sensitive and on the primary key index.
+    """
+    prefix = root.rstrip(os.sep) + os.sep
+    return "path > ? AND path < ?", [prefix, prefix[:-1] + chr(ord(os.sep) + 1)]
+
+@blocking_tool
+@retryable_tool()
+async def refresh_index(root: str, snippet_chars: int = 200, hash_contents: bool = False,
+                        index_path: Optional[str] = None) -> str:
+    """
+    Builds or incrementally updates the file index for a directory tree.
+    Only new files and files whose size or mtime changed are re-read; deleted
+    files are dropped.
+    Args:
+        root: The directory to index.
+        snippet_chars: How many leading characters of text files to store.
+        hash_contents: Also store a SHA-256 of each new/changed file (slower).
+        index_path: SQLite file (default: $TASKCRAFT_FS_INDEX or taskcraft_fs_index.db).
+    """
+    if not os.path.isdir(root):
+        return f"Error: Directory '{root}' does not exist."
+    root = os.path.abspath(root)
+    started = time.monotonic()
+    with _connect(index_path) as db:
+        clause, bounds = _under(root)
+        known = {path: (size, mtime, digest) for path, size, mtime, digest in
+                 db.execute(f"SELECT path, size, mtime, hash FROM files WHERE {clause}", bounds)}
+        added = updated = unchanged = 0
+        now = time.time()
+        batch = []
+        for entry in scan_directory(root):
+            previous = known.pop(entry.path, None)
+            if previous and previous[0] == entry.size and previous[1] == entry.mtime and (previous[2] or not hash_contents):
+                unchanged += 1
+                continue
+            if previous:
+                updated += 1
+            else:
+                added += 1
+            snippet = read_snippet(entry.path, snippet_chars) if snippet_chars else None
+            digest = content_hash(entry.path) if hash_contents else None
+            batch.append((entry.path, root, entry.name, _ext(entry.name), entry.size, entry.mtime, digest, snippet, now))
+            if len(batch) >= 1000:
+                db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+                batch.clear()
+        db.executemany("INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", batch)
+        # Whatever wasn't seen on disk is gone
+        db.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in known])
+        db.execute("INSERT OR REPLACE INTO roots VALUES (?, ?)", (root, now))
+    db.close()
+    return (f"Indexed {root}: {added + updated + unchanged} files "
+            f"(added {added}, updated {updated}, removed {len(known)}, unchanged {unchanged}) "
+            f"in {time.monotonic() - started:.2f}s")
+
+@blocking_tool
+@retryable_tool()
+async def find_files(root: Optional[str] = None, extension: Optional[str] = None, name_pattern: Optional[str] = None,
+                     min_size: Optional[int] = None, max_size: Optional[int] = None,
+                     older_than_days: Optional[float] = None, newer_than_days: Optional[float] = None,
+                     contains: Optional[str] = None, limit: int = 100, index_path: Optional[str] = None) -> str:
+    """
+    Queries the file index (run `refresh_index` first).
+    Args:
+        root: Only files under this indexed directory.
+        extension: e.g. ".pdf" (case-insensitive).
+        name_pattern: Glob on the file name, e.g. "invoice_*".
+        min_size / max_size: Size range in bytes.
+        older_than_days / newer_than_days: Modification age range.
+        contains: Text that must appear in the stored snippet.
+        limit: Max results.
+    """
+    clauses, params = [], []
+    if root:
+        clause, bounds = _under(os.path.abspath(root))
+        clauses.append(clause)
+        params.extend(bounds)
+    if extension:
+        clauses.append("ext = ?")
+        params.append(extension.lower() if extension.startswith(".") else f".{extension.lower()}")
+    if name_pattern:
+        clauses.append("name GLOB ?")
+        params.append(name_pattern)
+    if min_size is not None:
+        clauses.append("size >= ?")
+        params.append(min_size)
+    if max_size is not None:
+        clauses.append("size <= ?")
+        params.append(max_size)
+    now = time.time()
+    if older_than_days is not None:
+        clauses.append("mtime < ?")
+        params.append(now - older_than_days * 86400)
+    if newer_than_days is not None:
+        clauses.append("mtime >= ?")
+        params.append(now - newer_than_days * 86400)
+    if contains:
+        clauses.append("instr(snippet, ?) > 0")
+        params.append(contains)
+
+    query = "SELECT path, size, mtime FROM files"
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += " ORDER BY path LIMIT ?"
+    params.append(limit + 1)
+
+    with _connect(index_path) as db:
+        rows = db.execute(query, params).fetchall()
+        if not rows:
+            indexed = db.execute("SELECT COUNT(*) FROM roots").fetchone()[0]
+    db.close()
+    if not rows:
+        return "No matching files." if indexed else "Index is empty: call refresh_index first."
+    lines = [f"{path} (Size: {size}b, modified {time.strftime('%Y-%m-%d', time.localtime(mtime))})"
+             for path, size, mtime in rows[:limit]]
+    if len(rows) > limit:
+        lines.append(f"... more matches: narrow the query or raise limit (>{limit})")
+    return "\n".join(lines)
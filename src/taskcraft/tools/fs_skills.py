@@ -1,42 +1,153 @@
 import os
+import json
 import shutil
-import hashlib
-from typing import List, Dict, Optional
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator, List, Dict, Optional, Tuple
 from datetime import datetime
-from taskcraft.tools.decorators import retryable_tool
+from taskcraft.tools.decorators import retryable_tool, blocking_tool, cacheable_tool
+from taskcraft.tools.append_writer import get_writer
+from taskcraft.tools.fs_utils import (ScanEntry, scan_directory, content_hash, edge_hash,
+                                      read_range, read_tail, read_line_range)
 
+EDGE_BLOCK = 64 * 1024
+
+def _summarize(entries: Iterator[ScanEntry], by: str, limit: int) -> str:
+    groups: Dict[str, List[int]] = {}
+    total_files = total_bytes = 0
+    for entry in entries:
+        if by == "extension":
+            key = os.path.splitext(entry.name)[1].lower() or "(none)"
+        else:
+            key = entry.rel_path.split(os.sep, 1)[0] + "/" if os.sep in entry.rel_path else "(top level)"
+        group = groups.setdefault(key, [0, 0])
+        group[0] += 1
+        group[1] += entry.size
+        total_files += 1
+        total_bytes += entry.size
+    if not total_files:
+        return "No matching files."
+    ranked = sorted(groups.items(), key=lambda kv: kv[1][1], reverse=True)
+    lines = [f"{total_files} files, {total_bytes}b total, {len(groups)} {by} groups"]
+    lines += [f"{key}: {count} files, {size}b" for key, (count, size) in ranked[:limit]]
+    if len(ranked) > limit:
+        lines.append(f"... {len(ranked) - limit} smaller groups omitted")
+    return "\n".join(lines)
+
+@blocking_tool
 @retryable_tool()
-async def list_directory(path: str, recursive: bool = False) -> str:
+async def list_directory(path: str, recursive: bool = False, pattern: Optional[str] = None,
+                         max_depth: Optional[int] = None, min_size: Optional[int] = None,
+                         max_size: Optional[int] = None, cursor: Optional[str] = None, page_size: int = 200,
+                         summarize_by: Optional[str] = None) -> str:
     """
-    Lists files in a directory.
+    Lists files in a directory, one page at a time.
     Args:
         path: The directory path to scan.
         recursive: If True, scans subdirectories.
+        pattern: Only include files whose name matches this glob (e.g. "*.pdf").
+        max_depth: With recursive, how many directory levels to descend (1 = only `path`).
+        min_size / max_size: Only include files within this size range, in bytes.
+        cursor: Where to continue; pass the cursor from the previous page.
+        page_size: Max entries per page.
+        summarize_by: "extension" or "directory" to return counts and bytes per group
+            instead of a listing (much smaller for large trees).
     """
     if not os.path.exists(path):
         return f"Error: Path '{path}' does not exist."
-    
-    files_info = []
+    if summarize_by not in (None, "extension", "directory"):
+        return "Error: summarize_by must be 'extension' or 'directory'."
+
+    filtered = pattern is not None or min_size is not None or max_size is not None
     try:
-        if recursive:
-            for root, dirs, files in os.walk(path):
-                for file in files:
-                    full_path = os.path.join(root, file)
-                    size = os.path.getsize(full_path)
-                    files_info.append(f"{full_path} (Size: {size}b)")
-        else:
-            for item in os.listdir(path):
-                full_path = os.path.join(path, item)
-                if os.path.isfile(full_path):
-                    size = os.path.getsize(full_path)
-                    files_info.append(f"{item} (Size: {size}b)")
-                else:
-                    files_info.append(f"{item}/ (DIR)")
-                    
-        return "\n".join(files_info) if files_info else "Directory is empty."
+        entries = scan_directory(path, recursive=recursive, max_depth=max_depth, pattern=pattern,
+                                 min_size=min_size, max_size=max_size,
+                                 include_dirs=not recursive and not filtered and summarize_by is None,
+                                 after=None if summarize_by else cursor)
+        if summarize_by:
+            return _summarize(entries, summarize_by, page_size)
+
+        files_info = []
+        page = list(itertools.islice(entries, page_size + 1))
+        for entry in page:
+            if recursive:
+                files_info.append(f"{entry.path} (Size: {entry.size}b)")
+            elif entry.is_dir:
+                files_info.append(f"{entry.name}/ (DIR)")
+            else:
+                files_info.append(f"{entry.name} (Size: {entry.size}b)")
+
+        if not files_info:
+            return "No more entries." if cursor else "Directory is empty."
+        if len(files_info) > page_size:
+            files_info[page_size:] = [f"... more entries: call again with cursor={json.dumps(page[page_size - 1].rel_path)}"]
+        return "\n".join(files_info)
     except Exception as e:
         return f"Error scanning directory: {str(e)}"
 
+def _refine(pool: ThreadPoolExecutor, groups: List[Tuple[int, List[str]]],
+            hasher: Callable[[str], Optional[str]]) -> List[Tuple[int, List[str]]]:
+    """Splits each same-size group by `hasher`, keeping only sub-groups with more than one file."""
+    paths = [p for _, group in groups for p in group]
+    digests = iter(pool.map(hasher, paths))
+    refined = []
+    for size, group in groups:
+        by_hash: Dict[str, List[str]] = {}
+        for p in group:
+            digest = next(digests)
+            if digest is not None:
+                by_hash.setdefault(digest, []).append(p)
+        refined += [(size, same) for same in by_hash.values() if len(same) > 1]
+    return refined
+
+@blocking_tool
+@retryable_tool()
+async def find_duplicates(path: str, pattern: Optional[str] = None, min_size: int = 1,
+                          max_groups: int = 50, workers: int = 8) -> str:
+    """
+    Finds files with identical contents under a directory, in one call.
+    Files are grouped by size first; same-size files are compared by a hash of
+    their first and last 64KB, and only files that still match get a full
+    content hash. Hashing runs on a thread pool.
+    Args:
+        path: The directory to scan (recursively).
+        pattern: Only consider files whose name matches this glob (e.g. "*.jpg").
+        min_size: Ignore files smaller than this many bytes (empty files by default).
+        max_groups: Max duplicate groups to list, largest reclaimable space first.
+        workers: Hashing threads.
+    """
+    if not os.path.isdir(path):
+        return f"Error: Directory '{path}' does not exist."
+
+    by_size: Dict[int, List[str]] = {}
+    scanned = 0
+    for entry in scan_directory(path, pattern=pattern, min_size=min_size):
+        by_size.setdefault(entry.size, []).append(entry.path)
+        scanned += 1
+    groups = [(size, paths) for size, paths in by_size.items() if len(paths) > 1]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        groups = _refine(pool, groups, lambda p: edge_hash(p, EDGE_BLOCK))
+        # The edge hash already covers every byte of files up to two blocks long
+        small = [g for g in groups if g[0] <= 2 * EDGE_BLOCK]
+        large = _refine(pool, [g for g in groups if g[0] > 2 * EDGE_BLOCK], content_hash)
+    groups = sorted(small + large, key=lambda g: (-g[0] * (len(g[1]) - 1), g[1][0]))
+
+    if not groups:
+        return f"No duplicates among {scanned} files."
+    redundant = sum(len(paths) - 1 for _, paths in groups)
+    reclaimable = sum(size * (len(paths) - 1) for size, paths in groups)
+    lines = [f"{len(groups)} duplicate groups among {scanned} files: "
+             f"{redundant} redundant copies, {reclaimable}b reclaimable"]
+    for size, paths in groups[:max_groups]:
+        lines.append(f"{size}b x{len(paths)}:")
+        lines += [f"  {p}" for p in sorted(paths)]
+    if len(groups) > max_groups:
+        lines.append(f"... {len(groups) - max_groups} smaller groups omitted")
+    return "\n".join(lines)
+
+@cacheable_tool
+@blocking_tool
 @retryable_tool()
 async def read_file_snippet(path: str, max_chars: int = 2000) -> str:
     """
@@ -52,6 +163,68 @@ async def read_file_snippet(path: str, max_chars: int = 2000) -> str:
     except Exception as e:
         return f"Error reading file: {str(e)}"
 
+def _read_part(path: str, offset: int, length: int, tail_lines: Optional[int],
+               start_line: Optional[int], end_line: Optional[int]) -> str:
+    # Never hand the planner more than `length` bytes, whatever the mode
+    if tail_lines is not None:
+        # Keep the end of a tail: the last lines are the ones asked for
+        data = read_tail(path, tail_lines)
+        header, data = f"[{path}: last {tail_lines} lines]", data[max(0, len(data) - length):]
+    elif start_line is not None or end_line is not None:
+        first = start_line or 1
+        last = end_line if end_line is not None else first + 99
+        header, data = f"[{path}: lines {first}-{last}]", read_line_range(path, first, last)[:length]
+    else:
+        data, start, size = read_range(path, offset, length)
+        header = f"[{path}: bytes {start}-{start + len(data)} of {size}]"
+    return f"{header}\n{data.decode('utf-8', errors='replace')}"
+
+@cacheable_tool
+@blocking_tool
+@retryable_tool()
+async def read_file_range(path: str, offset: int = 0, length: int = 65536, tail_lines: Optional[int] = None,
+                          start_line: Optional[int] = None, end_line: Optional[int] = None) -> str:
+    """
+    Reads part of a (possibly huge) file without loading the whole file.
+    Pick one addressing mode:
+        tail_lines: The last N lines (e.g. of a log).
+        start_line / end_line: A 1-based, inclusive line range (default 100 lines).
+        offset / length: A byte range; a negative offset counts from the end.
+    At most `length` bytes are returned in every mode. The first line of the
+    result says which part was read (and the file size, for byte ranges).
+    """
+    if not os.path.isfile(path):
+        return f"Error: File '{path}' not found."
+    try:
+        return _read_part(path, offset, length, tail_lines, start_line, end_line)
+    except Exception as e:
+        return f"Error reading file: {str(e)}"
+
+@blocking_tool
+@retryable_tool()
+async def read_many_files(paths: List[str], max_chars: int = 2000, tail_lines: Optional[int] = None,
+                          workers: int = 8) -> str:
+    """
+    Reads the head (or, with `tail_lines`, the last lines) of many files in one call.
+    Files are read concurrently; each section starts with a "[path: ...]" header.
+    Args:
+        paths: Files to read.
+        max_chars: Max bytes per file.
+        tail_lines: Read the last N lines of each file instead of its head.
+        workers: Reader threads.
+    """
+    def read_one(path: str) -> str:
+        if not os.path.isfile(path):
+            return f"[{path}: not found]"
+        try:
+            return _read_part(path, 0, max_chars, tail_lines, None, None)
+        except Exception as e:
+            return f"[{path}: error {e}]"
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return "\n\n".join(pool.map(read_one, paths))
+
+@blocking_tool
 @retryable_tool()
 async def move_file(src: str, dest_folder: str) -> str:
     """
@@ -80,14 +253,151 @@ async def move_file(src: str, dest_folder: str) -> str:
     except Exception as e:
         return f"Error moving file: {str(e)}"
 
+COLLISION_MODES = ("rename", "skip", "overwrite", "error")
+FILE_OPS = ("move", "copy", "rename")
+
+def _free_path(dest_path: str, taken: set) -> str:
+    """First `name_N.ext` next to `dest_path` that exists neither on disk nor in this batch."""
+    base, ext = os.path.splitext(dest_path)
+    n = 1
+    while os.path.exists(f"{base}_{n}{ext}") or f"{base}_{n}{ext}" in taken:
+        n += 1
+    return f"{base}_{n}{ext}"
+
+def _run_operations(operations: List[Dict[str, str]], dry_run: bool, on_collision: str, max_lines: int) -> str:
+    if on_collision not in COLLISION_MODES:
+        return f"Error: on_collision must be one of {', '.join(COLLISION_MODES)}."
+    counts = {"done": 0, "renamed": 0, "skipped": 0, "failed": 0}
+    details: List[str] = []
+    taken: set = set() # Destinations claimed earlier in this batch
+    for i, op in enumerate(operations):
+        kind = op.get("op", "move")
+        src = op.get("src", "")
+        try:
+            if kind not in FILE_OPS:
+                raise ValueError(f"unknown op '{kind}'")
+            if not os.path.isfile(src):
+                raise FileNotFoundError(f"source '{src}' not found")
+            if kind == "rename":
+                # A rename stays in the source's folder: a path, '..' or a link out of it would move the file
+                dest = op["dest"]
+                if not dest or dest in (".", "..") or os.path.basename(dest) != dest:
+                    raise ValueError(f"rename dest '{dest}' must be a file name, not a path")
+                dest_path = os.path.join(os.path.dirname(src), dest)
+                if os.path.dirname(os.path.realpath(dest_path)) != os.path.realpath(os.path.dirname(src) or "."):
+                    raise ValueError(f"rename dest '{dest}' resolves outside '{os.path.dirname(src) or '.'}'")
+            elif op.get("dest_folder"):
+                dest_path = os.path.join(op["dest_folder"], os.path.basename(src))
+            else:
+                dest_path = op["dest"]
+            if os.path.abspath(dest_path) == os.path.abspath(src):
+                counts["skipped"] += 1
+                continue
+
+            if os.path.exists(dest_path) or dest_path in taken:
+                if on_collision == "skip":
+                    counts["skipped"] += 1
+                    details.append(f"skipped #{i} {src}: '{dest_path}' exists")
+                    continue
+                if on_collision == "error":
+                    raise FileExistsError(f"'{dest_path}' exists")
+                if on_collision == "rename":
+                    dest_path = _free_path(dest_path, taken)
+                    counts["renamed"] += 1
+                    details.append(f"renamed #{i} {src} -> {dest_path}")
+            taken.add(dest_path)
+
+            if not dry_run:
+                os.makedirs(os.path.dirname(dest_path) or ".", exist_ok=True)
+                if kind == "copy":
+                    shutil.copy2(src, dest_path)
+                else:
+                    shutil.move(src, dest_path)
+            counts["done"] += 1
+        except KeyError as e:
+            counts["failed"] += 1
+            details.append(f"failed #{i} {src}: missing {e}")
+        except Exception as e:
+            counts["failed"] += 1
+            details.append(f"failed #{i} {src}: {e}")
+
+    summary = (f"{'Dry run: would complete' if dry_run else 'Completed'} {counts['done']}/{len(operations)} operations "
+               f"({counts['renamed']} renamed on collision, {counts['skipped']} skipped, {counts['failed']} failed)")
+    if len(details) > max_lines:
+        details[max_lines:] = [f"... {len(details) - max_lines} more"]
+    return "\n".join([summary, *details])
+
+@blocking_tool
+@retryable_tool()
+async def batch_file_operations(operations: List[Dict[str, str]], dry_run: bool = False,
+                                on_collision: str = "rename", max_lines: int = 50) -> str:
+    """
+    Moves, copies or renames many files in one call.
+    Args:
+        operations: List of {"op": "move" | "copy" | "rename", "src": path, and either
+            "dest": full destination path (a bare file name for "rename") or
+            "dest_folder": folder to keep the file name in}. Folders are created as needed.
+        dry_run: Report what would happen without touching any file.
+        on_collision: When the destination exists: "rename" (add _1, _2 ...), "skip",
+            "overwrite", or "error" (count the operation as failed).
+        max_lines: Max per-file detail lines (collisions and failures) in the report.
+    """
+    return _run_operations(operations, dry_run, on_collision, max_lines)
+
+@blocking_tool
+@retryable_tool()
+async def organize_by_rule(path: str, rule: str = "extension", dest_root: Optional[str] = None,
+                           pattern: Optional[str] = None, recursive: bool = False, dry_run: bool = False,
+                           on_collision: str = "rename", max_lines: int = 50) -> str:
+    """
+    Moves every file in a directory into sub-folders chosen by a rule, in one call.
+    Args:
+        path: The directory to organize.
+        rule: "extension" (pdf/, jpg/, no_extension/) or "month" (2026-01/, by modification time).
+        dest_root: Where the sub-folders go (default: `path`).
+        pattern: Only move files whose name matches this glob (e.g. "*.pdf").
+        recursive: Also organize files in sub-directories.
+        dry_run: Report what would happen without moving anything.
+        on_collision: "rename", "skip", "overwrite" or "error" (see batch_file_operations).
+        max_lines: Max per-file detail lines in the report.
+    """
+    if not os.path.isdir(path):
+        return f"Error: Directory '{path}' does not exist."
+    if rule not in ("extension", "month"):
+        return "Error: rule must be 'extension' or 'month'."
+    dest_root = dest_root or path
+    # Materialize the listing first so files moved into sub-folders aren't scanned again
+    operations = []
+    for entry in scan_directory(path, recursive=recursive, pattern=pattern):
+        if rule == "extension":
+            folder = os.path.splitext(entry.name)[1].lstrip(".").lower() or "no_extension"
+        else:
+            folder = datetime.fromtimestamp(entry.mtime).strftime("%Y-%m")
+        operations.append({"op": "move", "src": entry.path, "dest_folder": os.path.join(dest_root, folder)})
+    if not operations:
+        return "No matching files."
+    return _run_operations(operations, dry_run, on_collision, max_lines)
+
 @retryable_tool()
 async def append_to_summary(summary_file: str, entry: str) -> str:
     """
     Appends a line to the summary index.
     """
+    # The shared writer batches entries and does the file I/O off-loop; the runtime
+    # flushes it before journaling the step, so a crash can't lose a "done" entry
     try:
-        with open(summary_file, 'a', encoding='utf-8') as f:
-            f.write(entry + "\n")
+        await get_writer(summary_file).append(entry + "\n")
         return "Summary updated."
     except Exception as e:
         return f"Error writing summary: {str(e)}"
+
+@retryable_tool()
+async def append_many_to_summary(summary_file: str, entries: List[str]) -> str:
+    """
+    Appends many lines to the summary index in one call.
+    """
+    try:
+        await get_writer(summary_file).append("".join(entry + "\n" for entry in entries))
+        return f"Summary updated with {len(entries)} entries."
+    except Exception as e:
+        return f"Error writing summary: {str(e)}"
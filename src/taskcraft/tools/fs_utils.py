@@ -0,0 +1,197 @@
+"""
+Filesystem helpers shared by the file tools.
+Kept out of the tool modules so `load_module_tools` doesn't expose them to the planner.
+"""
+import fnmatch
+import hashlib
+import mmap
+import os
+from contextlib import contextmanager
+from typing import Iterator, Optional, Tuple, Union
+
+class ScanEntry:
+    """One file or directory yielded by `scan_directory`; `size` comes from the DirEntry stat."""
+    __slots__ = ("path", "rel_path", "name", "is_dir", "size", "mtime", "depth")
+
+    def __init__(self, path: str, rel_path: str, name: str, is_dir: bool, size: int, mtime: float, depth: int):
+        self.path = path
+        self.rel_path = rel_path
+        self.name = name
+        self.is_dir = is_dir
+        self.size = size
+        self.mtime = mtime
+        self.depth = depth
+
+def _resume_stack(path: str, after: str, recursive: bool, max_depth: Optional[int]) -> list:
+    """
+    Scan stack that continues just after `after`, a rel_path the scan yielded earlier.
+    Only the directories on the way down to it are read: subdirectories that sort
+    before the path were fully listed already, later ones are pushed unread.
+    """
+    parts = os.path.normpath(after).split(os.sep)
+    stack = []
+    directory, rel_dir = path, ""
+    for depth, part in enumerate(parts[:-1]):
+        if recursive and (max_depth is None or depth + 1 < max_depth):
+            try:
+                with os.scandir(directory) as it:
+                    later = sorted((e.name for e in it if e.name > part and e.is_dir(follow_symlinks=False)))
+            except OSError:
+                later = []
+            stack.extend((os.path.join(directory, name), os.path.join(rel_dir, name) if rel_dir else name, depth + 1, None)
+                         for name in reversed(later))
+        directory = os.path.join(directory, part)
+        rel_dir = os.path.join(rel_dir, part) if rel_dir else part
+    stack.append((directory, rel_dir, len(parts) - 1, parts[-1]))
+    return stack
+
+def scan_directory(path: str, recursive: bool = True, max_depth: Optional[int] = None,
+                   pattern: Optional[str] = None, min_size: Optional[int] = None,
+                   max_size: Optional[int] = None, include_dirs: bool = False,
+                   after: Optional[str] = None) -> Iterator[ScanEntry]:
+    """
+    Streams entries under `path` in a stable (sorted, depth-first) order.
+    Built on `os.scandir`, so file type comes from the directory read and each
+    file costs at most one stat. Symlinks are not followed. `pattern` is a glob
+    matched against the file name; size filters apply to files only.
+    Unreadable subdirectories are skipped. Pass the `rel_path` of an entry as
+    `after` to resume the scan right after it without re-reading earlier directories.
+    """
+    stack = _resume_stack(path, after, recursive, max_depth) if after else [(path, "", 0, None)]
+    while stack:
+        directory, rel_dir, depth, skip_through = stack.pop()
+        try:
+            with os.scandir(directory) as it:
+                entries = sorted(it, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        for entry in entries:
+            rel_path = os.path.join(rel_dir, entry.name) if rel_dir else entry.name
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir and recursive and (max_depth is None or depth + 1 < max_depth):
+                subdirs.append((entry.path, rel_path, depth + 1, None))
+            # Already yielded before the resume point; subdirectories are still descended below
+            if skip_through is not None and entry.name <= skip_through:
+                continue
+            try:
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            if is_dir:
+                if include_dirs and (pattern is None or fnmatch.fnmatch(entry.name, pattern)):
+                    yield ScanEntry(entry.path, rel_path, entry.name, True, 0, st.st_mtime, depth)
+                continue
+            if pattern is not None and not fnmatch.fnmatch(entry.name, pattern):
+                continue
+            if (min_size is not None and st.st_size < min_size) or (max_size is not None and st.st_size > max_size):
+                continue
+            yield ScanEntry(entry.path, rel_path, entry.name, False, st.st_size, st.st_mtime, depth)
+        # Reverse so the stack pops subdirectories in name order
+        stack.extend(reversed(subdirs))
+
+@contextmanager
+def map_file(path: str) -> Iterator[Union[mmap.mmap, bytes]]:
+    """Read-only mmap of a file (empty bytes for empty files, which can't be mapped)."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+def content_hash(path: str, chunk_size: int = 1 << 20) -> Optional[str]:
+    """
+    SHA-256 of a file's contents. None if unreadable.
+    The file is memory-mapped and fed to the hash in `chunk_size` slices, so
+    large files aren't copied through Python buffers and hashlib can release
+    the GIL while it works (hashing in a thread pool scales across cores).
+    """
+    digest = hashlib.sha256()
+    try:
+        with map_file(path) as mapped:
+            view = memoryview(mapped)
+            try:
+                for offset in range(0, len(mapped), chunk_size):
+                    digest.update(view[offset:offset + chunk_size])
+            finally:
+                view.release()
+    except (OSError, ValueError):
+        return None
+    return digest.hexdigest()
+
+def read_range(path: str, offset: int = 0, length: Optional[int] = None) -> Tuple[bytes, int, int]:
+    """
+    Bytes `offset`..`offset + length` of a file without reading the rest.
+    A negative `offset` counts from the end. Returns (data, start, file size).
+    """
+    with map_file(path) as mapped:
+        size = len(mapped)
+        start = max(0, size + offset) if offset < 0 else min(offset, size)
+        end = size if length is None else min(size, start + length)
+        return mapped[start:end], start, size
+
+def read_tail(path: str, lines: int) -> bytes:
+    """The last `lines` lines of a file, found by scanning backwards from the end."""
+    with map_file(path) as mapped:
+        end = len(mapped)
+        search_end = end - 1 if end and mapped[end - 1:end] == b"\n" else end
+        start = search_end
+        for _ in range(lines):
+            newline = mapped.rfind(b"\n", 0, search_end)
+            if newline < 0:
+                start = 0
+                break
+            start = search_end = newline
+        else:
+            start += 1
+        return mapped[start:end] if lines > 0 else b""
+
+def read_line_range(path: str, start_line: int, end_line: int) -> bytes:
+    """Lines `start_line`..`end_line` (1-based, inclusive), stopping the scan at `end_line`."""
+    with map_file(path) as mapped:
+        pos = 0
+        for _ in range(max(0, start_line - 1)):
+            newline = mapped.find(b"\n", pos)
+            if newline < 0:
+                return b""
+            pos = newline + 1
+        begin = pos
+        for _ in range(max(0, end_line - max(start_line, 1) + 1)):
+            newline = mapped.find(b"\n", pos)
+            if newline < 0:
+                pos = len(mapped)
+                break
+            pos = newline + 1
+        return mapped[begin:pos]
+
+def edge_hash(path: str, block_size: int = 64 * 1024) -> Optional[str]:
+    """
+    Cheap pre-filter hash over the first and last `block_size` bytes of a file.
+    Equal files always share it; most unequal files of the same size don't.
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            digest.update(f.read(block_size))
+            size = os.fstat(f.fileno()).st_size
+            if size > block_size:
+                f.seek(max(block_size, size - block_size))
+                digest.update(f.read(block_size))
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+def read_snippet(path: str, max_chars: int) -> Optional[str]:
+    """Leading text of a file, or None for binary/unreadable files."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(max_chars * 4)
+    except OSError:
+        return None
+    if b"\0" in head:
+        return None
+    return head.decode("utf-8", errors="ignore")[:max_chars]
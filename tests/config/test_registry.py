@@ -0,0 +1,68 @@
+import inspect
+import sys
+import textwrap
+import pytest
+from taskcraft.config.registry import ToolRegistry
+from taskcraft.tools.decorators import tool_flags
+
+MODULE = textwrap.dedent('''
+    from taskcraft.tools.decorators import blocking_tool, cacheable_tool, retryable_tool
+
+    @cacheable_tool(ttl=60)
+    @blocking_tool
+    @retryable_tool()
+    async def lookup(path: str, idempotency_key: str = None) -> str:
+        """Looks things up."""
+        return f"found {path}"
+
+    def count(items: list, limit: int = 3) -> int:
+        return min(len(items), limit)
+
+    def _helper():
+        pass
+''')
+
+@pytest.fixture
+def connector(tmp_path, monkeypatch):
+    source = tmp_path / "fake_connector.py"
+    source.write_text(MODULE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield source
+    sys.modules.pop("fake_connector", None)
+
+@pytest.mark.asyncio
+async def test_cached_manifest_defers_import(connector, tmp_path):
+    manifest = str(tmp_path / "manifest.json")
+    registry = ToolRegistry(manifest)
+    assert sorted(registry.module_tools("fake_connector")) == ["count", "lookup"]
+    registry.save()
+    sys.modules.pop("fake_connector")
+
+    tools = ToolRegistry(manifest).module_tools("fake_connector")
+    assert "fake_connector" not in sys.modules
+    lookup = tools["lookup"]
+    assert inspect.iscoroutinefunction(lookup) and not inspect.iscoroutinefunction(tools["count"])
+    assert tool_flags(lookup) == {"cacheable": True, "cache_ttl": 60, "cache_path_params": ("path",), "blocking": True}
+    assert list(inspect.signature(lookup).parameters) == ["path", "idempotency_key"]
+    assert lookup.__doc__ == "Looks things up."
+
+    assert await lookup(path="a.txt") == "found a.txt"
+    assert "fake_connector" in sys.modules
+    assert tools["count"]([1, 2, 3, 4]) == 3
+
+def test_changed_module_rebuilds_entry(connector, tmp_path):
+    manifest = str(tmp_path / "manifest.json")
+    registry = ToolRegistry(manifest)
+    registry.module_tools("fake_connector")
+    registry.save()
+
+    connector.write_text(MODULE + "\ndef extra():\n    return 1\n")
+    sys.modules.pop("fake_connector")
+    registry = ToolRegistry(manifest)
+    tools = registry.module_tools("fake_connector")
+    assert "extra" in tools and "fake_connector" in sys.modules # Re-imported to rebuild the entry
+    registry.save()
+
+    sys.modules.pop("fake_connector")
+    assert "extra" in ToolRegistry(manifest).module_tools("fake_connector")
+    assert "fake_connector" not in sys.modules
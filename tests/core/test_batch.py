@@ -0,0 +1,81 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from taskcraft.core.batch import read_objectives, run_batch
+from taskcraft.core.lifecycle import AgentState
+from taskcraft.core.runtime import AgentRuntime
+from taskcraft.executor.local import LocalExecutor
+
+class CountingPlanner:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def plan(self, task, history):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.05)
+        self.active -= 1
+        return SimpleNamespace(text="DONE", parts=[])
+
+def test_read_objectives_jsonl_and_csv(tmp_path):
+    jsonl = tmp_path / "in.jsonl"
+    jsonl.write_text('{"objective": "a"}\n\n"b"\n')
+    csv_file = tmp_path / "in.csv"
+    csv_file.write_text("objective,owner\nc,ops\nd,ops\n")
+    assert read_objectives(str(jsonl)) == ["a", "b"]
+    assert read_objectives(str(csv_file)) == ["c", "d"]
+
+    bad = tmp_path / "bad.jsonl"
+    bad.write_text('{"goal": "x"}\n')
+    with pytest.raises(ValueError, match="bad.jsonl:1"):
+        read_objectives(str(bad))
+
+@pytest.mark.asyncio
+async def test_bulk_create_and_run_with_concurrency_limit(memory_db, empty_policy_engine):
+    runtime = AgentRuntime(memory_db, empty_policy_engine, LocalExecutor({}))
+    tasks = await runtime.create_tasks([f"objective {i}" for i in range(20)], {"agent": "bulk"},
+                                       tenant="bulk", priority="batch")
+    assert len(await memory_db.list_tasks()) == 20
+    assert (await memory_db.queue_stats())["batch"]["depth"] == 20
+
+    planner = CountingPlanner()
+    summary = await run_batch(runtime, planner, tasks, concurrency=4)
+    assert summary.statuses == {"COMPLETED": 20}
+    # Claims serialize on the DB, so the pool may not always fill completely
+    assert 1 < planner.peak <= 4
+    assert "20 tasks" in summary.render()
+    assert all(t.status == AgentState.COMPLETED for t in await memory_db.list_tasks())
+
+class UnfinishedPlanner:
+    """Finishes 'ok' tasks, gives up silently on 'quiet' ones, raises on 'broken' ones and hangs on 'slow' ones."""
+    async def plan(self, task, history):
+        if task.description == "broken":
+            raise RuntimeError("planner crashed")
+        if task.description == "slow":
+            await asyncio.sleep(10)
+        if task.description == "quiet":
+            return SimpleNamespace(text="", parts=[])
+        return SimpleNamespace(text="DONE", parts=[])
+
+@pytest.mark.asyncio
+async def test_unfinished_tasks_are_failed_not_left_runnable(memory_db, empty_policy_engine):
+    runtime = AgentRuntime(memory_db, empty_policy_engine, LocalExecutor({}))
+    tasks = await runtime.create_tasks(["ok", "quiet", "broken"], {})
+
+    summary = await run_batch(runtime, UnfinishedPlanner(), tasks, lease_seconds=5)
+    assert summary.statuses == {"COMPLETED": 1, "FAILED": 2}
+    stored = {t.description: await memory_db.load_task(t.task_id) for t in tasks}
+    assert stored["quiet"].status == AgentState.FAILED and stored["broken"].status == AgentState.FAILED
+    assert "planner crashed" in stored["broken"].history[-1]
+    assert await memory_db.claim_task("worker", 5) is None
+
+    # A cancelled batch doesn't leave its in-flight tasks for workers either
+    slow = await runtime.create_tasks(["slow"], {})
+    batch = asyncio.create_task(run_batch(runtime, UnfinishedPlanner(), slow, lease_seconds=5))
+    await asyncio.sleep(0.2)
+    batch.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await batch
+    assert (await memory_db.load_task(slow[0].task_id)).status == AgentState.FAILED
+    assert await memory_db.claim_task("worker", 5) is None
@@ -33,3 +33,126 @@ async def test_execute_safe_step(memory_db, empty_policy_engine):
     assert len(task.steps) == 1
     assert task.steps[0].status == "COMPLETED"
     assert task.status == AgentState.EXECUTING
+
+@pytest.mark.asyncio
+async def test_grant_skips_approval_halt(memory_db):
+    from taskcraft.governance.policy import PolicyEngine, ApprovalRequiredPolicy
+
+    async def send_report(recipient: str):
+        return f"sent to {recipient}"
+
+    engine = PolicyEngine([ApprovalRequiredPolicy(["send_report"])])
+    runtime = AgentRuntime(memory_db, engine, LocalExecutor(tools={"send_report": send_report}))
+    task = await runtime.create_task("Report")
+    await runtime.grant_approval(task, "send_report", {"recipient": "a@corp.com"}, ttl_seconds=3600)
+
+    result = await runtime.execute_step(task, "send_report", {"recipient": "a@corp.com"})
+    assert result["status"] == "SUCCESS"
+
+    # Grants survive a reload
+    reloaded = await memory_db.load_task(task.task_id)
+    assert "send_report" in reloaded.grants
+
+    result = await runtime.execute_step(task, "send_report", {"recipient": "b@corp.com"})
+    assert result["status"] == "HALTED"
+
+@pytest.mark.asyncio
+async def test_resume_reconciles_running_steps_from_journal(memory_db, empty_policy_engine):
+    calls = []
+
+    async def charge(amount: int, idempotency_key: str):
+        calls.append(idempotency_key)
+        return f"charged {amount}"
+
+    runtime = AgentRuntime(memory_db, empty_policy_engine, LocalExecutor(tools={"charge": charge}))
+    task = await runtime.create_task("Bill")
+    await runtime.execute_step(task, "charge", {"amount": 5})
+    assert calls == [f"{task.task_id}:0"]
+
+    # Simulate a crash after the journal write but before the COMPLETED save
+    task.steps[0].status = "RUNNING"
+    task.steps[0].output_data = None
+    await memory_db.save_task(task)
+
+    resumed = await runtime.resume_task(task.task_id)
+    assert resumed.steps[0].status == "COMPLETED"
+    assert resumed.steps[0].output_data == {"result": "charged 5"}
+    assert len(calls) == 1
+
+@pytest.mark.asyncio
+async def test_interrupted_step_retry_reuses_idempotency_key(memory_db, empty_policy_engine):
+    from taskcraft.core.runtime import INTERRUPTED_ERROR
+
+    calls = []
+
+    async def charge(amount: int, idempotency_key: str):
+        calls.append(idempotency_key)
+        return "ok"
+
+    runtime = AgentRuntime(memory_db, empty_policy_engine, LocalExecutor(tools={"charge": charge}))
+    task = await runtime.create_task("Bill")
+    await runtime.execute_step(task, "charge", {"amount": 5})
+
+    # Crash before the journal write: the outcome is unknown
+    task.steps.append(task.steps[0].model_copy(update={"index": 1, "status": "RUNNING", "idempotency_key": "k-1"}))
+    task.current_step_index = 2
+    await memory_db.save_task(task)
+
+    resumed = await runtime.resume_task(task.task_id)
+    assert resumed.steps[1].status == "FAILED"
+    assert resumed.steps[1].error == INTERRUPTED_ERROR
+
+    await runtime.execute_step(resumed, "charge", {"amount": 5})
+    assert calls[-1] == "k-1"
+    assert resumed.steps[2].idempotency_key == "k-1"
+
+@pytest.mark.asyncio
+async def test_step_records_retries_against_task_budget(state_backend, empty_policy_engine):
+    from tenacity import wait_none
+    from taskcraft.tools.decorators import retryable_tool
+
+    failures = {"left": 5}
+
+    @retryable_tool(max_attempts=4)
+    async def fetch():
+        if failures["left"]:
+            failures["left"] -= 1
+            raise ConnectionError("reset")
+        return "data"
+
+    runtime = AgentRuntime(state_backend, empty_policy_engine,
+                           LocalExecutor(tools={"fetch": fetch.retry_with(wait=wait_none())}),
+                           max_task_retries=4)
+    task = await runtime.create_task("Fetch")
+
+    first = await runtime.execute_step(task, "fetch", {})
+    assert first["status"] == "FAILED" and task.steps[0].retries == 3
+
+    # Only one retry left in the task's budget
+    failures["left"] = 2
+    second = await runtime.execute_step(task, "fetch", {})
+    assert second["status"] == "FAILED" and task.steps[1].retries == 1
+    reloaded = await state_backend.load_task(task.task_id)
+    assert [s.retries for s in reloaded.steps] == [3, 1]
+    # The budget survives a reload: nothing left for a resumed run either
+    assert runtime._retry_budget(reloaded).used == {"fetch": 4}
+
+@pytest.mark.asyncio
+async def test_steps_after_a_reload_get_new_keys(state_backend, empty_policy_engine):
+    keys = []
+
+    async def charge(amount: int, idempotency_key: str):
+        keys.append(idempotency_key)
+        return "ok"
+
+    runtime = AgentRuntime(state_backend, empty_policy_engine, LocalExecutor(tools={"charge": charge}))
+    task = await runtime.create_task("Bill twice")
+    await runtime.execute_step(task, "charge", {"amount": 5})
+
+    reloaded = await runtime.resume_task(task.task_id)
+    assert reloaded.current_step_index == 1
+    await runtime.execute_step(reloaded, "charge", {"amount": 7})
+
+    stored = await state_backend.load_task(task.task_id)
+    assert [s.input_data["amount"] for s in stored.steps] == [5, 7]
+    assert len(set(keys)) == 2 and [s.idempotency_key for s in stored.steps] == keys
@@ -0,0 +1,46 @@
+import pytest
+from taskcraft.core.runtime import AgentRuntime
+from taskcraft.core.scheduler import FairShareScheduler, QueueHead
+from taskcraft.executor.local import LocalExecutor
+
+def test_priority_classes_win_until_aging_catches_up():
+    scheduler = FairShareScheduler(aging_seconds=60)
+    batch = QueueHead("etl", "batch", 1.0, oldest=0.0, depth=2000)
+    interactive = QueueHead("support", "interactive", 1.0, oldest=90.0, depth=1)
+
+    assert scheduler.select([batch, interactive], {}, now=100.0) is interactive
+    # After two aging periods the batch queue reaches the top class and, being older, goes first
+    assert scheduler.select([batch, interactive], {}, now=130.0) is batch
+
+def test_fair_share_prefers_tenant_with_least_weighted_load():
+    scheduler = FairShareScheduler(aging_seconds=0)
+    heavy = QueueHead("etl", "normal", 1.0, oldest=0.0, depth=2000)
+    light = QueueHead("ops", "normal", 1.0, oldest=50.0, depth=3)
+    assert scheduler.select([heavy, light], {"etl": 4, "ops": 1}, now=60.0) is light
+
+    # A tenant with 4x the weight is entitled to 4x the in-flight work
+    heavy.weight = 8.0
+    assert scheduler.select([heavy, light], {"etl": 4, "ops": 1}, now=60.0) is heavy
+
+@pytest.mark.asyncio
+async def test_claims_interleave_tenants_and_report_queue_stats(memory_db, empty_policy_engine):
+    runtime = AgentRuntime(memory_db, empty_policy_engine, LocalExecutor({}))
+    for i in range(6):
+        await runtime.create_task(f"bulk {i}", tenant="etl", priority="batch")
+    urgent = await runtime.create_task("page", tenant="ops", priority="interactive")
+    for i in range(2):
+        await runtime.create_task(f"ops {i}", tenant="ops")
+    for i in range(2):
+        await runtime.create_task(f"billing {i}", tenant="billing")
+
+    stats = await memory_db.queue_stats()
+    assert stats["batch"]["depth"] == 6 and stats["interactive"]["depth"] == 1
+
+    claimed = [await memory_db.claim_task(f"w{i}", 30) for i in range(5)]
+    assert claimed[0].task_id == urgent.task_id
+    # Normal-class work is spread across tenants before the batch backlog
+    assert sorted(t.tenant for t in claimed[1:]) == ["billing", "billing", "ops", "ops"]
+
+    stats = await memory_db.queue_stats()
+    assert stats["interactive"]["in_flight"] == 1
+    assert stats["normal"] == {**stats["normal"], "depth": 0, "in_flight": 4}
@@ -0,0 +1,142 @@
+import asyncio
+import pytest
+from types import SimpleNamespace
+from taskcraft.core.lifecycle import AgentState
+from taskcraft.core.runtime import AgentRuntime, SPAWN_SUBTASKS
+from taskcraft.core.worker import TaskWorker
+from taskcraft.executor.local import LocalExecutor
+
+def call(name, args):
+    return SimpleNamespace(text="", parts=[SimpleNamespace(function_call=SimpleNamespace(name=name, args=args))])
+
+class FanOutPlanner:
+    """Parents fan out once; children answer with a thought, then finish."""
+    def __init__(self, objectives, **spawn_args):
+        self.spawn = {"objectives": objectives, **spawn_args}
+        self.active = 0
+        self.peak = 0
+
+    async def plan(self, task, history):
+        if task.parent_id is None:
+            if not task.steps:
+                return call(SPAWN_SUBTASKS, self.spawn)
+            return SimpleNamespace(text="DONE", parts=[])
+        if task.steps:
+            return SimpleNamespace(text="DONE", parts=[])
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(10 if task.description == "hang" else 0.01)
+        self.active -= 1
+        return SimpleNamespace(text=f"answer to {task.description}", parts=[])
+
+@pytest.mark.asyncio
+async def test_children_run_concurrently_and_results_fold_into_parent(memory_db, empty_policy_engine):
+    runtime = AgentRuntime(memory_db, empty_policy_engine, LocalExecutor({}), subtask_concurrency=3)
+    parent = await runtime.create_task("triage", tenant="ops")
+    planner = FanOutPlanner([f"incident {i}" for i in range(6)])
+
+    await runtime.run_loop(parent, planner)
+
+    assert parent.status == AgentState.COMPLETED
+    assert planner.peak == 3
+    summary = parent.steps[0].output_data["result"]
+    assert summary["completed"] == 6
+    assert summary["results"][0]["result"] == "answer to incident 0"
+
+    children = await memory_db.list_children(parent.task_id)
+    assert len(children) == 6
+    assert all(c.parent_id == parent.task_id and c.tenant == "ops" for c in children)
+    # Each child's history holds only its own objective
+    assert all(len(c.steps) == 1 for c in children)
+
+@pytest.mark.asyncio
+async def test_quorum_stops_waiting_and_terminates_stragglers(memory_db, empty_policy_engine):
+    runtime = AgentRuntime(memory_db, empty_policy_engine, LocalExecutor({}))
+    parent = await runtime.create_task("any two")
+    planner = FanOutPlanner(["a", "hang", "b"], quorum=2, timeout_seconds=5)
+
+    await asyncio.wait_for(runtime.run_loop(parent, planner), 3)
+
+    summary = parent.steps[0].output_data["result"]
+    assert (summary["completed"], summary["failed"]) == (2, 1)
+    hung = next(c for c in await memory_db.list_children(parent.task_id) if c.description == "hang")
+    assert hung.status == AgentState.TERMINATED
+
+@pytest.mark.asyncio
+async def test_timeout_without_quorum_fails_the_step(memory_db, empty_policy_engine):
+    runtime = AgentRuntime(memory_db, empty_policy_engine, LocalExecutor({}))
+    parent = await runtime.create_task("all")
+    result = await runtime.execute_step(parent, SPAWN_SUBTASKS, {"objectives": ["a", "hang"], "timeout_seconds": 0.2},
+                                        planner=FanOutPlanner([]))
+    assert result["status"] == "FAILED"
+    assert "quorum not reached (1/2" in result["error"]
+
+@pytest.mark.asyncio
+async def test_bad_spawn_arguments_fail_the_step(memory_db, empty_policy_engine):
+    runtime = AgentRuntime(memory_db, empty_policy_engine, LocalExecutor({}))
+    parent = await runtime.create_task("bad args")
+    for params in ({"quorum": "two"}, {"timeout_seconds": "soon"}, {"timeout_seconds": -1}):
+        result = await runtime.execute_step(parent, SPAWN_SUBTASKS, {"objectives": ["a", "b"], **params},
+                                            planner=FanOutPlanner([]))
+        assert result["status"] == "FAILED" and SPAWN_SUBTASKS in result["error"], params
+    assert [s.status for s in parent.steps] == ["FAILED"] * 3
+    assert await memory_db.list_children(parent.task_id) == []
+
+@pytest.mark.asyncio
+async def test_delegated_children_are_run_by_workers(memory_db, empty_policy_engine):
+    runtime = AgentRuntime(memory_db, empty_policy_engine, LocalExecutor({}),
+                           delegate_subtasks=True, subtask_poll_interval=0.01)
+    planner = FanOutPlanner(["x", "y"])
+
+    async def resolve(task):
+        return runtime, planner
+
+    workers = [TaskWorker(memory_db, resolve, poll_interval=0.01) for _ in range(2)]
+    parent = await runtime.create_task("delegate")
+    stop = asyncio.Event()
+    fleet = asyncio.gather(*[w.run(stop=stop) for w in workers])
+    try:
+        await asyncio.wait_for(_until_done(memory_db, parent.task_id), 5)
+    finally:
+        stop.set()
+        await fleet
+
+    parent = await memory_db.load_task(parent.task_id)
+    assert parent.status == AgentState.COMPLETED
+    assert parent.steps[0].output_data["result"]["completed"] == 2
+
+async def _until_done(db, task_id):
+    while (await db.load_task(task_id)).status != AgentState.COMPLETED:
+        await asyncio.sleep(0.01)
+
+class RetryingSpawnPlanner:
+    """The parent spawns until the spawn step completes; children finish at once."""
+    async def plan(self, task, history):
+        if task.parent_id is None and not any(s.name == SPAWN_SUBTASKS and s.status == "COMPLETED" for s in task.steps):
+            return call(SPAWN_SUBTASKS, {"objectives": ["x", "y"]})
+        return SimpleNamespace(text="DONE", parts=[])
+
+@pytest.mark.asyncio
+async def test_retried_spawn_reattaches_to_its_children(state_backend, empty_policy_engine):
+    # Crash while waiting on delegated children: the spawn step is left RUNNING
+    crashed = AgentRuntime(state_backend, empty_policy_engine, LocalExecutor({}),
+                           delegate_subtasks=True, subtask_poll_interval=0.01)
+    parent = await crashed.create_task("fan out")
+    loop = asyncio.create_task(crashed.run_loop(parent, RetryingSpawnPlanner()))
+    while len(await state_backend.list_children(parent.task_id)) < 2:
+        await asyncio.sleep(0.01)
+    loop.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await loop
+
+    # On resume the interrupted spawn is retried with the same key and finds the children it made
+    runtime = AgentRuntime(state_backend, empty_policy_engine, LocalExecutor({}))
+    parent = await runtime.resume_task(parent.task_id)
+    await runtime.run_loop(parent, RetryingSpawnPlanner())
+
+    assert parent.status == AgentState.COMPLETED
+    assert [s.status for s in parent.steps] == ["FAILED", "COMPLETED"]
+    assert parent.steps[0].idempotency_key == parent.steps[1].idempotency_key
+    children = await state_backend.list_children(parent.task_id)
+    assert len(children) == 2
+    assert all(c.status == AgentState.COMPLETED for c in children)
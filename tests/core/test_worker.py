@@ -0,0 +1,96 @@
+import asyncio
+import multiprocessing
+import os
+import pytest
+from types import SimpleNamespace
+from taskcraft.core.lifecycle import AgentState
+from taskcraft.core.runtime import AgentRuntime
+from taskcraft.core.worker import TaskWorker
+from taskcraft.executor.local import LocalExecutor
+from taskcraft.governance.policy import PolicyEngine
+from taskcraft.state.persistence import SQLiteStateManager
+
+class DonePlanner:
+    """Finishes every task immediately, recording which process ran it."""
+    def __init__(self, log_path=None):
+        self.log_path = log_path
+
+    async def plan(self, task, history):
+        if self.log_path:
+            with open(self.log_path, "a") as f:
+                f.write(f"{task.task_id} {os.getpid()}\n")
+        return SimpleNamespace(text="DONE", parts=[])
+
+def resolver(db, log_path=None):
+    runtime = AgentRuntime(db, PolicyEngine([]), LocalExecutor({}))
+    async def resolve(task):
+        return runtime, DonePlanner(log_path)
+    return resolve
+
+@pytest.mark.asyncio
+async def test_claims_are_exclusive_and_expired_leases_are_stolen(memory_db, empty_policy_engine):
+    runtime = AgentRuntime(memory_db, empty_policy_engine, LocalExecutor({}))
+    tasks = [await runtime.create_task(f"t{i}") for i in range(5)]
+
+    claims = await asyncio.gather(*[memory_db.claim_task(f"w{i}", 30) for i in range(8)])
+    owners = {c.task_id: f"w{i}" for i, c in enumerate(claims) if c}
+    assert sorted(owners) == sorted(t.task_id for t in tasks)
+
+    # Saves keep the lease; only the owner can renew it
+    await memory_db.save_task(tasks[0])
+    assert await memory_db.claim_task("w9", 30) is None
+    owner = owners[tasks[0].task_id]
+    assert await memory_db.heartbeat(tasks[0].task_id, owner, 30)
+    assert not await memory_db.heartbeat(tasks[0].task_id, "w9", 30)
+
+    # A lease that lapses (dead worker) can be claimed by someone else
+    await memory_db.heartbeat(tasks[0].task_id, owner, -1)
+    stolen = await memory_db.claim_task("w9", 30)
+    assert stolen.task_id == tasks[0].task_id
+    assert not await memory_db.heartbeat(tasks[0].task_id, owner, 30)
+
+@pytest.mark.asyncio
+async def test_worker_runs_queued_tasks(memory_db, empty_policy_engine):
+    runtime = AgentRuntime(memory_db, empty_policy_engine, LocalExecutor({}))
+    tasks = [await runtime.create_task(f"t{i}") for i in range(3)]
+    halted = await runtime.create_task("needs approval")
+    halted.status = AgentState.AWAITING_APPROVAL
+    await memory_db.save_task(halted)
+
+    worker = TaskWorker(memory_db, resolver(memory_db), lease_seconds=5, poll_interval=0.01)
+    assert await worker.run(max_tasks=3) == 3
+    assert await worker.run_once() is None
+    for task in tasks:
+        assert (await memory_db.load_task(task.task_id)).status == AgentState.COMPLETED
+    # Released after completion
+    assert await memory_db.claim_task("other", 5, task_id=tasks[0].task_id) is None
+
+def _drain(db_path, log_path):
+    asyncio.events._set_running_loop(None)
+    db = SQLiteStateManager(db_path)
+    async def main():
+        worker = TaskWorker(db, resolver(db, log_path), lease_seconds=5)
+        while await worker.run_once():
+            pass
+    asyncio.run(main())
+
+def test_worker_processes_share_one_sqlite_queue(tmp_path):
+    db_path, log_path = str(tmp_path / "state.db"), str(tmp_path / "runs.log")
+    db = SQLiteStateManager(db_path)
+    async def setup():
+        await db.initialize()
+        runtime = AgentRuntime(db, PolicyEngine([]), LocalExecutor({}))
+        return [(await runtime.create_task(f"t{i}")).task_id for i in range(12)]
+    task_ids = asyncio.run(setup())
+
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_drain, args=(db_path, log_path)) for _ in range(3)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(timeout=30)
+        assert p.exitcode == 0
+
+    with open(log_path) as f:
+        runs = [line.split()[0] for line in f]
+    assert sorted(runs) == sorted(task_ids)
@@ -0,0 +1,95 @@
+import os
+import pytest
+from taskcraft.executor.cache import CachingExecutor, CachePolicy, cache_key
+from taskcraft.executor.local import LocalExecutor
+from taskcraft.tools.decorators import cacheable_tool
+
+calls = []
+
+@cacheable_tool
+async def read_tool(path: str) -> str:
+    calls.append(path)
+    with open(path) as f:
+        return f.read()
+
+@cacheable_tool(ttl=0)
+async def expiring_tool(week: str) -> str:
+    calls.append(week)
+    return week
+
+async def flaky_tool(x: int) -> int:
+    calls.append(x)
+    raise RuntimeError("boom")
+
+def build(tools, **kwargs):
+    calls.clear()
+    return CachingExecutor(LocalExecutor(tools), tools, **kwargs)
+
+def test_cache_key_is_order_independent():
+    assert cache_key("t", {"a": 1, "b": [1, 2]}) == cache_key("t", {"b": [1, 2], "a": 1})
+    assert cache_key("t", {"a": 1}) != cache_key("u", {"a": 1})
+
+@pytest.mark.asyncio
+async def test_hits_are_served_from_cache_and_invalidated_by_file_changes(tmp_path):
+    target = tmp_path / "notes.txt"
+    target.write_text("v1")
+    executor = build({"read": read_tool})
+
+    assert (await executor.execute("read", {"path": str(target)}))["output"] == "v1"
+    assert (await executor.execute("read", {"path": str(target)}))["output"] == "v1"
+    assert len(calls) == 1
+
+    target.write_text("version 2")
+    st = os.stat(target)
+    os.utime(target, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert (await executor.execute("read", {"path": str(target)}))["output"] == "version 2"
+    assert len(calls) == 2
+    assert executor.stats()["read"] == {"hits": 1, "misses": 2, "invalidations": 1, "hit_rate": 0.333}
+    await executor.close()
+
+@pytest.mark.asyncio
+async def test_ttl_errors_and_unmarked_tools_bypass_cache():
+    executor = build({"week": expiring_tool, "flaky": flaky_tool},
+                     policies={"flaky": CachePolicy()})
+
+    await executor.execute("week", {"week": "2026-W03"})
+    await executor.execute("week", {"week": "2026-W03"})
+    assert (await executor.execute("flaky", {"x": 1}))["status"] == "ERROR"
+    await executor.execute("flaky", {"x": 1})
+    assert calls == ["2026-W03", "2026-W03", 1, 1]
+    await executor.close()
+
+@pytest.mark.asyncio
+async def test_lru_bound_and_persistent_tier(tmp_path):
+    db = str(tmp_path / "cache.db")
+    executor = build({"week": cacheable_tool(ttl=None)(lambda week: calls.append(week) or week)},
+                     max_entries=1, path=db)
+    await executor.execute("week", {"week": "a"})
+    await executor.execute("week", {"week": "b"})
+    assert len(executor._entries) == 1
+    await executor.close()
+
+    # A fresh executor (e.g. the next run) is served from the SQLite tier
+    restarted = CachingExecutor(LocalExecutor(executor.inner.tools), executor.inner.tools, path=db)
+    assert await restarted.execute("week", {"week": "a"}) == {"status": "SUCCESS", "output": "a"}
+    assert calls == ["a", "b"]
+    assert restarted.stats()["week"]["hits"] == 1
+    await restarted.close()
+
+@pytest.mark.asyncio
+async def test_lru_is_bounded_by_result_size():
+    executor = build({"blob": cacheable_tool(ttl=None)(lambda size: calls.append(size) or "x" * size)},
+                     max_bytes=250, max_entry_bytes=200)
+    for size in (100, 100, 40):
+        await executor.execute("blob", {"size": size})
+    # The budget (serialized JSON, quotes included) holds the two newest results
+    assert len(executor._entries) == 2 and executor._bytes == 102 + 42
+    assert (await executor.execute("blob", {"size": 40}))["output"] == "x" * 40
+    assert calls == [100, 40]
+
+    # Over the per-entry cap: returned, never cached
+    assert (await executor.execute("blob", {"size": 500}))["output"] == "x" * 500
+    await executor.execute("blob", {"size": 500})
+    assert calls == [100, 40, 500, 500]
+    assert executor._bytes == 144
+    await executor.close()
@@ -0,0 +1,188 @@
+import asyncio
+import threading
+import time
+import pytest
+from taskcraft.executor.docker import DockerExecutor
+
+class FakeContainer:
+    _ids = 0
+
+    def __init__(self, handler):
+        FakeContainer._ids += 1
+        self.short_id = f"c{FakeContainer._ids}"
+        self.status = "running"
+        self.removed = False
+        self.killed = threading.Event()
+        self.execs = []
+        self._handler = handler
+
+    def exec_run(self, cmd, **kwargs):
+        self.execs.append(cmd)
+        return self._handler(self, cmd)
+
+    def kill(self):
+        self.killed.set()
+
+    def reload(self):
+        pass
+
+    def remove(self, force=False):
+        self.removed = True
+        self.status = "removed"
+
+class FakeContainers:
+    def __init__(self, handler):
+        self.started = []
+        self._handler = handler
+
+    def run(self, image, **kwargs):
+        assert kwargs["network_disabled"] is True
+        container = FakeContainer(self._handler)
+        self.started.append(container)
+        return container
+
+class FakeImages:
+    def get(self, image):
+        return image
+
+class FakeDockerClient:
+    def __init__(self, handler=None):
+        self.images = FakeImages()
+        self.containers = FakeContainers(handler or (lambda container, cmd: (0, b"ok\n")))
+
+@pytest.mark.asyncio
+async def test_pool_reuses_warm_containers():
+    client = FakeDockerClient()
+    executor = DockerExecutor(client=client, pool_size=1, max_uses=3)
+    await asyncio.wrap_future(executor._ready)
+    assert len(client.containers.started) == 1
+
+    for _ in range(3):
+        result = await executor.execute("run_shell", {"command": "echo ok"})
+        assert result == {"status": "SUCCESS", "output": "ok\n"}
+    await asyncio.wrap_future(executor._refill)
+
+    # Three calls served by the single pre-started container, which is then recycled;
+    # a fresh one was started in the background for the next caller
+    first = client.containers.started[0]
+    assert len(first.execs) == 3
+    assert first.execs[0][-3:] == ["/bin/sh", "-c", "echo ok"]
+    assert first.removed is True
+    assert len(client.containers.started) == 2
+
+    await executor.execute("run_python", {"code": "print(1)"})
+    assert len(client.containers.started[1].execs) == 1
+    await asyncio.wrap_future(executor._refill)
+    await executor.close()
+    assert all(c.removed for c in client.containers.started)
+
+@pytest.mark.asyncio
+async def test_pool_recycles_dirty_and_unhealthy_containers():
+    outcome = {"exit": (1, b"boom")}
+    client = FakeDockerClient(lambda container, cmd: outcome["exit"])
+    executor = DockerExecutor(client=client, pool_size=1)
+
+    result = await executor.execute("run_shell", {"command": "false"})
+    assert result["status"] == "ERROR"
+    assert client.containers.started[0].removed is True
+    await asyncio.wrap_future(executor._refill)
+
+    # A container that died while idle is replaced on acquire
+    outcome["exit"] = (0, b"")
+    await executor.execute("run_shell", {"command": "true"})
+    idle = client.containers.started[1]
+    assert idle.execs and not idle.removed
+    await asyncio.wrap_future(executor._refill)
+    idle.status = "exited"
+    await executor.execute("run_shell", {"command": "true"})
+    assert idle.removed is True
+    await asyncio.wrap_future(executor._refill)
+    await executor.close()
+
+@pytest.mark.asyncio
+async def test_containers_are_never_shared_between_tasks():
+    from taskcraft.executor.base import current_task_id
+    client = FakeDockerClient()
+    executor = DockerExecutor(client=client, pool_size=2)
+    await asyncio.wrap_future(executor._ready)
+
+    async def call_as(task_id):
+        token = current_task_id.set(task_id)
+        try:
+            await executor.execute("run_shell", {"command": f"touch /tmp/{task_id}"})
+        finally:
+            current_task_id.reset(token)
+        await asyncio.wrap_future(executor._refill)
+
+    await call_as("a")
+    await call_as("a")
+    await call_as("b")
+    served = {c.short_id: {cmd[-1] for cmd in c.execs} for c in client.containers.started if c.execs}
+    assert sorted(served.values(), key=sorted) == [{"touch /tmp/a"}, {"touch /tmp/b"}]
+
+    # Idle containers are capped at pool_size: the least recently active task's go first
+    await call_as("c")
+    a_container = next(c for c in client.containers.started if "touch /tmp/a" in {cmd[-1] for cmd in c.execs})
+    assert a_container.removed is True
+    await call_as("a")
+    assert len([c for c in client.containers.started if "touch /tmp/a" in {cmd[-1] for cmd in c.execs}]) == 2
+    await executor.close()
+
+@pytest.mark.asyncio
+async def test_unsupported_tool_reports_protocol_mismatch():
+    executor = DockerExecutor(client=FakeDockerClient(), pool_size=0)
+    result = await executor.execute("send_report", {})
+    assert result["status"] == "ERROR"
+    assert "protocol mismatch" in result["error"]
+
+@pytest.mark.asyncio
+async def test_calls_run_off_the_event_loop_with_a_concurrency_cap():
+    active, peak = 0, 0
+    lock = threading.Lock()
+
+    def slow(container, cmd):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.1)
+        with lock:
+            active -= 1
+        return (0, b"done")
+
+    executor = DockerExecutor(client=FakeDockerClient(slow), pool_size=0, max_concurrency=2)
+
+    ticks = 0
+    async def heartbeat():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    beat = asyncio.create_task(heartbeat())
+    results = await asyncio.gather(*[
+        executor.execute("run_shell", {"command": "sleep"}) for _ in range(4)
+    ])
+    beat.cancel()
+
+    assert all(r["status"] == "SUCCESS" for r in results)
+    assert peak == 2
+    assert ticks >= 10  # the loop kept running while sandbox calls blocked
+    await executor.close()
+
+@pytest.mark.asyncio
+async def test_overrunning_call_kills_container():
+    def hang(container, cmd):
+        container.killed.wait(5)
+        return (137, b"")
+
+    client = FakeDockerClient(hang)
+    executor = DockerExecutor(client=client, pool_size=0, timeout=0.05, kill_grace=0.05)
+    result = await executor.execute("run_shell", {"command": "sleep 100"})
+
+    assert result["status"] == "ERROR"
+    assert "Timed out" in result["error"]
+    container = client.containers.started[0]
+    assert container.killed.is_set()
+    assert container.removed is True
+    await executor.close()
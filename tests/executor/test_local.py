@@ -0,0 +1,76 @@
+import asyncio
+import os
+import threading
+import time
+import pytest
+from taskcraft.executor.local import LocalExecutor
+from taskcraft.tools.decorators import blocking_tool, cpu_bound_tool, retryable_tool
+
+def sync_tool(x: int) -> int:
+    return x * 2
+
+@blocking_tool
+@retryable_tool()
+async def blocking_async_tool(seconds: float) -> str:
+    time.sleep(seconds)
+    return threading.current_thread().name
+
+async def async_tool() -> str:
+    return threading.current_thread().name
+
+@pytest.mark.asyncio
+async def test_sync_functions_are_first_class_tools():
+    executor = LocalExecutor({"double": sync_tool})
+    assert await executor.execute("double", {"x": 21}) == {"status": "SUCCESS", "output": 42}
+    await executor.close()
+
+@pytest.mark.asyncio
+async def test_blocking_tools_run_off_the_event_loop():
+    executor = LocalExecutor({"slow": blocking_async_tool, "fast": async_tool}, max_workers=2)
+
+    ticks = 0
+    async def heartbeat():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    beat = asyncio.create_task(heartbeat())
+    started = time.monotonic()
+    results = await asyncio.gather(*[executor.execute("slow", {"seconds": 0.1}) for _ in range(4)])
+    elapsed = time.monotonic() - started
+    beat.cancel()
+
+    assert all(r["output"].startswith("taskcraft-tool") for r in results)
+    assert ticks >= 10
+    assert 0.2 <= elapsed < 0.4  # two threads, four calls
+
+    # Unmarked coroutine tools stay on the loop thread
+    assert (await executor.execute("fast", {}))["output"] == threading.current_thread().name
+    await executor.close()
+
+@cpu_bound_tool
+def crunch(n: int) -> dict:
+    return {"total": sum(i * i for i in range(n)), "pid": os.getpid()}
+
+@cpu_bound_tool
+def unpicklable() -> object:
+    return lambda: None
+
+@pytest.mark.asyncio
+async def test_cpu_bound_tools_use_process_lane():
+    executor = LocalExecutor({"crunch": crunch, "bad": unpicklable}, process_workers=1, process_max_tasks=2)
+    try:
+        first = await executor.execute("crunch", {"n": 1000})
+        second = await executor.execute("crunch", {"n": 10})
+        third = await executor.execute("crunch", {"n": 10})
+        assert first["output"]["total"] == sum(i * i for i in range(1000))
+        assert first["output"]["pid"] != os.getpid()
+        assert first["output"]["pid"] == second["output"]["pid"]
+        assert third["output"]["pid"] != first["output"]["pid"]  # recycled after 2 tasks
+
+        result = await executor.execute("bad", {})
+        assert result["status"] == "ERROR"
+        assert "picklable" in result["error"]
+    finally:
+        await executor.close()
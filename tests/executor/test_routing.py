@@ -0,0 +1,100 @@
+import asyncio
+import os
+import threading
+import pytest
+from taskcraft.config.schema import AgentConfig
+from taskcraft.executor.routing import RoutingExecutor
+
+def where() -> dict:
+    return {"pid": os.getpid(), "thread": threading.current_thread().name}
+
+async def where_async() -> dict:
+    return where()
+
+class SlowBackend:
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def execute(self, tool_name, params):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.02)
+        self.active -= 1
+        if tool_name == "bad":
+            return {"status": "ERROR", "error": "nope"}
+        return {"status": "SUCCESS", "output": tool_name}
+
+@pytest.mark.asyncio
+async def test_from_config_routes_tools_to_backends():
+    config = AgentConfig(
+        name="Router", description="d", objective="o",
+        executor={"default": "inline", "routes": {"where": "process", "where_async": "thread"}},
+    )
+    tools = {"where": where, "where_async": where_async, "other": where_async}
+    executor = RoutingExecutor.from_config(config, tools, process_workers=1)
+    try:
+        assert set(executor.backends) == {"inline", "thread", "process"}
+        in_process = (await executor.execute("where", {}))["output"]
+        in_thread = (await executor.execute("where_async", {}))["output"]
+        inline = (await executor.execute("other", {}))["output"]
+
+        assert in_process["pid"] != os.getpid()
+        assert in_thread["pid"] == os.getpid()
+        assert in_thread["thread"].startswith("taskcraft-tool")
+        assert inline["thread"] == threading.current_thread().name
+
+        metrics = executor.metrics()
+        assert metrics["process"]["calls"] == 1
+        assert metrics["inline"]["calls"] == 1
+    finally:
+        await executor.close()
+
+def test_docker_backend_gets_the_module_of_every_docker_tool(monkeypatch):
+    def tool_from(module):
+        def tool():
+            pass
+        tool.__module__ = module
+        return tool
+
+    built = {}
+    def fake_build(route, tools, docker_modules, options):
+        built[route] = docker_modules
+        return SlowBackend()
+    monkeypatch.setattr(RoutingExecutor, "_build_backend", staticmethod(fake_build))
+
+    tools = {"convert": tool_from("acme.convert"), "scan": tool_from("acme.scan"), "report": tool_from("acme.report")}
+    config = AgentConfig(
+        name="Router", description="d", objective="o",
+        tools=[{"module": "acme.convert", "executor": "docker"}],
+        executor={"default": "local", "routes": {"scan": "docker"}},
+    )
+    RoutingExecutor.from_config(config, tools)
+    assert built["docker"] == ["acme.convert", "acme.scan"]
+
+    # Tools left on a docker default route need their modules too
+    config = AgentConfig(name="Router", description="d", objective="o",
+                         executor={"default": "docker", "routes": {"report": "inline"}})
+    RoutingExecutor.from_config(config, tools)
+    assert built["docker"] == ["acme.convert", "acme.scan"]
+
+@pytest.mark.asyncio
+async def test_per_route_concurrency_and_metrics():
+    slow = SlowBackend()
+    executor = RoutingExecutor({"sandbox": slow, "local": SlowBackend()}, routes={"bad": "sandbox", "risky": "sandbox"},
+                               default="local", concurrency={"sandbox": 2})
+
+    await asyncio.gather(*[executor.execute("risky", {}) for _ in range(5)], executor.execute("bad", {}))
+    await executor.execute("safe", {})
+
+    assert slow.peak == 2
+    metrics = executor.metrics()
+    assert metrics["sandbox"]["calls"] == 6
+    assert metrics["sandbox"]["errors"] == 1
+    assert metrics["sandbox"]["in_flight"] == 0
+    assert metrics["sandbox"]["avg_ms"] >= 20
+    assert metrics["local"]["calls"] == 1
+
+def test_unknown_route_is_rejected():
+    with pytest.raises(ValueError):
+        RoutingExecutor({"local": SlowBackend()}, routes={"x": "docker"}, default="local")
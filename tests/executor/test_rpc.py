@@ -0,0 +1,104 @@
+import os
+import socket
+import subprocess
+import sys
+import threading
+import pytest
+from taskcraft.executor.rpc import FrameDecoder, encode_frame, read_frame, serve
+from taskcraft.executor.docker import DockerRpcChannel, STREAM_HEADER
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../src"))
+
+TOOLS_MODULE = '''
+import os
+
+async def shout(text: str) -> str:
+    print("noise that must not corrupt the channel")
+    return text.upper()
+
+def add(a: int, b: int) -> dict:
+    return {"sum": a + b, "pid": os.getpid()}
+
+def fail(path: str):
+    raise FileNotFoundError(path)
+'''
+
+@pytest.fixture
+def tools_module(tmp_path):
+    (tmp_path / "rpc_sample_tools.py").write_text(TOOLS_MODULE)
+    return tmp_path
+
+def test_frame_decoder_handles_split_chunks():
+    data = encode_frame({"id": 1, "ok": True}) + encode_frame({"id": 2, "ok": False})
+    decoder = FrameDecoder()
+    messages = []
+    for i in range(len(data)):
+        messages.extend(decoder.feed(data[i:i + 1]))
+    assert [m["id"] for m in messages] == [1, 2]
+
+def test_worker_serves_many_calls_from_one_process(tools_module):
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([SRC, str(tools_module)])}
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "taskcraft.executor.rpc", "rpc_sample_tools"],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env,
+    )
+    try:
+        handshake = read_frame(proc.stdout)
+        assert handshake["ok"] is True
+        assert handshake["result"]["tools"] == ["add", "fail", "shout"]
+
+        def call(call_id, tool, params):
+            proc.stdin.write(encode_frame({"id": call_id, "tool": tool, "params": params}))
+            proc.stdin.flush()
+            return read_frame(proc.stdout)
+
+        assert call(1, "shout", {"text": "hi"}) == {"id": 1, "ok": True, "result": "HI"}
+        first = call(2, "add", {"a": 1, "b": 2})
+        second = call(3, "add", {"a": 2, "b": 2})
+        assert first["result"]["sum"] == 3
+        assert first["result"]["pid"] == second["result"]["pid"] == proc.pid
+
+        error = call(4, "fail", {"path": "/missing"})
+        assert error["ok"] is False
+        assert error["error"]["type"] == "FileNotFoundError"
+        assert call(5, "nope", {})["error"]["type"] == "LookupError"
+    finally:
+        proc.stdin.close()
+        proc.wait(timeout=5)
+
+def test_docker_rpc_channel_demultiplexes_exec_socket(tools_module, monkeypatch):
+    monkeypatch.syspath_prepend(str(tools_module))
+    ours, theirs = socket.socketpair()
+
+    def container_side():
+        # Runs the real worker loop, wrapping its stdout frames in docker's stream headers
+        class Stdout:
+            def write(self, data):
+                theirs.sendall(STREAM_HEADER.pack(2, 5) + b"debug")
+                theirs.sendall(STREAM_HEADER.pack(1, len(data)) + data)
+            def flush(self):
+                pass
+        serve(["rpc_sample_tools"], theirs.makefile("rb"), Stdout())
+        theirs.close()
+
+    worker = threading.Thread(target=container_side, daemon=True)
+    worker.start()
+
+    class FakeApi:
+        def exec_create(self, container_id, cmd, **kwargs):
+            assert cmd[:3] == ["python3", "-m", "taskcraft.executor.rpc"]
+            return {"Id": "exec1"}
+        def exec_start(self, exec_id, socket):
+            return ours
+
+    class FakeClient:
+        api = FakeApi()
+
+    class FakeContainer:
+        id = "c1"
+
+    channel = DockerRpcChannel(FakeClient(), FakeContainer(), ["rpc_sample_tools"], timeout=5)
+    assert "shout" in channel.tools
+    assert channel.call("add", {"a": 40, "b": 2}, timeout=5)["result"]["sum"] == 42
+    channel.close()
+    worker.join(timeout=5)
@@ -0,0 +1,118 @@
+import os
+import time
+import pytest
+from taskcraft.executor.sandbox import SubprocessExecutor
+
+def whoami() -> dict:
+    return {"pid": os.getpid(), "cwd": os.getcwd()}
+
+async def shout(text: str) -> str:
+    return text.upper()
+
+def hang(seconds: float) -> str:
+    time.sleep(seconds)
+    return "finished"
+
+def open_many(count: int) -> int:
+    handles = [open(os.devnull) for _ in range(count)]
+    return len(handles)
+
+def broken(path: str):
+    raise PermissionError(path)
+
+def leave_file(name: str) -> list:
+    os.mkdir("sub")
+    with open(name, "w") as f:
+        f.write("left over")
+    os.chdir("sub")
+    return sorted(os.listdir(".."))
+
+def scratch_listing() -> dict:
+    return {"pid": os.getpid(), "cwd": os.getcwd(), "files": os.listdir(".")}
+
+TOOLS = {"whoami": whoami, "shout": shout, "hang": hang, "open_many": open_many, "broken": broken,
+         "leave_file": leave_file, "scratch_listing": scratch_listing}
+
+@pytest.mark.asyncio
+async def test_tools_run_in_prewarmed_isolated_workers(tmp_path):
+    executor = SubprocessExecutor(TOOLS, workers=1, scratch_root=str(tmp_path), max_tasks_per_worker=2)
+    try:
+        first = await executor.execute("whoami", {})
+        second = await executor.execute("whoami", {})
+        assert first["status"] == "SUCCESS"
+        assert first["output"]["pid"] != os.getpid()
+        assert first["output"]["pid"] == second["output"]["pid"]
+        assert first["output"]["cwd"].startswith(str(tmp_path))
+
+        # Recycled after max_tasks_per_worker, scratch dir cleaned up
+        third = await executor.execute("whoami", {})
+        assert third["output"]["pid"] != first["output"]["pid"]
+        assert not os.path.exists(first["output"]["cwd"])
+
+        assert (await executor.execute("shout", {"text": "hi"}))["output"] == "HI"
+
+        result = await executor.execute("broken", {"path": "/root"})
+        assert result == {"status": "ERROR", "error": "PermissionError: /root"}
+    finally:
+        await executor.close()
+
+@pytest.mark.asyncio
+async def test_scratch_dir_is_emptied_between_calls(tmp_path):
+    executor = SubprocessExecutor(TOOLS, workers=1, scratch_root=str(tmp_path))
+    try:
+        assert (await executor.execute("leave_file", {"name": "secret.txt"}))["output"] == ["secret.txt", "sub"]
+        before = (await executor.execute("whoami", {}))["output"]
+        after = (await executor.execute("scratch_listing", {}))["output"]
+        assert after == {"pid": before["pid"], "cwd": before["cwd"], "files": []}
+    finally:
+        await executor.close()
+
+@pytest.mark.asyncio
+async def test_wall_clock_timeout_kills_worker():
+    executor = SubprocessExecutor(TOOLS, workers=1, timeout=0.2)
+    try:
+        before = (await executor.execute("whoami", {}))["output"]["pid"]
+        result = await executor.execute("hang", {"seconds": 10})
+        assert result["status"] == "ERROR"
+        assert "TimeoutError" in result["error"]
+        after = (await executor.execute("whoami", {}))["output"]["pid"]
+        assert after != before
+    finally:
+        await executor.close()
+
+@pytest.mark.asyncio
+async def test_rlimits_apply_inside_worker():
+    executor = SubprocessExecutor(TOOLS, workers=1, max_open_files=32)
+    try:
+        assert (await executor.execute("open_many", {"count": 5}))["status"] == "SUCCESS"
+        result = await executor.execute("open_many", {"count": 64})
+        assert result["status"] == "ERROR"
+        assert "Too many open files" in result["error"]
+    finally:
+        await executor.close()
+
+@pytest.mark.asyncio
+async def test_lazy_tools_are_imported_before_forking(tmp_path, monkeypatch):
+    import sys
+    from taskcraft.config.registry import ToolRegistry
+
+    (tmp_path / "pid_connector.py").write_text(
+        "import os\nIMPORTED_IN = os.getpid()\n\ndef imported_in() -> int:\n    return IMPORTED_IN\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    manifest = str(tmp_path / "manifest.json")
+    registry = ToolRegistry(manifest)
+    registry.module_tools("pid_connector")
+    registry.save()
+    sys.modules.pop("pid_connector")
+
+    tools = ToolRegistry(manifest).module_tools("pid_connector")
+    assert "pid_connector" not in sys.modules
+    executor = SubprocessExecutor(tools, workers=1, scratch_root=str(tmp_path), max_tasks_per_worker=1)
+    try:
+        for _ in range(2):  # Also after a recycle
+            result = await executor.execute("imported_in", {})
+            assert result == {"status": "SUCCESS", "output": os.getpid()}
+    finally:
+        await executor.close()
+        sys.modules.pop("pid_connector", None)
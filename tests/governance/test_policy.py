@@ -40,3 +40,127 @@ def test_policy_engine_aggregation():
     res = engine.evaluate("read", {}, {'action_count': 5})
     assert res.allowed is False
     assert "limit" in res.reason
+
+def test_parameter_rule_policy(tmp_path):
+    from taskcraft.config.schema import ParamRuleConfig
+    from taskcraft.governance.policy import ParameterRulePolicy
+
+    policy = ParameterRulePolicy([
+        ParamRuleConfig(tool="write_file", param="path", allowed_prefixes=[str(tmp_path)]),
+        ParamRuleConfig(tool="write_file", param="content", max_size=10),
+        ParamRuleConfig(tool="send_report", param="recipient", allowed_domains=["corp.com"], on_violation="block"),
+    ])
+
+    # Benign values pass without approval
+    assert policy.check("write_file", {"path": str(tmp_path / "a.txt"), "content": "hi"}, {}).allowed is True
+    assert policy.check("send_report", {"recipient": "manager@corp.com"}, {}).allowed is True
+    assert policy.check("send_report", {"recipient": "ops@eu.corp.com"}, {}).allowed is True
+    assert policy.check("read_file", {"path": "/etc/passwd"}, {}).allowed is True
+
+    # Risky values require approval
+    decision = policy.check("write_file", {"path": str(tmp_path) + "_evil/a.txt", "content": "hi"}, {})
+    assert decision.allowed is False
+    assert decision.requires_approval is True
+    decision = policy.check("write_file", {"path": str(tmp_path / ".." / "a.txt"), "content": "hi"}, {})
+    assert decision.requires_approval is True
+    decision = policy.check("write_file", {"path": str(tmp_path / "a.txt"), "content": "x" * 11}, {})
+    assert decision.requires_approval is True
+    assert "content" in decision.reason
+
+    # Block rules fail outright
+    decision = policy.check("send_report", {"recipient": "someone@evilcorp.com"}, {})
+    assert decision.allowed is False
+    assert decision.requires_approval is False
+
+    # Every recipient in a list must match, and bare domains don't count as recipients
+    for recipient in ("a@evil.com,b@corp.com", "a@evil.com; b@corp.com", "b@corp.com a@evil.com",
+                      ["b@corp.com", "a@evil.com"], "corp.com", ""):
+        assert policy.check("send_report", {"recipient": recipient}, {}).allowed is False, recipient
+    assert policy.check("send_report", {"recipient": "a@corp.com, <b@eu.corp.com>"}, {}).allowed is True
+    assert policy.check("send_report", {"recipient": "https://hooks.corp.com/x"}, {}).allowed is True
+
+def test_prefix_rule_resolves_symlinks(tmp_path):
+    from taskcraft.config.schema import ParamRuleConfig
+    from taskcraft.governance.policy import ParameterRulePolicy
+
+    allowed, outside = tmp_path / "allowed", tmp_path / "outside"
+    allowed.mkdir()
+    outside.mkdir()
+    (allowed / "escape").symlink_to(outside)
+    (allowed / "inner").symlink_to(allowed)
+    policy = ParameterRulePolicy([ParamRuleConfig(tool="write_file", param="path", allowed_prefixes=[str(allowed)])])
+
+    assert policy.check("write_file", {"path": str(allowed / "inner" / "a.txt")}, {}).allowed is True
+    decision = policy.check("write_file", {"path": str(allowed / "escape" / "a.txt")}, {})
+    assert decision.allowed is False and decision.requires_approval is True
+
+def test_prefix_rule_checks_every_path_in_a_list(tmp_path):
+    from taskcraft.config.schema import ParamRuleConfig
+    from taskcraft.governance.policy import ParameterRulePolicy
+
+    policy = ParameterRulePolicy([ParamRuleConfig(tool="read_many_files", param="paths", allowed_prefixes=[str(tmp_path)])])
+
+    assert policy.check("read_many_files", {"paths": [str(tmp_path / "a.txt"), tmp_path / "b.txt"]}, {}).allowed is True
+    for paths in (["/etc/shadow"], [str(tmp_path / "a.txt"), "/etc/shadow"], [], [str(tmp_path / "a.txt"), 3],
+                  str(tmp_path).encode()):
+        decision = policy.check("read_many_files", {"paths": paths}, {})
+        assert decision.allowed is False and decision.requires_approval is True, paths
+
+def test_bulk_file_tools_are_checked_against_move_file_rules(tmp_path):
+    from taskcraft.config.schema import ParamRuleConfig
+    from taskcraft.governance.policy import ParameterRulePolicy
+
+    inbox, outside = tmp_path / "inbox", tmp_path / "outside"
+    policy = ParameterRulePolicy([
+        ParamRuleConfig(tool="move_file", param="src", allowed_prefixes=[str(inbox)]),
+        ParamRuleConfig(tool="move_file", param="dest_folder", allowed_prefixes=[str(inbox)], on_violation="block"),
+    ])
+
+    inside = [{"op": "move", "src": str(inbox / "a.txt"), "dest": str(inbox / "old" / "a.txt")},
+              {"op": "rename", "src": str(inbox / "b.txt"), "dest": "c.txt"}]
+    assert policy.check("batch_file_operations", {"operations": inside}, {}).allowed is True
+
+    decision = policy.check("batch_file_operations", {"operations": inside + [
+        {"op": "copy", "src": str(outside / "x.txt"), "dest_folder": str(inbox)}]}, {})
+    assert decision.requires_approval is True
+    assert "(as move_file) parameter 'src'" in decision.reason
+
+    decision = policy.check("organize_by_rule", {"path": str(inbox), "dest_root": str(outside)}, {})
+    assert decision.allowed is False and decision.requires_approval is False
+    assert policy.check("organize_by_rule", {"path": str(inbox)}, {}).allowed is True
+
+def test_policy_engine_honors_grants():
+    from datetime import datetime, timedelta
+    from taskcraft.state.models import ApprovalGrant
+
+    engine = PolicyEngine(policies=[
+        MaxActionsPolicy(max_actions=5),
+        ApprovalRequiredPolicy(sensitive_tools=["send_report"])
+    ])
+    grant = ApprovalGrant(tool="send_report", match_params={"recipient": "x@corp.com"},
+                          expires_at=datetime.now() + timedelta(hours=1))
+    context = {'action_count': 0, 'grants': {"send_report": [grant]}}
+
+    # Covered call proceeds
+    assert engine.evaluate("send_report", {"recipient": "x@corp.com", "summary": "s"}, context).allowed is True
+    # Different recipient still halts
+    assert engine.evaluate("send_report", {"recipient": "y@corp.com"}, context).requires_approval is True
+    # Hard limits are never waived
+    assert engine.evaluate("send_report", {"recipient": "x@corp.com"}, {**context, 'action_count': 5}).allowed is False
+
+    expired = grant.model_copy(update={"expires_at": datetime.now() - timedelta(seconds=1)})
+    context = {'action_count': 0, 'grants': {"send_report": [expired]}}
+    assert engine.evaluate("send_report", {"recipient": "x@corp.com"}, context).requires_approval is True
+
+def test_grant_match_values_keep_their_types():
+    from taskcraft.main_cli import parse_grant_match
+    from taskcraft.state.models import ApprovalGrant
+
+    match = parse_grant_match(["count=3", "force=true", "recipient=x@corp.com", "ids=[1, 2]"])
+    assert match == {"count": 3, "force": True, "recipient": "x@corp.com", "ids": [1, 2]}
+    grant = ApprovalGrant(tool="purge", match_params=match)
+    assert grant.covers({"count": 3, "force": True, "recipient": "x@corp.com", "ids": [1, 2]})
+    assert grant.covers({"count": 3.0, "force": True, "recipient": "x@corp.com", "ids": [1, 2]})
+    assert not grant.covers({"count": 4, "force": True, "recipient": "x@corp.com", "ids": [1, 2]})
+    with pytest.raises(ValueError):
+        parse_grant_match(["count"])
@@ -0,0 +1,78 @@
+import sqlite3
+import pytest
+from taskcraft.state.models import Task
+from taskcraft.state.postgres import PostgresStateManager
+
+@pytest.mark.asyncio
+async def test_metadata_round_trips(state_backend):
+    task = Task(description="t", metadata={"agent": "Reporter", "config_path": "/srv/agents/reporter.yaml"})
+    await state_backend.save_task(task)
+    assert (await state_backend.load_task(task.task_id)).metadata == task.metadata
+
+    # Workers pick the agent from the claimed task's metadata
+    claimed = await state_backend.claim_task("w1", 30, task_id=task.task_id)
+    assert claimed.metadata["config_path"] == "/srv/agents/reporter.yaml"
+
+@pytest.mark.asyncio
+async def test_sqlalchemy_backend_migrates_old_tables(tmp_path):
+    path = tmp_path / "old.db"
+    with sqlite3.connect(path) as conn:
+        # Schema of the first release
+        conn.executescript("""
+            CREATE TABLE tasks (task_id VARCHAR PRIMARY KEY, description TEXT NOT NULL, status VARCHAR NOT NULL,
+                                created_at TIMESTAMP, updated_at TIMESTAMP);
+            CREATE TABLE steps (id INTEGER PRIMARY KEY, task_id VARCHAR NOT NULL REFERENCES tasks (task_id),
+                                "index" INTEGER NOT NULL, name VARCHAR NOT NULL, input_data JSON, output_data JSON,
+                                status VARCHAR NOT NULL, error TEXT, start_time TIMESTAMP, end_time TIMESTAMP);
+            INSERT INTO tasks VALUES ('old', 'from v1', 'IDLE', '2026-01-01 00:00:00', '2026-01-01 00:00:00');
+            INSERT INTO steps VALUES (1, 'old', 0, 'fetch', '{}', NULL, 'COMPLETED', NULL, NULL, NULL);
+        """)
+    db = PostgresStateManager(f"sqlite+aiosqlite:///{path}")
+    try:
+        await db.initialize()
+        await db.initialize() # Idempotent
+
+        old = await db.load_task("old")
+        assert old.tenant == "default" and old.priority == "normal" and old.metadata == {}
+        assert [s.retries for s in old.steps] == [0]
+        assert (await db.queue_stats())["normal"]["oldest_wait_s"] > 0 # Backfilled from created_at
+        assert (await db.claim_task("w1", 30)).task_id == "old"
+
+        task = Task(description="new", metadata={"agent": "a"}, tenant="team-a")
+        await db.save_task(task)
+        assert (await db.load_task(task.task_id)).metadata == {"agent": "a"}
+    finally:
+        await db.engine.dispose()
+
+@pytest.mark.asyncio
+async def test_claim_in_other_states(state_backend):
+    from taskcraft.core.lifecycle import AgentState
+    task = Task(description="halted", status=AgentState.AWAITING_APPROVAL)
+    await state_backend.save_task(task)
+    # Not runnable, so workers leave it alone; an approval can still lease it, once
+    assert await state_backend.claim_task("worker", 30, task_id=task.task_id) is None
+    states = (AgentState.AWAITING_APPROVAL,)
+    assert (await state_backend.claim_task("approver-1", 30, task_id=task.task_id, states=states)).task_id == task.task_id
+    assert await state_backend.claim_task("approver-2", 30, task_id=task.task_id, states=states) is None
+
+@pytest.fixture
+def tokyo_time(monkeypatch):
+    import time
+    if not hasattr(time, "tzset"):
+        pytest.skip("time.tzset is not available")
+    monkeypatch.setenv("TZ", "Asia/Tokyo")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+@pytest.mark.asyncio
+async def test_queue_ages_ignore_the_local_time_zone(state_backend, tokyo_time):
+    from datetime import datetime, timedelta
+    task = Task(description="waiting", created_at=datetime.now() - timedelta(seconds=60))
+    await state_backend.save_task(task)
+
+    stats = (await state_backend.queue_stats())["normal"]
+    assert stats["depth"] == 1
+    assert 59 <= stats["oldest_wait_s"] <= 70
+    assert (await state_backend.claim_task("w1", 30)).task_id == task.task_id
@@ -0,0 +1,39 @@
+import os
+import subprocess
+import sys
+import pytest
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "../src"))
+
+# Imported only by commands that run tasks
+HEAVY_MODULES = ("google.genai", "taskcraft.planner.gemini", "taskcraft.core.runtime",
+                 "taskcraft.executor.local", "tenacity", "docker", "sqlalchemy", "yaml")
+
+PROBE = """
+import asyncio, sys, time
+start = time.perf_counter()
+sys.argv = ["taskcraft"] + sys.argv[1:]
+import taskcraft.main_cli as cli
+asyncio.run(cli.run_cli())
+print("ELAPSED_MS", (time.perf_counter() - start) * 1000)
+print("LOADED", " ".join(m for m in {heavy} if m in sys.modules))
+"""
+
+def probe(tmp_path, *argv):
+    env = {**os.environ, "PYTHONPATH": SRC, "SQLITE_DB_PATH": str(tmp_path / "state.db"),
+           "TASKCRAFT_SOCKET": str(tmp_path / "no-daemon.sock")}
+    out = subprocess.run([sys.executable, "-c", PROBE.format(heavy=HEAVY_MODULES), *argv],
+                         env=env, capture_output=True, text=True, check=True).stdout
+    lines = dict(line.split(" ", 1) if " " in line else (line, "") for line in out.splitlines())
+    return float(lines["ELAPSED_MS"]), lines["LOADED"].split()
+
+@pytest.mark.parametrize("command", [["status", "missing"], ["logs", "missing"], ["queue"]])
+def test_read_only_commands_skip_heavy_imports(tmp_path, command):
+    _, loaded = probe(tmp_path, *command)
+    assert loaded == []
+
+def test_status_startup_budget(tmp_path):
+    # Best of a few runs to ride out noisy machines; override the budget for slow CI
+    budget = float(os.getenv("TASKCRAFT_STATUS_BUDGET_MS", "200"))
+    elapsed = min(probe(tmp_path, "status", "missing")[0] for _ in range(3))
+    assert elapsed < budget, f"status took {elapsed:.0f}ms (budget {budget:.0f}ms)"
@@ -0,0 +1,238 @@
+import asyncio
+import os
+import sys
+import pytest
+from types import SimpleNamespace
+from taskcraft import daemon, main_cli
+from taskcraft.daemon import TaskcraftDaemon
+
+def call(name, args):
+    return SimpleNamespace(text="", parts=[SimpleNamespace(function_call=SimpleNamespace(name=name, args=args))])
+
+class DeployPlanner:
+    """Deploys once (gated by the default agent's approval policy), then finishes."""
+    async def plan(self, task, history):
+        if any(s.name == "deploy_prod" for s in task.steps):
+            return SimpleNamespace(text="DONE", parts=[])
+        return call("deploy_prod", {"version": "1.2"})
+
+class DonePlanner:
+    async def plan(self, task, history):
+        return SimpleNamespace(text="DONE", parts=[])
+
+def exec_args(**overrides):
+    args = dict(backend="sqlite", executor=None, planner="fake", tool_threads=None, process_workers=None, pool_size=1,
+                sandbox_image="python:3.12-slim", no_cache=True, lease_seconds=5.0, delegate_subtasks=False)
+    args.update(overrides)
+    return SimpleNamespace(**args)
+
+@pytest.fixture
+def planner(monkeypatch, tmp_path):
+    monkeypatch.setenv("TASKCRAFT_TOOL_MANIFEST", str(tmp_path / "manifest.json"))
+    chosen = {"planner": DonePlanner}
+    monkeypatch.setattr(main_cli, "build_planner", lambda kind: chosen["planner"]())
+    return chosen
+
+@pytest.fixture
+async def served(memory_db, tmp_path, planner):
+    server = TaskcraftDaemon(memory_db, exec_args(), str(tmp_path / "d.sock"), reload_interval=0.05)
+    await server.start()
+    yield server
+    await server.close()
+
+def write_config(path, name):
+    path.write_text(f"name: {name}\ndescription: test\nobjective: Do {name}\ntools:\n  - name: read_file\n")
+
+@pytest.mark.asyncio
+async def test_run_and_status_over_socket(served):
+    sock = served.socket_path
+    assert oct(os.stat(sock).st_mode & 0o777) == oct(0o600)
+
+    response = await daemon.request(sock, {"command": "run", "objective": "Say hi"})
+    assert response["ok"] and response["status"] == "COMPLETED"
+    status = await daemon.request(sock, {"command": "status", "task_id": response["task_id"]})
+    assert "Status: COMPLETED" in status["lines"]
+
+    # The runtime built for the first command is reused
+    host = served.hosts[None]
+    await daemon.request(sock, {"command": "run", "objective": "Again"})
+    assert served.hosts[None] is host
+
+    assert not (await daemon.request(sock, {"command": "explode"}))["ok"]
+    assert "Bad request" in (await daemon.request(sock, {"command": "status"}))["error"]
+
+@pytest.mark.asyncio
+async def test_approve_runs_the_halted_step_and_continues(served, planner):
+    planner["planner"] = DeployPlanner
+    sock = served.socket_path
+    response = await daemon.request(sock, {"command": "run", "objective": "Ship it"})
+    assert response["status"] == "AWAITING_APPROVAL"
+
+    approved = await daemon.request(sock, {"command": "approve", "task_id": response["task_id"]})
+    assert approved["ok"] and approved["status"] == "COMPLETED"
+    assert approved["lines"][0] == "Approved step: deploy_prod"
+    task = await served.state_manager.load_task(response["task_id"])
+    assert [s.status for s in task.steps if s.name == "deploy_prod"] == ["APPROVED", "COMPLETED"]
+
+    resumed = await daemon.request(sock, {"command": "resume", "task_id": response["task_id"]})
+    assert resumed["lines"] == ["Task is COMPLETED; nothing to resume."]
+
+@pytest.mark.asyncio
+async def test_changed_config_is_reloaded(served, tmp_path):
+    config = tmp_path / "agent.yaml"
+    write_config(config, "first")
+    path = str(config)
+    first = await served.host(path)
+    closed = []
+    first.close = lambda: closed.append(True) or asyncio.sleep(0)
+
+    write_config(config, "second")
+    os.utime(config, ns=(first.mtime_ns + 10**9, first.mtime_ns + 10**9))
+    for _ in range(100):
+        if served.hosts[path] is not first:
+            break
+        await asyncio.sleep(0.02)
+    assert served.hosts[path].config.name == "second" and closed
+
+    response = await daemon.request(served.socket_path, {"command": "run", "config_path": path})
+    task = await served.state_manager.load_task(response["task_id"])
+    assert task.description == "Do second" and task.metadata["agent"] == "second"
+
+    # A broken edit keeps the last good runtime serving
+    config.write_text("name: [unclosed\n")
+    os.utime(config, ns=(first.mtime_ns + 2 * 10**9, first.mtime_ns + 2 * 10**9))
+    await asyncio.sleep(0.2)
+    assert served.hosts[path].config.name == "second"
+
+@pytest.mark.asyncio
+async def test_cli_forwards_to_daemon_and_falls_back(served, tmp_path, monkeypatch, capsys):
+    response = await daemon.request(served.socket_path, {"command": "run", "objective": "Say hi"})
+    monkeypatch.setattr(sys, "argv", ["taskcraft", "--socket", served.socket_path, "status", response["task_id"]])
+    await main_cli.run_cli()
+    assert "Status: COMPLETED" in capsys.readouterr().out
+
+    # No daemon on the socket: the command runs in-process against the local state store
+    monkeypatch.setenv("SQLITE_DB_PATH", str(tmp_path / "local.db"))
+    monkeypatch.setattr(sys, "argv", ["taskcraft", "--socket", str(tmp_path / "none.sock"), "status", "missing"])
+    await main_cli.run_cli()
+    assert capsys.readouterr().out.strip() == "Task not found."
+
+@pytest.mark.asyncio
+async def test_overlapping_approvals_run_the_step_once(served, planner):
+    planner["planner"] = DeployPlanner
+    sock = served.socket_path
+    response = await daemon.request(sock, {"command": "run", "objective": "Ship it"})
+    executor = served.hosts[None].runtime.executor
+    deploys, execute = [], executor.execute
+
+    async def slow_execute(tool_name, params):
+        if tool_name == "deploy_prod":
+            deploys.append(params)
+            await asyncio.sleep(0.1)
+        return await execute(tool_name, params)
+    executor.execute = slow_execute
+
+    approvals = await asyncio.gather(*(daemon.request(sock, {"command": "approve", "task_id": response["task_id"]})
+                                       for _ in range(2)))
+    assert sorted(a["ok"] for a in approvals) == [False, True]
+    assert len(deploys) == 1
+    task = await served.state_manager.load_task(response["task_id"])
+    assert [s.status for s in task.steps if s.name == "deploy_prod"] == ["APPROVED", "COMPLETED"]
+
+@pytest.mark.asyncio
+async def test_mismatched_settings_run_in_process(served, tmp_path, monkeypatch, capsys):
+    refused = await daemon.request(served.socket_path, {"command": "status", "task_id": "x",
+                                                        "settings": {"executor": "docker", "backend": "sqlite"}})
+    assert not refused["ok"] and refused["mismatch"] == ["executor"]
+
+    # A client on another state store doesn't get the daemon's answer
+    monkeypatch.setenv("SQLITE_DB_PATH", str(tmp_path / "other.db"))
+    monkeypatch.setattr(sys, "argv", ["taskcraft", "--socket", served.socket_path, "status", "missing"])
+    await main_cli.run_cli()
+    out = capsys.readouterr()
+    assert out.out.strip() == "Task not found." and "different state store" in out.err
+
+    args = main_cli.exec_flags_parser().parse_args(["--executor", "docker"])
+    args.backend = "sqlite"
+    settings = main_cli.client_settings(args)
+    assert settings["executor"] == "docker"
+    assert "planner" not in settings # Left at its default: the daemon's applies
+
+@pytest.mark.asyncio
+async def test_start_keeps_a_live_socket_and_replaces_a_stale_one(served, tmp_path):
+    rival = TaskcraftDaemon(served.state_manager, exec_args(), served.socket_path)
+    with pytest.raises(RuntimeError):
+        await rival.start()
+    await rival.close()
+    assert (await daemon.request(served.socket_path, {"command": "ping"}))["ok"]
+
+    import socket
+    stale = str(tmp_path / "stale.sock")
+    sock = socket.socket(socket.AF_UNIX)
+    sock.bind(stale)
+    sock.close() # Left behind, nobody listening
+    fresh = TaskcraftDaemon(served.state_manager, exec_args(), stale)
+    await fresh.start()
+    try:
+        assert (await daemon.request(stale, {"command": "ping"}))["ok"]
+    finally:
+        await fresh.close()
+
+@pytest.mark.asyncio
+async def test_slow_builds_do_not_block_other_commands(served, tmp_path, monkeypatch):
+    import time
+    build_runtime, builds = main_cli.build_runtime, []
+
+    def slow_build(*args):
+        builds.append(args)
+        time.sleep(0.3)
+        return build_runtime(*args)
+    monkeypatch.setattr(main_cli, "build_runtime", slow_build)
+    config = tmp_path / "agent.yaml"
+    write_config(config, "slow")
+
+    loading = asyncio.gather(served.host(str(config)), served.host(str(config)))
+    await asyncio.sleep(0.05)
+    started = time.perf_counter()
+    assert (await daemon.request(served.socket_path, {"command": "ping"}))["ok"]
+    assert time.perf_counter() - started < 0.2
+    first, second = await loading
+    assert first is second and len(builds) == 1
+
+@pytest.mark.asyncio
+async def test_grant_waits_for_the_lease(tmp_path, monkeypatch, capsys):
+    from taskcraft.state.models import Task
+    from taskcraft.state.persistence import SQLiteStateManager
+    db = SQLiteStateManager(str(tmp_path / "grants.db"))
+    await db.initialize()
+    task = Task(description="Report")
+    await db.save_task(task)
+    monkeypatch.setenv("SQLITE_DB_PATH", str(tmp_path / "grants.db"))
+    monkeypatch.setattr(sys, "argv", ["taskcraft", "--no-daemon", "grant", task.task_id, "send_report"])
+
+    # A worker is running the task: its next save would drop the grant, so none is written
+    assert await db.claim_task("worker", 30, task_id=task.task_id)
+    await main_cli.run_cli()
+    assert "held by another worker" in capsys.readouterr().out
+    assert (await db.load_task(task.task_id)).grants == {}
+
+    await db.release_task(task.task_id, "worker")
+    await main_cli.run_cli()
+    assert "Granted 'send_report'" in capsys.readouterr().out
+    assert "send_report" in (await db.load_task(task.task_id)).grants
+    assert await db.claim_task("worker", 30, task_id=task.task_id) # Lease released again
+
+@pytest.mark.asyncio
+async def test_socket_is_private_from_the_bind(memory_db, tmp_path, planner, monkeypatch):
+    chmods = []
+    monkeypatch.setattr(daemon.os, "chmod", lambda path, mode: chmods.append(os.stat(path).st_mode & 0o777))
+    sock = tmp_path / "run" / "d.sock"
+    server = TaskcraftDaemon(memory_db, exec_args(), str(sock))
+    await server.start()
+    try:
+        assert os.stat(sock.parent).st_mode & 0o777 == 0o700
+        # Already closed to group and others before the chmod tightened it
+        assert chmods and chmods[0] & 0o077 == 0
+        assert (await daemon.request(str(sock), {"command": "status", "task_id": "missing"}))["ok"]
+    finally:
+        await server.close()
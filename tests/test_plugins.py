@@ -0,0 +1,10 @@
+import pytest
+from taskcraft import plugins
+
+def test_builtins_resolve_lazily():
+    assert plugins.load(plugins.STATE_BACKENDS, "sqlite").__name__ == "SQLiteStateManager"
+    assert plugins.available(plugins.EXECUTORS)[:4] == ["local", "routed", "docker", "subprocess"]
+
+def test_unknown_name_lists_choices():
+    with pytest.raises(LookupError, match=r"Unknown planner 'nope' \(available: gemini, tot"):
+        plugins.load(plugins.PLANNERS, "nope")
@@ -0,0 +1,106 @@
+import asyncio
+import multiprocessing
+import threading
+import pytest
+from taskcraft.tools.append_writer import AppendWriter, get_writer, flush_all
+from taskcraft.tools.fs_skills import append_to_summary, append_many_to_summary
+
+def _append_lines(path, worker, count):
+    writer = AppendWriter(path, max_buffer_bytes=64)
+    for i in range(count):
+        if writer.write(f"{worker}-{i}-" + "x" * 40 + "\n"):
+            writer.flush()
+    writer.close()
+
+@pytest.mark.asyncio
+async def test_buffers_until_size_or_timer(tmp_path):
+    path = tmp_path / "summary.txt"
+    writer = AppendWriter(str(path), max_buffer_bytes=10, flush_interval=0.05)
+    await writer.append("abc\n")
+    assert not path.exists() # Buffered, not written yet
+    await asyncio.sleep(0.2)
+    assert path.read_text() == "abc\n" # Flushed by the timer
+    await writer.append("0123456789\n")
+    assert path.read_text() == "abc\n0123456789\n" # Size threshold flushes immediately
+    writer.close()
+
+@pytest.mark.asyncio
+async def test_tools_share_one_writer_and_flush_all(tmp_path):
+    path = tmp_path / "index.txt"
+    await asyncio.gather(*(append_to_summary(str(path), f"entry {i}") for i in range(20)))
+    assert await append_many_to_summary(str(path), ["a", "b"]) == "Summary updated with 2 entries."
+    assert get_writer(str(path)) is get_writer(str(tmp_path / "." / "index.txt"))
+    flush_all()
+    lines = path.read_text().splitlines()
+    assert sorted(lines[:20]) == sorted(f"entry {i}" for i in range(20)) and lines[20:] == ["a", "b"]
+
+@pytest.mark.asyncio
+async def test_appends_coalesce_into_one_write(tmp_path):
+    path = tmp_path / "batched.txt"
+    writer = get_writer(str(path))
+    writes = []
+    flush = writer.flush
+    writer.flush = lambda: writes.append(flush()) or writes[-1]
+
+    await asyncio.gather(*(append_to_summary(str(path), f"entry {i}") for i in range(10)))
+    assert await append_many_to_summary(str(path), ["a", "b"]) == "Summary updated with 2 entries."
+    assert not path.exists() # Still buffered
+    flush_all()
+    assert len(path.read_text().splitlines()) == 12
+    assert [n for n in writes if n] == [len(path.read_text())]
+
+@pytest.mark.asyncio
+async def test_step_entries_are_on_disk_before_the_step_is_journaled(memory_db, empty_policy_engine, tmp_path):
+    from taskcraft.core.runtime import AgentRuntime
+    from taskcraft.executor.local import LocalExecutor
+
+    path = str(tmp_path / "steps.txt")
+    journaled = []
+    record = memory_db.record_step_result
+    async def record_step_result(task_id, key, result):
+        journaled.append(open(path).read())
+        await record(task_id, key, result)
+    memory_db.record_step_result = record_step_result
+
+    runtime = AgentRuntime(memory_db, empty_policy_engine, LocalExecutor({"append_to_summary": append_to_summary}))
+    task = await runtime.create_task("Summarize")
+    result = await runtime.execute_step(task, "append_to_summary", {"summary_file": path, "entry": "done"})
+    assert result["output"] == "Summary updated."
+    assert journaled == ["done\n"]
+
+def test_write_does_not_wait_for_a_flush_in_progress(tmp_path):
+    path = tmp_path / "slow.txt"
+    writer = AppendWriter(str(path))
+    writing, release = threading.Event(), threading.Event()
+    real_open = writer._open
+    def slow_open():
+        writing.set()
+        release.wait(5)
+        return real_open()
+    writer._open = slow_open
+
+    writer.write("a\n")
+    flusher = threading.Thread(target=writer.flush)
+    flusher.start()
+    assert writing.wait(5)
+    appender = threading.Thread(target=writer.write, args=("b\n",))
+    appender.start()
+    appender.join(1)
+    assert not appender.is_alive() # Buffered while the flush is stuck on I/O
+    release.set()
+    flusher.join()
+    assert path.read_text() == "a\n"
+    writer.close()
+    assert path.read_text() == "a\nb\n"
+
+def test_processes_do_not_interleave_lines(tmp_path):
+    path = str(tmp_path / "shared.txt")
+    ctx = multiprocessing.get_context("fork")
+    procs = [ctx.Process(target=_append_lines, args=(path, w, 200)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    lines = open(path).read().splitlines()
+    assert len(lines) == 800
+    assert all(line.endswith("x" * 40) and line.count("-") == 2 for line in lines)
@@ -0,0 +1,61 @@
+import os
+import time
+import pytest
+from taskcraft.tools.fs_index import refresh_index, find_files
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "files"
+    (root / "docs").mkdir(parents=True)
+    (root / "notes.txt").write_text("quarterly budget draft")
+    (root / "docs" / "invoice_01.pdf").write_bytes(b"%PDF" + b"\0" * 996)
+    (root / "docs" / "invoice_02.pdf").write_bytes(b"%PDF" + b"\0" * 96)
+    old = time.time() - 90 * 86400
+    os.utime(root / "docs" / "invoice_01.pdf", (old, old))
+    return root, str(tmp_path / "index.db")
+
+@pytest.mark.asyncio
+async def test_refresh_is_incremental(tree):
+    root, index = tree
+    assert "added 3, updated 0, removed 0, unchanged 0" in await refresh_index(str(root), index_path=index)
+    assert "added 0, updated 0, removed 0, unchanged 3" in await refresh_index(str(root), index_path=index)
+
+    (root / "notes.txt").write_text("quarterly budget final version")
+    (root / "docs" / "invoice_02.pdf").unlink()
+    (root / "todo.md").write_text("- file invoices")
+    assert "added 1, updated 1, removed 1, unchanged 1" in await refresh_index(str(root), index_path=index)
+    assert "notes.txt" in await find_files(contains="final", index_path=index)
+    assert await find_files(contains="draft", index_path=index) == "No matching files."
+
+@pytest.mark.asyncio
+async def test_find_files_filters(tree):
+    root, index = tree
+    assert await find_files(extension="pdf", index_path=index) == "Index is empty: call refresh_index first."
+    await refresh_index(str(root), index_path=index)
+
+    pdfs = (await find_files(root=str(root), extension="PDF", index_path=index)).splitlines()
+    assert [os.path.basename(line.split(" ")[0]) for line in pdfs] == ["invoice_01.pdf", "invoice_02.pdf"]
+    assert "invoice_01.pdf" in await find_files(older_than_days=30, index_path=index)
+    assert "invoice_01.pdf" not in await find_files(newer_than_days=30, index_path=index)
+    assert "invoice_02.pdf" in await find_files(name_pattern="invoice_*", max_size=500, index_path=index)
+    assert await find_files(min_size=10_000, index_path=index) == "No matching files."
+    limited = await find_files(limit=1, index_path=index)
+    assert limited.splitlines()[-1].startswith("... more matches")
+
+@pytest.mark.asyncio
+async def test_nested_refresh_keeps_files_under_both_roots(tree):
+    root, index = tree
+    (root.parent / "files_other").mkdir()
+    (root.parent / "files_other" / "stray.pdf").write_bytes(b"%PDF")
+    await refresh_index(str(root.parent / "files_other"), index_path=index)
+    await refresh_index(str(root), index_path=index)
+    # Re-indexing the changed file must not take it out of the outer root
+    (root / "docs" / "invoice_02.pdf").write_bytes(b"%PDF" + b"\0" * 196)
+    assert "added 0, updated 1, removed 0, unchanged 1" in await refresh_index(str(root / "docs"), index_path=index)
+
+    for under in (root, root / "docs"):
+        pdfs = (await find_files(root=str(under), extension="pdf", index_path=index)).splitlines()
+        assert [os.path.basename(line.split(" ")[0]) for line in pdfs] == ["invoice_01.pdf", "invoice_02.pdf"]
+    # The outer refresh still sees the nested files as its own
+    (root / "docs" / "invoice_02.pdf").unlink()
+    assert "removed 1, unchanged 2" in await refresh_index(str(root), index_path=index)
@@ -0,0 +1,180 @@
+import os
+import json
+import pytest
+from taskcraft.tools.definitions import read_file
+from taskcraft.tools.fs_skills import (list_directory, find_duplicates, batch_file_operations, organize_by_rule,
+                                      read_file_range, read_many_files)
+from taskcraft.tools.fs_utils import scan_directory
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "docs" / "old").mkdir(parents=True)
+    (tmp_path / "media").mkdir()
+    (tmp_path / "a.txt").write_text("x" * 10)
+    (tmp_path / "docs" / "b.pdf").write_bytes(b"x" * 500)
+    (tmp_path / "docs" / "old" / "c.pdf").write_bytes(b"x" * 2000)
+    (tmp_path / "media" / "d.png").write_bytes(b"x" * 50)
+    return tmp_path
+
+def test_scan_is_sorted_depth_first_with_filters(tree):
+    assert [e.rel_path for e in scan_directory(str(tree))] == [
+        "a.txt", os.path.join("docs", "b.pdf"), os.path.join("docs", "old", "c.pdf"), os.path.join("media", "d.png"),
+    ]
+    assert [e.name for e in scan_directory(str(tree), pattern="*.pdf", max_size=1000)] == ["b.pdf"]
+    assert [e.name for e in scan_directory(str(tree), max_depth=2)] == ["a.txt", "b.pdf", "d.png"]
+
+@pytest.mark.asyncio
+async def test_list_directory_pages_and_keeps_flat_format(tree):
+    assert await list_directory(str(tree)) == "a.txt (Size: 10b)\ndocs/ (DIR)\nmedia/ (DIR)"
+
+    first = await list_directory(str(tree), recursive=True, page_size=3)
+    last = os.path.join("docs", "old", "c.pdf")
+    assert first.splitlines()[-1] == f'... more entries: call again with cursor="{last}"'
+    second = await list_directory(str(tree), recursive=True, page_size=3, cursor=last)
+    assert second == f"{tree / 'media' / 'd.png'} (Size: 50b)"
+
+@pytest.mark.asyncio
+async def test_list_directory_cursor_does_not_rescan_earlier_pages(tmp_path, monkeypatch):
+    for i in range(6):
+        (tmp_path / f"d{i}" / "sub").mkdir(parents=True)
+        (tmp_path / f"d{i}" / "f.txt").write_text("x")
+        (tmp_path / f"d{i}" / "sub" / "g.txt").write_text("x")
+    expected = [e.rel_path for e in scan_directory(str(tmp_path))]
+
+    scanned, real_scandir = [], os.scandir
+    def scandir(path):
+        scanned.append(os.path.relpath(path, tmp_path))
+        return real_scandir(path)
+    monkeypatch.setattr(os, "scandir", scandir)
+
+    listed, cursor = [], None
+    while True:
+        scanned.clear()
+        page = (await list_directory(str(tmp_path), recursive=True, page_size=2, cursor=cursor)).splitlines()
+        more = page[-1].startswith("... more entries")
+        if more:
+            cursor = json.loads(page.pop().split("cursor=", 1)[1])
+        listed += [os.path.relpath(line.rsplit(" (Size", 1)[0], tmp_path) for line in page]
+        if not more:
+            break
+    assert listed == expected
+    # The last page resumes after d4/sub/g.txt: only the way down to it and what follows are read
+    assert scanned == [".", "d4", os.path.join("d4", "sub"), "d5", os.path.join("d5", "sub")]
+
+@pytest.mark.asyncio
+async def test_list_directory_summaries(tree):
+    by_ext = await list_directory(str(tree), recursive=True, summarize_by="extension")
+    assert by_ext.splitlines()[:2] == ["4 files, 2560b total, 3 extension groups", ".pdf: 2 files, 2500b"]
+    by_dir = await list_directory(str(tree), recursive=True, summarize_by="directory")
+    assert "docs/: 2 files, 2500b" in by_dir
+    assert "(top level): 1 files, 10b" in by_dir
+
+@pytest.mark.asyncio
+async def test_find_duplicates_confirms_with_full_hash(tmp_path):
+    big = os.urandom(300 * 1024)
+    (tmp_path / "a").mkdir()
+    (tmp_path / "a" / "one.bin").write_bytes(big)
+    (tmp_path / "two.bin").write_bytes(big)
+    # Same size and same first/last blocks, different middle: only the full hash tells them apart
+    (tmp_path / "near.bin").write_bytes(big[:150 * 1024] + b"!" + big[150 * 1024 + 1:])
+    (tmp_path / "x.txt").write_text("same")
+    (tmp_path / "y.txt").write_text("same")
+    (tmp_path / "z.txt").write_text("diff")
+
+    report = (await find_duplicates(str(tmp_path))).splitlines()
+    assert report[0] == f"2 duplicate groups among 6 files: 2 redundant copies, {len(big) + 4}b reclaimable"
+    assert report[1:4] == [f"{len(big)}b x2:", f"  {tmp_path / 'a' / 'one.bin'}", f"  {tmp_path / 'two.bin'}"]
+    assert report[4:] == ["4b x2:", f"  {tmp_path / 'x.txt'}", f"  {tmp_path / 'y.txt'}"]
+    assert await find_duplicates(str(tmp_path), pattern="*.bin", min_size=1024, max_groups=0) == \
+        f"1 duplicate groups among 3 files: 1 redundant copies, {len(big)}b reclaimable\n... 1 smaller groups omitted"
+
+@pytest.mark.asyncio
+async def test_batch_file_operations_handles_collisions(tmp_path):
+    for name in ("a.txt", "b.txt", "c.txt"):
+        (tmp_path / name).write_text(name)
+    (tmp_path / "out").mkdir()
+    (tmp_path / "out" / "a.txt").write_text("existing")
+    ops = [
+        {"op": "move", "src": str(tmp_path / "a.txt"), "dest_folder": str(tmp_path / "out")},
+        {"op": "copy", "src": str(tmp_path / "b.txt"), "dest": str(tmp_path / "out" / "a.txt")},
+        {"op": "rename", "src": str(tmp_path / "c.txt"), "dest": "c_renamed.txt"},
+        {"op": "move", "src": str(tmp_path / "missing.txt"), "dest_folder": str(tmp_path / "out")},
+    ]
+
+    preview = await batch_file_operations(ops, dry_run=True)
+    assert preview.splitlines()[0] == "Dry run: would complete 3/4 operations (2 renamed on collision, 0 skipped, 1 failed)"
+    assert f"renamed #1 {tmp_path / 'b.txt'} -> {tmp_path / 'out' / 'a_2.txt'}" in preview
+    assert (tmp_path / "a.txt").exists() and not (tmp_path / "out" / "a_1.txt").exists()
+
+    report = await batch_file_operations(ops)
+    assert report.splitlines()[0] == "Completed 3/4 operations (2 renamed on collision, 0 skipped, 1 failed)"
+    assert (tmp_path / "out" / "a.txt").read_text() == "existing"
+    assert (tmp_path / "out" / "a_1.txt").read_text() == "a.txt"
+    assert (tmp_path / "out" / "a_2.txt").read_text() == "b.txt"
+    assert (tmp_path / "b.txt").exists() and (tmp_path / "c_renamed.txt").exists()
+
+    skipped = await batch_file_operations(
+        [{"op": "copy", "src": str(tmp_path / "b.txt"), "dest_folder": str(tmp_path / "out")},
+         {"op": "copy", "src": str(tmp_path / "b.txt"), "dest_folder": str(tmp_path / "out")}], on_collision="skip")
+    assert skipped.splitlines()[0] == "Completed 1/2 operations (0 renamed on collision, 1 skipped, 0 failed)"
+
+@pytest.mark.asyncio
+async def test_rename_stays_in_the_source_folder(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "a.txt").write_text("a")
+    os.symlink(tmp_path / "elsewhere.txt", tmp_path / "src" / "link.txt")
+    src = str(tmp_path / "src" / "a.txt")
+    ops = [{"op": "rename", "src": src, "dest": dest} for dest in ("../a.txt", "sub/a.txt", "..", "link.txt")]
+
+    report = (await batch_file_operations(ops)).splitlines()
+    assert report[0] == "Completed 0/4 operations (0 renamed on collision, 0 skipped, 4 failed)"
+    assert "must be a file name" in report[1] and "must be a file name" in report[3]
+    assert "resolves outside" in report[4]
+    assert (tmp_path / "src" / "a.txt").read_text() == "a" and not (tmp_path / "elsewhere.txt").exists()
+
+@pytest.mark.asyncio
+async def test_organize_by_rule_extension(tree):
+    report = await organize_by_rule(str(tree), recursive=True, dry_run=True)
+    assert report == "Dry run: would complete 4/4 operations (0 renamed on collision, 0 skipped, 0 failed)"
+    assert (tree / "a.txt").exists()
+
+    await organize_by_rule(str(tree), recursive=True)
+    assert sorted(os.listdir(tree / "pdf")) == ["b.pdf", "c.pdf"]
+    assert os.listdir(tree / "txt") == ["a.txt"] and os.listdir(tree / "png") == ["d.png"]
+    assert await organize_by_rule(str(tree), recursive=True) == \
+        "Completed 0/4 operations (0 renamed on collision, 4 skipped, 0 failed)"
+
+@pytest.fixture
+def log(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("".join(f"line {i}\n" for i in range(1, 1001)))
+    return path
+
+@pytest.mark.asyncio
+async def test_read_file_range_modes(log):
+    size = log.stat().st_size
+    assert await read_file_range(str(log), tail_lines=2) == f"[{log}: last 2 lines]\nline 999\nline 1000\n"
+    assert await read_file_range(str(log), start_line=10, end_line=11) == f"[{log}: lines 10-11]\nline 10\nline 11\n"
+    assert await read_file_range(str(log), offset=-10) == f"[{log}: bytes {size - 10}-{size} of {size}]\nline 1000\n"
+    assert await read_file_range(str(log), offset=7, length=7) == f"[{log}: bytes 7-14 of {size}]\nline 2\n"
+    assert await read_file_range(str(log), tail_lines=500, length=10) == f"[{log}: last 500 lines]\nline 1000\n"
+
+    assert await read_file(str(log), offset=-10) == "line 1000\n"
+    assert await read_file(str(log)) == log.read_text()
+
+@pytest.mark.asyncio
+async def test_read_file_offset_without_length_is_capped(log, monkeypatch):
+    from taskcraft.tools import definitions
+    monkeypatch.setattr(definitions, "READ_FILE_CHUNK", 14)
+    assert await read_file(str(log), offset=7) == "line 2\nline 3\n\n[... more available at offset=21]"
+    assert await read_file(str(log), offset=21, length=7) == "line 4\n"
+    assert await read_file(str(log), offset=-10) == "line 1000\n"
+
+@pytest.mark.asyncio
+async def test_read_many_files(log, tmp_path):
+    (tmp_path / "b.txt").write_text("hello")
+    result = await read_many_files([str(log), str(tmp_path / "b.txt"), str(tmp_path / "nope")], max_chars=7)
+    assert result == (f"[{log}: bytes 0-7 of {log.stat().st_size}]\nline 1\n\n\n"
+                      f"[{tmp_path / 'b.txt'}: bytes 0-5 of 5]\nhello\n\n[{tmp_path / 'nope'}: not found]")
+    tails = await read_many_files([str(log)], tail_lines=1)
+    assert tails == f"[{log}: last 1 lines]\nline 1000\n"
@@ -0,0 +1,55 @@
+import errno
+import pytest
+from tenacity import wait_none
+from taskcraft.tools.decorators import (retryable_tool, is_transient, register_error_classifier, _classifiers,
+                                        RetryBudget, current_retry_budget)
+
+def flaky(errors):
+    """A fast-retrying tool that raises `errors` in turn, then succeeds."""
+    calls = []
+
+    @retryable_tool(max_attempts=5)
+    async def tool():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return "ok"
+    return tool.retry_with(wait=wait_none()), calls
+
+def test_classification():
+    assert is_transient(TimeoutError()) and is_transient(ConnectionResetError())
+    assert is_transient(OSError(errno.EBUSY, "busy")) and is_transient(RuntimeError("HTTP 503"))
+    assert not is_transient(FileNotFoundError()) and not is_transient(ValueError())
+    assert not is_transient(OSError(errno.ENOSPC, "disk full"))
+
+    classifier = register_error_classifier(lambda e: False if "401" in str(e) else None)
+    try:
+        assert not is_transient(RuntimeError("HTTP 401"))
+        assert is_transient(RuntimeError("HTTP 503"))
+    finally:
+        _classifiers.remove(classifier)
+
+@pytest.mark.asyncio
+async def test_permanent_errors_fail_fast():
+    tool, calls = flaky([FileNotFoundError("gone")])
+    with pytest.raises(FileNotFoundError):
+        await tool()
+    assert len(calls) == 1
+
+    tool, calls = flaky([TimeoutError(), ConnectionError()])
+    assert await tool() == "ok"
+    assert len(calls) == 3
+
+@pytest.mark.asyncio
+async def test_budget_caps_retries_across_calls():
+    budget = RetryBudget(total=3, per_tool=2)
+    token = current_retry_budget.set(budget)
+    try:
+        tool, calls = flaky([TimeoutError()] * 4)
+        with pytest.raises(TimeoutError):
+            await tool()
+        assert len(calls) == 3 # Per-tool budget of 2 retries
+        assert budget.used == {"tool": 2}
+        assert budget.take("other") and not budget.take("other") # Total budget exhausted
+    finally:
+        current_retry_budget.reset(token)